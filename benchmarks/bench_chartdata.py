@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+"""Compares the columnar category chart data builder with the iterrows path."""
+
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+from pptx.chart.data import CategoryChartData
+
+from databricksppt import databricksppt
+
+
+def iterrows_chartdata(chart):
+    chart_data = CategoryChartData()
+    colNames = chart['data'][0].columns.tolist()
+    offset = 1 if chart['first_column_as_labels'] else 0
+
+    if len(colNames) > offset:
+        for colName in colNames[offset:]:
+            chart_data.categories.add_category(colName)
+
+        for index, row in chart['data'][0].iterrows():
+            data = [row[colName] for colName in colNames[offset:]]
+            chart_data.add_series(str(row.iloc[0]), data)
+
+    return chart_data
+
+
+def make_chart(rows, columns):
+    values = np.random.default_rng(0).random((rows, columns))
+    df = pd.DataFrame(values, columns=['C{}'.format(c) for c in range(columns)])
+    df.insert(0, 'Label', ['Row {}'.format(r) for r in range(rows)])
+    return dict(data=[df], column_names_as_labels=True,
+                first_column_as_labels=True)
+
+
+def main(shapes=((100, 10), (1000, 10), (10000, 5), (50000, 2))):
+    create_chartdata = getattr(databricksppt, '__create_chartdata')
+    print('{:>14} {:>12} {:>12} {:>8}'.format(
+        'rows x cols', 'iterrows (s)', 'columnar (s)', 'speedup'))
+    for rows, columns in shapes:
+        chart = make_chart(rows, columns)
+        legacy = min(timeit.repeat(
+            lambda: iterrows_chartdata(chart), number=1, repeat=3))
+        columnar = min(timeit.repeat(
+            lambda: create_chartdata(chart), number=1, repeat=3))
+        print('{:>14} {:>12.4f} {:>12.4f} {:>7.1f}x'.format(
+            '{} x {}'.format(rows, columns), legacy, columnar,
+            legacy / columnar))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Shows render time and saved size against charts per distinct dataset."""
+
+import io
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from databricksppt import databricksppt
+
+
+def make_presentation(datasets, charts_per_dataset, rows, columns):
+    frames = []
+    for num in range(datasets):
+        values = np.random.default_rng(num).random((rows, columns))
+        df = pd.DataFrame(values, columns=['C{}'.format(c) for c in range(columns)])
+        df.insert(0, 'Label', ['Row {}'.format(r) for r in range(rows)])
+        frames.append(df)
+
+    chart_types = ['Column', 'Line', 'Bar']
+    return dict(slides=[
+        dict(title='Slide', charts=[
+            dict(data=df.copy(), chart_type=chart_types[num % len(chart_types)],
+                 placeholder_num=2, transpose=True)])
+        for df in frames for num in range(charts_per_dataset)])
+
+
+def render(datasets, charts_per_dataset, rows, columns):
+    ppt = databricksppt.toPPT(
+        make_presentation(datasets, charts_per_dataset, rows, columns))
+    stream = io.BytesIO()
+    databricksppt.savePPT(ppt, stream)
+    return len(stream.getvalue())
+
+
+def main(rows=1000, columns=4):
+    print('{:>9} {:>16} {:>10} {:>12}'.format(
+        'datasets', 'charts/dataset', 'time (s)', 'size (KiB)'))
+    for datasets, charts_per_dataset in [(1, 1), (1, 10), (5, 1), (5, 10)]:
+        size = render(datasets, charts_per_dataset, rows, columns)
+        seconds = min(timeit.repeat(
+            lambda: render(datasets, charts_per_dataset, rows, columns),
+            number=1, repeat=3))
+        print('{:>9} {:>16} {:>10.3f} {:>12.1f}'.format(
+            datasets, charts_per_dataset, seconds, size / 1024))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
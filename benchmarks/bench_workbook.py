@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""Compares render time and saved size for each embed_workbook option."""
+
+import io
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from databricksppt import databricksppt
+
+
+def make_presentation(embed_workbook, slides, rows, columns):
+    values = np.random.default_rng(0).random((rows, columns))
+    df = pd.DataFrame(values, columns=['C{}'.format(c) for c in range(columns)])
+    df.insert(0, 'Label', ['Row {}'.format(r) for r in range(rows)])
+    return dict(embed_workbook=embed_workbook, slides=[
+        dict(title='Slide {}'.format(num), charts=[
+            dict(data=df, chart_type='Line', placeholder_num=2,
+                 transpose=True)])
+        for num in range(slides)])
+
+
+def render(embed_workbook, slides, rows, columns):
+    ppt = databricksppt.toPPT(
+        make_presentation(embed_workbook, slides, rows, columns))
+    stream = io.BytesIO()
+    databricksppt.savePPT(ppt, stream)
+    return len(stream.getvalue())
+
+
+def main(shapes=((20, 100, 5), (10, 1000, 5), (5, 5000, 2))):
+    print('{:>20} {:>6} {:>10} {:>12}'.format(
+        'slides x rows x cols', 'embed', 'time (s)', 'size (KiB)'))
+    for slides, rows, columns in shapes:
+        for option in databricksppt.EMBED_WORKBOOK:
+            size = render(option.value, slides, rows, columns)
+            seconds = min(timeit.repeat(
+                lambda: render(option.value, slides, rows, columns),
+                number=1, repeat=3))
+            print('{:>20} {:>6} {:>10.3f} {:>12.1f}'.format(
+                '{} x {} x {}'.format(slides, rows, columns), option.value,
+                seconds, size / 1024))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Benchmarks of the hot paths in databricksppt, written for asv: each class's
+time_* methods are timed and its peakmem_* methods measured for peak memory,
+once for every combination of its params. Run them with asv, or without it
+through benchmarks/run.py.
+
+The synthetic frames default to BENCH_ROWS rows by BENCH_COLUMNS value
+columns, both overridable through the environment.
+"""
+
+import copy
+import io
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from databricksppt import databricksppt
+from databricksppt.chartdata import ArrayCategoryChartData
+from databricksppt.template_cache import TemplateCache
+
+
+ROWS = int(os.environ.get('BENCH_ROWS', 1000))
+COLUMNS = int(os.environ.get('BENCH_COLUMNS', 5))
+
+XY_CHART_TYPES = [
+    databricksppt.CHART_TYPE.XY_SCATTER.value,
+    databricksppt.CHART_TYPE.XY_SCATTER_LINES.value,
+    databricksppt.CHART_TYPE.XY_SCATTER_LINES_SMOOTHED.value,
+    databricksppt.CHART_TYPE.XY_SCATTER_LINES_MARKED_SMOOTHED.value,
+]
+
+
+def make_frame(rows=ROWS, columns=COLUMNS, labels=True, seed=0):
+    """Random values, with a leading column of row labels if *labels*"""
+    values = np.random.default_rng(seed).random((rows, columns))
+    df = pd.DataFrame(values, columns=['C{}'.format(c) for c in range(columns)])
+    if labels:
+        df.insert(0, 'Label', ['Row {}'.format(r) for r in range(rows)])
+    return df
+
+
+def make_xy_frames(frames, rows=ROWS, bubble=False):
+    """One frame per series: X, Y (and bubble size) columns"""
+    return [make_frame(rows, 3 if bubble else 2, labels=False, seed=seed)
+            for seed in range(frames)]
+
+
+def chart_data(chart_type, rows=ROWS, columns=COLUMNS):
+    """Data of the usual shape for *chart_type*"""
+    if chart_type == databricksppt.CHART_TYPE.BUBBLE.value:
+        return make_xy_frames(2, rows, bubble=True)
+    if chart_type in XY_CHART_TYPES:
+        return make_xy_frames(2, rows)
+    return [make_frame(rows, columns)]
+
+
+def presentation(charts, slides=1):
+    """A deck spec with every chart in *charts* on each of *slides* slides"""
+    return dict(slides=[
+        dict(title='Slide {}'.format(num), layout_num=1,
+             charts=[dict(chart, placeholder_num=2) for chart in charts])
+        for num in range(slides)])
+
+
+def render(spec):
+    ppt = databricksppt.toPPT(spec)
+    if isinstance(ppt, str):
+        raise RuntimeError(ppt)
+    return ppt
+
+
+# Chart types toPPT cannot render yet: __insert_chart sets the value axis
+# of Pie and Doughnut charts, which have none, and __XL_CHART_TYPES marks
+# XY-Scatter-Lines-Marked as taking category rather than XY data
+BROKEN_CHART_TYPES = [
+    databricksppt.CHART_TYPE.PIE.value,
+    databricksppt.CHART_TYPE.PIE_EXPLODED.value,
+    databricksppt.CHART_TYPE.DOUGHNUT.value,
+    databricksppt.CHART_TYPE.DOUGHNUT_EXPLODED.value,
+    databricksppt.CHART_TYPE.XY_SCATTER_LINES_MARKED.value,
+]
+
+
+class ChartTypes:
+    """toPPT of one chart of each CHART_TYPE"""
+
+    params = [chart_type.value for chart_type in databricksppt.CHART_TYPE
+              if chart_type.value not in BROKEN_CHART_TYPES]
+    param_names = ['chart_type']
+
+    def setup(self, chart_type):
+        self.chart = dict(data=chart_data(chart_type), chart_type=chart_type)
+
+    def time_toPPT(self, chart_type):
+        render(presentation([self.chart]))
+
+    def peakmem_toPPT(self, chart_type):
+        render(presentation([self.chart]))
+
+
+class InsertTable:
+    """__insert_table of a table with a header row"""
+
+    params = [100, 1000, 10000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        self.chart = dict(data=[make_frame(rows)], column_names_as_labels=True,
+                          first_column_as_labels=True)
+        self.placeholder = SimpleNamespace(left=Inches(1), top=Inches(1),
+                                           width=Inches(8), height=Inches(5))
+        self.insert_table = getattr(databricksppt, '__insert_table')
+
+    def time_insert_table(self, rows):
+        ppt = Presentation()
+        slide = ppt.slides.add_slide(ppt.slide_layouts[6])
+        self.insert_table(slide, self.placeholder, self.chart)
+
+    def peakmem_insert_table(self, rows):
+        self.time_insert_table(rows)
+
+
+class Transpose:
+    """toPPT with transpose=True against the same data untransposed"""
+
+    params = (['Column', 'Line', 'Table'], [False, True])
+    param_names = ['chart_type', 'transpose']
+
+    def setup(self, chart_type, transpose):
+        # Untransposed, category charts get a series per row, so keep the
+        # frame wide rather than long
+        self.chart = dict(data=[make_frame(COLUMNS, ROWS) if not transpose and chart_type != 'Table'
+                                else make_frame()],
+                          chart_type=chart_type, transpose=transpose)
+
+    def time_toPPT(self, chart_type, transpose):
+        render(presentation([self.chart]))
+
+    def peakmem_toPPT(self, chart_type, transpose):
+        render(presentation([self.chart]))
+
+
+class MultiFrameXY:
+    """toPPT of XY and Bubble charts with one frame per series"""
+
+    params = (['XY-Scatter', 'Bubble'], [1, 4, 16])
+    param_names = ['chart_type', 'frames']
+
+    def setup(self, chart_type, frames):
+        self.chart = dict(data=make_xy_frames(frames, bubble=chart_type == 'Bubble'),
+                          chart_type=chart_type)
+
+    def time_toPPT(self, chart_type, frames):
+        render(presentation([self.chart]))
+
+    def peakmem_toPPT(self, chart_type, frames):
+        render(presentation([self.chart]))
+
+
+class SaveDeck:
+    """Saving a rendered deck, as a package and as a download link"""
+
+    params = [1, 10, 50]
+    param_names = ['slides']
+
+    def setup(self, slides):
+        self.ppt = render(presentation(
+            [dict(data=[make_frame()], chart_type='Line', transpose=True)],
+            slides))
+
+    def time_save(self, slides):
+        self.ppt.save(io.BytesIO())
+
+    def peakmem_save(self, slides):
+        self.ppt.save(io.BytesIO())
+
+    def time_toBase64URL(self, slides):
+        databricksppt.toBase64URL(self.ppt)
+
+    def peakmem_toBase64URL(self, slides):
+        databricksppt.toBase64URL(self.ppt)
+
+
+class PPTTC:
+    """toPPTTC against toPPT and save for the same deck"""
+
+    params = (['Column', 'Line', 'Table'], [1, 10])
+    param_names = ['chart_type', 'slides']
+
+    def setup(self, chart_type, slides):
+        chart = dict(data=[make_frame()], chart_type=chart_type,
+                     transpose=chart_type != 'Table')
+        self.spec = presentation([chart], slides)
+        # think-cell fills the template in; it need not exist here
+        self.ppttc_spec = dict(self.spec, template='template.pptx')
+
+    def time_toPPTTC(self, chart_type, slides):
+        databricksppt.toPPTTC(self.ppttc_spec, io.StringIO())
+
+    def peakmem_toPPTTC(self, chart_type, slides):
+        databricksppt.toPPTTC(self.ppttc_spec, io.StringIO())
+
+    def time_toPPT_and_save(self, chart_type, slides):
+        render(self.spec).save(io.BytesIO())
+
+
+class LazySlides:
+    """
+    Peak memory of a deck whose data is loaded up front or slide by slide.
+    The charts are downsampled and keep no workbook, so the data rather than
+    the deck is most of the memory
+    """
+
+    params = [False, True]
+    param_names = ['lazy']
+
+    def setup(self, lazy):
+        self.lazy = lazy
+
+    def spec(self):
+        def load(seed):
+            return lambda: make_frame(ROWS * 100, labels=False, seed=seed)
+
+        def slides():
+            for num in range(20):
+                data = load(num) if self.lazy else load(num)()
+                yield dict(title='Slide {}'.format(num), layout_num=1, charts=[
+                    dict(data=data, chart_type='Line', placeholder_num=2, transpose=True,
+                         max_points=100, embed_workbook='none')])
+
+        return dict(slides=slides() if self.lazy else list(slides()))
+
+    def time_toPPT(self, lazy):
+        render(self.spec())
+
+    def peakmem_toPPT(self, lazy):
+        render(self.spec())
+
+
+class ArrayChartData:
+    """Chart XML from python-pptx's chart data against the array-backed kind"""
+
+    params = (['python-pptx', 'array'], [1000, 100000])
+    param_names = ['chart_data', 'rows']
+
+    def setup(self, chart_data, rows):
+        values = make_frame(rows, 4, labels=False).to_numpy(copy=True)
+        values[::10, 0] = np.nan
+        if chart_data == 'array':
+            self.chart_data = ArrayCategoryChartData()
+            self.chart_data.categories = pd.date_range('2000-01-01', periods=rows, freq='h')
+            for num, column in enumerate(values.T):
+                self.chart_data.add_series('Series {}'.format(num), column)
+        else:
+            self.chart_data = CategoryChartData()
+            self.chart_data.categories = pd.date_range('2000-01-01', periods=rows, freq='h').tolist()
+            for num, column in enumerate(values.T):
+                # python-pptx writes NaN as 'nan'; None is its gap
+                self.chart_data.add_series('Series {}'.format(num),
+                                           [None if value != value else value
+                                            for value in column.tolist()])
+
+    def time_xml_bytes(self, chart_data, rows):
+        self.chart_data.xml_bytes(XL_CHART_TYPE.LINE)
+
+    def peakmem_xml_bytes(self, chart_data, rows):
+        self.chart_data.xml_bytes(XL_CHART_TYPE.LINE)
+
+
+class CompressDeck:
+    """
+    savePPT's wall time against the size of the package it writes, by
+    deflate level, with the embedded workbooks deflated again or stored,
+    on one thread or the default pool. SaveDeck.time_save is python-pptx's
+    own save
+    """
+
+    params = ([1, 6, 9], [False, True], [1, None])
+    param_names = ['compresslevel', 'store_compressed', 'max_workers']
+
+    deck = None
+
+    def setup(self, compresslevel, store_compressed, max_workers):
+        if CompressDeck.deck is None:
+            CompressDeck.deck = render(presentation(
+                [dict(data=[make_frame(ROWS * 10)], chart_type='Line', transpose=True)], 10))
+
+    def save(self, compresslevel, store_compressed, max_workers):
+        output = io.BytesIO()
+        databricksppt.savePPT(self.deck, output, compresslevel=compresslevel,
+                              store_compressed=store_compressed, max_workers=max_workers)
+        return output
+
+    def time_save(self, *params):
+        self.save(*params)
+
+    def track_size(self, *params):
+        return len(self.save(*params).getvalue())
+
+    track_size.unit = 'bytes'
+
+
+class TemplateClone:
+    """
+    A new deck from a template: parsed from the file, deep-copied from a
+    parsed one, or cloned by TemplateCache, which copies only the parts a
+    deck changes
+    """
+
+    params = (['parse', 'deepcopy', 'cache'], ['default', 'bundled'])
+    param_names = ['method', 'template']
+
+    def setup(self, method, template):
+        self.template = None
+        if template == 'bundled':
+            self.template = str(getattr(databricksppt, '__get_datafile_name')('template.pptx'))
+        self.parsed = Presentation(self.template)
+        self.cache = TemplateCache()
+        self.cache.get(self.template)
+
+    def time_new_deck(self, method, template):
+        if method == 'parse':
+            Presentation(self.template)
+        elif method == 'deepcopy':
+            copy.deepcopy(self.parsed)
+        else:
+            self.cache.get(self.template)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""
+Runs the asv-style benchmarks in benchmarks.py without asv, printing the best
+wall time of each time_* method, the peak traced allocation of each
+peakmem_* method and the value each track_* method returns.
+"""
+
+import argparse
+import inspect
+import itertools
+import sys
+import timeit
+import tracemalloc
+
+import benchmarks
+
+
+def cases(suite, pattern=None):
+    """Yields (name, class, method name, params) for every benchmark"""
+    for class_name, cls in inspect.getmembers(suite, inspect.isclass):
+        if cls.__module__ != suite.__name__:
+            continue
+        params = getattr(cls, 'params', [])
+        if len(params) > 0 and not isinstance(params, tuple):
+            params = (params,)
+        for method in sorted(dir(cls)):
+            if not method.startswith(('time_', 'peakmem_', 'track_')):
+                continue
+            for combination in itertools.product(*params):
+                name = '{}.{}({})'.format(class_name, method,
+                                          ', '.join(map(repr, combination)))
+                if pattern is None or pattern in name:
+                    yield name, cls, method, combination
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-b', '--bench', help='only run benchmarks whose name contains this')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='timings to take the best of')
+    args = parser.parse_args(argv)
+
+    for name, cls, method, combination in cases(benchmarks, args.bench):
+        instance = cls()
+        try:
+            if hasattr(instance, 'setup'):
+                instance.setup(*combination)
+        except NotImplementedError as e:
+            print('{:<60} skipped: {}'.format(name, e))
+            continue
+
+        fn = getattr(instance, method)
+        if method.startswith('time_'):
+            seconds = min(timeit.repeat(lambda: fn(*combination),
+                                        number=1, repeat=args.repeat))
+            print('{:<60} {:>10.4f} s'.format(name, seconds))
+        elif method.startswith('track_'):
+            print('{:<60} {:>10} {}'.format(name, fn(*combination), getattr(fn, 'unit', '')))
+        else:
+            peak = peak_memory(lambda: fn(*combination))
+            print('{:<60} {:>10.1f} MiB'.format(name, peak / 1024 / 1024))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
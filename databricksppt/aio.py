@@ -0,0 +1,110 @@
+"""
+Awaitable variants of toPPT, savePPT and toBase64URL for async callers,
+such as web services and notebooks, whose event loop must not stall for the
+seconds a deck can take.
+
+The work runs on an AsyncRenderer's worker threads, whose number is the most
+decks built or saved at once; further calls wait their turn without holding
+up the loop. Cancelling a call that has not started yet drops it. Cancelling
+a toPPT already under way stops it before its next slide. A save already
+under way runs to the end, because a half-written package is no use.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .databricksppt import toPPT, savePPT, toBase64URL
+
+
+DEFAULT_CONCURRENCY = 4
+
+
+class AsyncRenderer(object):
+    """
+    Runs toPPT, savePPT and toBase64URL for coroutines, at most
+    *max_concurrency* at a time, on its own threads or on *executor* (a
+    thread pool; decks do not pickle, so not a process pool)
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, executor=None):
+        self.max_concurrency = max_concurrency
+        self._executor = executor
+        self._own_executor = executor is None
+        self._futures = set()
+        if executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_concurrency, thread_name_prefix='databricksppt')
+
+    async def toPPT(self, presentation, **kwargs):
+        """
+        toPPT(presentation, **kwargs), awaited. Takes the same presentation
+        dict and returns the same Presentation or error string
+        """
+        cancel = threading.Event()
+        try:
+            return await self._run(functools.partial(
+                toPPT, presentation, cancel=cancel, **kwargs))
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    async def savePPT(self, pres, output, profiler=None, **kwargs):
+        await self._run(functools.partial(savePPT, pres, output, profiler=profiler, **kwargs))
+
+    async def toBase64URL(self, pres, **kwargs):
+        return await self._run(functools.partial(toBase64URL, pres, **kwargs))
+
+    async def _run(self, fn):
+        future = self._executor.submit(fn)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return await asyncio.wrap_future(future)
+
+    def close(self, wait=True):
+        """
+        Stops the worker threads, if they are the renderer's own, dropping
+        the calls that have not started
+        """
+        if self._own_executor:
+            for future in list(self._futures):
+                future.cancel()
+            self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_event_loop().run_in_executor(None, self.close)
+
+
+__default_renderer = None
+__default_lock = threading.Lock()
+
+
+def default_renderer():
+    """The AsyncRenderer used when none is given, made on first use"""
+    global __default_renderer
+    with __default_lock:
+        if __default_renderer is None:
+            __default_renderer = AsyncRenderer()
+        return __default_renderer
+
+
+async def toPPT_async(presentation, renderer=None, **kwargs):
+    """
+    Awaitable toPPT: builds the deck on *renderer* (by default one shared
+    AsyncRenderer) without blocking the event loop. *kwargs* are toPPT's
+    """
+    return await (renderer or default_renderer()).toPPT(presentation, **kwargs)
+
+
+async def savePPT_async(pres, output, renderer=None, profiler=None, **kwargs):
+    """Awaitable savePPT; *kwargs* are savePPT's compression options"""
+    await (renderer or default_renderer()).savePPT(pres, output, profiler, **kwargs)
+
+
+async def toBase64URL_async(pres, renderer=None, **kwargs):
+    """Awaitable toBase64URL"""
+    return await (renderer or default_renderer()).toBase64URL(pres, **kwargs)
@@ -0,0 +1,178 @@
+"""
+Builds decks from a declarative JSON or YAML spec: the presentation dicts
+toPPT takes, with data given by file rather than as DataFrames. Each data
+file is read once however many charts use it, and every deck is rendered in
+the same process, so templates are parsed once too.
+
+A spec is one deck, or several under 'decks', each with an 'output' path::
+
+    data:
+      sales: sales.csv
+      costs: {path: costs.parquet, options: {columns: [Region, Cost]}}
+    decks:
+      - output: sales.pptx
+        template: template.pptx
+        slides:
+          - title: Sales
+            charts:
+              - {data: sales, chart_type: Column, placeholder_num: 2}
+              - {data: [sales, costs], chart_type: XY-Scatter}
+
+Chart data is a name from 'data', a file path, or a list of either. Paths
+are relative to the spec file. Top-level keys other than 'data' and
+'decks' are defaults for every deck; a deck with 'incremental: true' is
+rebuilt from its previous output (see toPPT's *previous*).
+"""
+
+import copy
+import json
+from os import path
+
+import pandas as pd
+
+from .databricksppt import toPPT, savePPT
+
+
+# Keys of a deck that are not part of the presentation dict
+_DECK_KEYS = ['output', 'incremental']
+
+
+class SpecError(Exception):
+    """The spec is malformed, or names data that cannot be read"""
+
+
+def load_spec(spec_file):
+    """Reads a JSON (.json) or YAML (anything else) spec file"""
+    with open(spec_file) as stream:
+        if path.splitext(spec_file)[1].lower() == '.json':
+            return json.load(stream)
+
+        try:
+            import yaml
+        except ImportError:
+            raise SpecError('PyYAML is needed to read YAML specs; '
+                            'install it or write the spec as JSON')
+        return yaml.safe_load(stream)
+
+
+def read_data(data_file, options=None):
+    """
+    Reads a CSV, Parquet, Feather/Arrow IPC or JSON file into a DataFrame,
+    passing *options* on to the pandas reader
+    """
+    options = dict(options or {})
+    extension = path.splitext(data_file)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(data_file, **options)
+    if extension in ['.parquet', '.pq']:
+        return pd.read_parquet(data_file, **options)
+    if extension in ['.feather', '.arrow', '.ipc']:
+        return pd.read_feather(data_file, **options)
+    if extension == '.json':
+        return pd.read_json(data_file, **options)
+
+    raise SpecError('Unknown data file type {}'.format(data_file))
+
+
+class DataCache(object):
+    """
+    Reads each data file once, by name (from the spec's 'data' section) or
+    by path, and hands out the same DataFrame to every chart using it
+    """
+
+    def __init__(self, sources, base_dir):
+        self._sources = sources or {}
+        self._base_dir = base_dir
+        self._frames = {}
+        self.reads = 0
+
+    def get(self, reference):
+        source = self._sources.get(reference, reference)
+        if isinstance(source, dict):
+            data_file, options = source.get('path'), source.get('options')
+        else:
+            data_file, options = source, None
+        if not isinstance(data_file, str):
+            raise SpecError('Data {!r} is neither a data name nor a file'.format(reference))
+
+        data_file = path.join(self._base_dir, data_file)
+        key = (path.abspath(data_file), json.dumps(options, sort_keys=True, default=str))
+        if key not in self._frames:
+            if not path.isfile(data_file):
+                raise SpecError('Data file {} not found'.format(data_file))
+            self._frames[key] = read_data(data_file, options)
+            self.reads += 1
+
+        return self._frames[key]
+
+
+def presentations(spec, base_dir='.', cache=None):
+    """
+    Returns (presentation dict, output path, incremental) for each deck in
+    *spec*, with every chart's data read through *cache* (a DataCache, or
+    anything else with a get(reference) method). The output is None for a
+    deck without one
+    """
+    if not isinstance(spec, dict):
+        raise SpecError('The spec must be a mapping')
+    if cache is None:
+        cache = DataCache(spec.get('data'), base_dir)
+
+    defaults = {key: value for key, value in spec.items() if key not in ['data', 'decks']}
+    decks = spec.get('decks')
+    if decks is None:
+        decks = [{}]
+
+    results = []
+    for num, deck in enumerate(decks):
+        # The spec is left as it is; only the copies get data filled in
+        deck = copy.deepcopy(dict(defaults, **deck))
+        output = deck.get('output')
+        if output is not None:
+            output = path.join(base_dir, output)
+        if not isinstance(deck.get('slides'), list):
+            raise SpecError('Deck {} has no list of slides'.format(num + 1))
+
+        presentation = {key: value for key, value in deck.items() if key not in _DECK_KEYS}
+        if isinstance(presentation.get('template'), str):
+            presentation['template'] = path.join(base_dir, presentation['template'])
+        for slide in presentation['slides']:
+            for chart in slide.get('charts', []):
+                data = chart.get('data')
+                if isinstance(data, list):
+                    chart['data'] = [cache.get(reference) for reference in data]
+                else:
+                    chart['data'] = cache.get(data)
+
+        results.append((presentation, output, deck.get('incremental', False)))
+
+    return results
+
+
+def build(spec_file, max_workers=None, profiler=None, compresslevel=None,
+          store_compressed=False):
+    """
+    Renders every deck in *spec_file* and saves it to its output, with
+    *compresslevel* and *store_compressed* as for savePPT. Returns (output
+    path, error string or None) for each deck
+    """
+    spec = load_spec(spec_file)
+    results = []
+    decks = presentations(spec, path.dirname(spec_file))
+    for num, (presentation, output, incremental) in enumerate(decks):
+        if output is None:
+            raise SpecError('Deck {} has no output'.format(num + 1))
+
+    for presentation, output, incremental in decks:
+        previous = output if incremental and path.isfile(output) else None
+        ppt = toPPT(presentation, max_workers=max_workers, profiler=profiler,
+                    previous=previous, fingerprint=incremental)
+        if isinstance(ppt, str):
+            results.append((output, ppt))
+            continue
+
+        savePPT(ppt, output, profiler=profiler, compresslevel=compresslevel,
+                store_compressed=store_compressed)
+        results.append((output, None))
+
+    return results
@@ -0,0 +1,426 @@
+"""
+Chart data for python-pptx's add_chart (and replace_data) that keeps each
+series as a NumPy array instead of a data point object per value. The
+numbers and category labels cached in the chart XML are formatted a whole
+series at a time, with pyarrow where it is installed, and missing or
+infinite values are left out as gaps rather than written as 'nan'.
+"""
+
+import datetime
+import re
+from collections.abc import Iterator
+from numbers import Number
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+from pptx.chart.data import (
+    BubbleChartData, BubbleDataPoint, BubbleSeriesData, Categories, Category,
+    CategoryChartData, CategoryDataPoint, CategorySeriesData, XyChartData,
+    XyDataPoint, XySeriesData)
+from pptx.chart.xmlwriter import ChartXmlWriter
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+
+# A c:pt element as python-pptx lays it out, so that only the points differ
+_PT_OPEN = '                <c:pt idx="'
+_PT_VALUE = '">\n                  <c:v>'
+_PT_CLOSE = '</c:v>\n                </c:pt>\n'
+_PT = _PT_OPEN + '{}' + _PT_VALUE + '{}' + _PT_CLOSE
+
+# The single point python-pptx writes for a series' values or categories
+# while the chart XML is laid out, and which their c:pt elements replace,
+# however it is indented
+_MARKER = '\x00{}\x00'
+_MARKER_PT = re.compile(
+    r'[ \t]*<c:pt idx="0">\s*<c:v>\x00([0-9]+)\x00</c:v>\s*</c:pt>[ \t]*\n?')
+
+_DATE_FORMAT = r'yyyy\-mm\-dd'
+_EXCEL_EPOCH = np.datetime64('1899-12-31', 'D')
+
+
+class _ArrayChartData(object):
+    """Lays out the chart XML of the array-backed chart data types"""
+
+    _points = None
+
+    def _xml(self, chart_type):
+        self._points = []
+        try:
+            xml = ChartXmlWriter(chart_type, self).xml
+            points = self._points
+        finally:
+            self._points = None
+
+        xml = _MARKER_PT.sub(lambda match: points[int(match.group(1))], xml)
+        if '\x00' in xml:
+            raise ValueError('The chart XML has points that were not written out')
+        return xml
+
+    def _series_values(self, values):
+        """What a series gives for *values*: a stand-in while writing XML"""
+        if self._points is None:
+            return _cells(values)
+        return self._stand_in(_number_pt_xml(values), len(values))
+
+    def _stand_in(self, pt_xml, count, source=None):
+        self._points.append(pt_xml)
+        return _Points(len(self._points) - 1, count, source)
+
+
+class ArrayCategoryChartData(_ArrayChartData, CategoryChartData):
+    """
+    CategoryChartData keeping each series' values as an array. Categories
+    can be given as any sequence of labels, a Series or an Index, and keep
+    its dtype
+    """
+
+    def add_series(self, name, values=(), number_format=None):
+        series_data = ArrayCategorySeriesData(self, name, number_format, values)
+        self.append(series_data)
+        return series_data
+
+    def add_series_rows(self, names, values, number_format=None):
+        """
+        Adds a series named from *names* for each row of the 2-D *values*,
+        which are made numbers once for the lot rather than row by row
+        """
+        for name, row in zip(names, _as_numbers(values)):
+            self.add_series(name, row, number_format)
+
+    @property
+    def categories(self):
+        if getattr(self, '_categories', None) is None:
+            self._categories = ArrayCategories()
+        return self._categories
+
+    @categories.setter
+    def categories(self, category_labels):
+        self._categories = ArrayCategories(category_labels)
+
+
+class ArrayXyChartData(_ArrayChartData, XyChartData):
+    """XyChartData keeping the X and Y values of each series as arrays"""
+
+    def add_series(self, name, number_format=None, x_values=(), y_values=()):
+        series_data = ArrayXySeriesData(self, name, number_format, x_values, y_values)
+        self.append(series_data)
+        return series_data
+
+
+class ArrayBubbleChartData(_ArrayChartData, BubbleChartData):
+    """BubbleChartData keeping the X and Y values and bubble sizes as arrays"""
+
+    def add_series(self, name, number_format=None, x_values=(), y_values=(),
+                   bubble_sizes=()):
+        series_data = ArrayBubbleSeriesData(
+            self, name, number_format, x_values, y_values, bubble_sizes)
+        self.append(series_data)
+        return series_data
+
+
+class ArrayCategories(Categories):
+    """
+    Single-level categories held as a pandas Index of their labels. Category
+    objects are only made if asked for one
+    """
+
+    def __init__(self, labels=()):
+        super(ArrayCategories, self).__init__()
+        if isinstance(labels, Iterator):
+            labels = list(labels)
+        self._labels = pd.Index(labels, tupleize_cols=False)
+        self._pt_xml = None
+
+    def __getitem__(self, idx):
+        if len(self._categories) != len(self._labels):
+            self._categories = [Category(label, self) for label in self._labels.tolist()]
+        return self._categories[idx]
+
+    def __len__(self):
+        return len(self._labels)
+
+    def add_category(self, label):
+        self._labels = self._labels.append(pd.Index([label], dtype=object, tupleize_cols=False))
+        self._pt_xml = None
+        return self[-1]
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def are_dates(self):
+        return self._kind == 'date'
+
+    @property
+    def are_numeric(self):
+        return self._kind in ['date', 'number']
+
+    @property
+    def depth(self):
+        return 1 if len(self._labels) else 0
+
+    @property
+    def leaf_count(self):
+        return len(self._labels)
+
+    @property
+    def levels(self):
+        labels = self._labels.astype(object)
+        yield list(enumerate(labels.where(labels.notna(), None).tolist()))
+
+    @property
+    def number_format(self):
+        if self._number_format is not None:
+            return self._number_format
+        return _DATE_FORMAT if self.are_dates else 'General'
+
+    @number_format.setter
+    def number_format(self, value):
+        self._number_format = value
+
+    def pt_xml(self):
+        """The c:pt elements of the labels, written once for every series"""
+        if self._pt_xml is None:
+            self._pt_xml = self._labels_pt_xml()
+        return self._pt_xml
+
+    @property
+    def _kind(self):
+        """
+        'date', 'number' or 'text', going by the first label like python-pptx
+        does, or None without labels
+        """
+        if len(self._labels) == 0:
+            return None
+        kind = self._labels.dtype.kind
+        if kind == 'M':
+            return 'date'
+        if kind in 'biuf':
+            return 'number'
+        first = self._labels[0]
+        if isinstance(first, (datetime.date, datetime.datetime)):
+            return 'date'
+        if isinstance(first, Number):
+            return 'number'
+        return 'text'
+
+    def _labels_pt_xml(self):
+        kind = self._kind
+        if kind is None:
+            return ''
+
+        if kind == 'date':
+            dates = pd.to_datetime(self._labels, errors='coerce')
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+            dates = dates.to_numpy().astype('datetime64[D]')
+            days = (dates - _EXCEL_EPOCH).astype(float)
+            days[np.isnat(dates)] = np.nan
+            # Excel counts 29 February 1900, which never was
+            days[days > 59] += 1
+            return _number_pt_xml(days)
+
+        if kind == 'number':
+            return _number_pt_xml(_as_numbers(pd.to_numeric(self._labels, errors='coerce')))
+
+        present = self._labels.notna()
+        return _pt_xml(np.flatnonzero(present), _label_text(self._labels[present]))
+
+
+class ArrayCategorySeriesData(CategorySeriesData):
+    """A category chart series whose values are an array"""
+
+    def __init__(self, chart_data, name, number_format, values=()):
+        super(ArrayCategorySeriesData, self).__init__(chart_data, name, number_format)
+        self._values = _as_numbers(values)
+
+    def __getitem__(self, index):
+        return CategoryDataPoint(self, _cells(self._values[[index]])[0], None)
+
+    def __len__(self):
+        return len(self._values)
+
+    def add_data_point(self, value, number_format=None):
+        self._values = np.append(self._values, _as_numbers([value]))
+        return self[-1]
+
+    @property
+    def array(self):
+        return self._values
+
+    @property
+    def categories(self):
+        categories = self._chart_data.categories
+        if self._chart_data._points is None:
+            return categories
+        return self._chart_data._stand_in(categories.pt_xml(), categories.leaf_count, categories)
+
+    @property
+    def values(self):
+        return self._chart_data._series_values(self._values)
+
+
+class ArrayXySeriesData(XySeriesData):
+    """An XY chart series whose X and Y values are arrays"""
+
+    def __init__(self, chart_data, name, number_format, x_values=(), y_values=()):
+        super(ArrayXySeriesData, self).__init__(chart_data, name, number_format)
+        self._x_values = _as_numbers(x_values)
+        self._y_values = _as_numbers(y_values)
+        if len(self._x_values) != len(self._y_values):
+            raise ValueError('Series {} has {} X values and {} Y values'.format(
+                name, len(self._x_values), len(self._y_values)))
+
+    def __getitem__(self, index):
+        x, y = (_cells(values[[index]])[0] for values in [self._x_values, self._y_values])
+        return XyDataPoint(self, x, y, None)
+
+    def __len__(self):
+        return len(self._x_values)
+
+    def add_data_point(self, x, y, number_format=None):
+        self._x_values = np.append(self._x_values, _as_numbers([x]))
+        self._y_values = np.append(self._y_values, _as_numbers([y]))
+        return self[-1]
+
+    @property
+    def x_array(self):
+        return self._x_values
+
+    @property
+    def y_array(self):
+        return self._y_values
+
+    @property
+    def x_values(self):
+        return self._chart_data._series_values(self._x_values)
+
+    @property
+    def y_values(self):
+        return self._chart_data._series_values(self._y_values)
+
+
+class ArrayBubbleSeriesData(ArrayXySeriesData, BubbleSeriesData):
+    """A bubble chart series whose X and Y values and bubble sizes are arrays"""
+
+    def __init__(self, chart_data, name, number_format, x_values=(), y_values=(),
+                 bubble_sizes=()):
+        super(ArrayBubbleSeriesData, self).__init__(
+            chart_data, name, number_format, x_values, y_values)
+        self._bubble_sizes = _as_numbers(bubble_sizes)
+        if len(self._bubble_sizes) != len(self._x_values):
+            raise ValueError('Series {} has {} X values and {} bubble sizes'.format(
+                name, len(self._x_values), len(self._bubble_sizes)))
+
+    def __getitem__(self, index):
+        x, y, size = (_cells(values[[index]])[0] for values in
+                      [self._x_values, self._y_values, self._bubble_sizes])
+        return BubbleDataPoint(self, x, y, size, None)
+
+    def add_data_point(self, x, y, size, number_format=None):
+        self._bubble_sizes = np.append(self._bubble_sizes, _as_numbers([size]))
+        return super(ArrayBubbleSeriesData, self).add_data_point(x, y)
+
+    @property
+    def bubble_size_array(self):
+        return self._bubble_sizes
+
+    @property
+    def bubble_sizes(self):
+        return self._chart_data._series_values(self._bubble_sizes)
+
+
+class _Points(object):
+    """
+    Stands in for *count* values or category labels while python-pptx's
+    writers lay out the chart XML. It iterates as one point, whose value or
+    label is the marker of the c:pt elements that replace it. Anything else
+    is looked up on *source*, the categories it stands in for
+    """
+
+    def __init__(self, number, count, source=None):
+        self.label = _MARKER.format(number)
+        self._count = count
+        self._source = source
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        if self._count:
+            yield self
+
+    def __str__(self):
+        return self.label
+
+    def numeric_str_val(self, date_1904=False):
+        return self.label
+
+    def __getattr__(self, name):
+        return getattr(self._source, name)
+
+
+def _as_numbers(values):
+    """
+    *values* as an integer or float array of the same shape, with NaN for
+    missing values
+    """
+    if isinstance(values, Iterator):
+        values = list(values)
+    array = np.asarray(values)
+    if array.dtype.kind in 'iu':
+        return array
+    if array.dtype.kind == 'b':
+        return array.astype(np.int64)
+    if array.dtype.kind == 'f':
+        return array.astype(float, copy=False)
+    numbers = pd.Series(array.ravel(), dtype=object).to_numpy(dtype=float, na_value=np.nan)
+    return numbers.reshape(array.shape)
+
+
+def _cells(values):
+    """*values* as the list the workbook writers take, with None for gaps"""
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    cells = values.astype(object)
+    cells[~np.isfinite(values)] = None
+    return cells.tolist()
+
+
+def _number_pt_xml(values):
+    if values.dtype.kind != 'f':
+        return _pt_xml(np.arange(len(values)), _number_text(values))
+    present = np.isfinite(values)
+    return _pt_xml(np.flatnonzero(present), _number_text(values[present]))
+
+
+def _number_text(values):
+    if pa is None:
+        return list(map(str, values.tolist()))
+    return pc.cast(pa.array(values), pa.string())
+
+
+def _label_text(labels):
+    labels = labels.astype(str).tolist()
+    if pa is None:
+        return [escape(label) for label in labels]
+    text = pa.array(labels, pa.string())
+    for char, entity in [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;')]:
+        text = pc.replace_substring(text, char, entity)
+    return text
+
+
+def _pt_xml(positions, text):
+    """The c:pt elements putting each of *text* at the index in *positions*"""
+    if pa is None:
+        return ''.join(map(_PT.format, positions.tolist(), text))
+    pts = pc.binary_join_element_wise(
+        _PT_OPEN, pc.cast(pa.array(positions), pa.string()), _PT_VALUE, text, _PT_CLOSE, '')
+    return ''.join(pts.to_pylist())
@@ -1,16 +1,74 @@
 """Console script for databricksppt."""
 import sys
+from os import path
 import click
 
 
-@click.command()
-def main(args=None):
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(ctx, args=None):
     """Console script for databricksppt."""
+    if ctx.invoked_subcommand is not None:
+        return 0
+
     click.echo("Replace this message by putting your code into "
                "databricksppt.cli.main")
     click.echo("See click documentation at https://click.palletsprojects.com/")
     return 0
 
 
+@main.command()
+@click.argument('spec', type=click.Path(exists=True, dir_okay=False, resolve_path=True))
+@click.option('--max-workers', type=int, help='Threads preparing the charts of each deck')
+@click.option('--profile', type=int, metavar='N', help='Print the time spent per stage and the N most expensive charts')
+@click.option('--compress-level', type=click.IntRange(0, 9), help='Deflate level of the saved decks, 0-9 (default = 6)')
+@click.option('--store-compressed', is_flag=True, help='Store embedded workbooks, images and other compressed parts without deflating them again')
+def build(spec, max_workers, profile, compress_level, store_compressed):
+    """Renders every deck in a JSON or YAML deck SPEC in one process"""
+    from .build import SpecError, build as build_decks
+    from .profiler import ProfileSummary
+
+    profiler = None if profile is None else ProfileSummary(trace_memory=True)
+    try:
+        results = build_decks(spec, max_workers=max_workers, profiler=profiler,
+                              compresslevel=compress_level, store_compressed=store_compressed)
+    except SpecError as e:
+        raise click.ClickException(str(e))
+    finally:
+        if profiler is not None:
+            profiler.close()
+
+    failed = False
+    for output, error in results:
+        if error is None:
+            click.echo('Wrote {}'.format(output))
+        else:
+            failed = True
+            click.echo('Failed to build {}: {}'.format(output, error), err=True)
+
+    if profiler is not None:
+        profiler.print_top(profile)
+
+    if failed:
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='Listen on this Unix socket')
+@click.option('--port', type=int, default=8765, help='Listen on this localhost port, if not on a socket (default = 8765)')
+@click.option('--workers', type=int, default=2, help='Requests rendered at once (default = 2)')
+@click.option('--queue', 'queue_size', type=int, default=16, help='Requests waiting for a worker before the server answers busy (default = 16)')
+@click.option('--preload', type=click.Path(exists=True, dir_okay=False, resolve_path=True), multiple=True, help='Template to parse at startup; may be repeated')
+@click.option('--root', type=click.Path(exists=True, file_okay=False, resolve_path=True), help='Directory requests may read templates from and write decks to (default = the current directory)')
+def serve(socket_path, port, workers, queue_size, preload, root):
+    """Serves render requests, keeping modules imported and templates parsed"""
+    from .client import SERVER_ENV
+    from .server import serve as serve_requests
+
+    address = 'unix:' + path.abspath(socket_path) if socket_path else '127.0.0.1:{}'.format(port)
+    click.echo('Serving on {}; set {}={} to have the CLI use it'.format(address, SERVER_ENV, address))
+    serve_requests(address, workers=workers, queue_size=queue_size, preload=preload, root=root)
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
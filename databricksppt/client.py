@@ -0,0 +1,158 @@
+"""
+Client side of `databricksppt serve`. Only the standard library is imported
+here, so a command forwarding to a running server does not pay for pandas or
+python-pptx.
+
+A render request is an HTTP POST to /render whose body is one line of JSON,
+{"spec": ..., "payloads": [{"name", "format", "length"}, ...]}, followed by
+the payloads themselves, back to back. The spec is a deck spec as for
+`databricksppt build`, with chart data naming payloads instead of files;
+payload formats are 'csv', 'parquet' and 'arrow' (IPC stream or file).
+"""
+
+import http.client
+import io
+import json
+import os
+import socket
+from urllib.parse import urlsplit
+
+
+# Where the CLI looks for a running server, as 'unix:/path/to/socket' or
+# 'http://127.0.0.1:port'
+SERVER_ENV = 'DATABRICKSPPT_SERVER'
+
+REQUEST_TYPE = 'application/x-databricksppt-render'
+PPTX_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+
+class ServerUnavailable(Exception):
+    """Nothing is listening at the server address"""
+
+
+class RenderError(Exception):
+    """The server could not render the request; the message says why"""
+
+
+def server_address():
+    """The server address from the environment, or None"""
+    return os.environ.get(SERVER_ENV) or None
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def _connect(address, timeout=None):
+    if address.startswith('unix:'):
+        return _UnixHTTPConnection(address[len('unix:'):], timeout)
+
+    if '://' not in address:
+        address = 'http://' + address
+    parts = urlsplit(address)
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+
+
+def request_body(spec, payloads):
+    """
+    Frames *spec* and *payloads*, a list of (name, format, bytes), as a
+    render request body
+    """
+    header = dict(spec=spec, payloads=[
+        dict(name=name, format=data_format, length=len(data))
+        for name, data_format, data in payloads])
+    return b''.join([json.dumps(header).encode('utf-8'), b'\n'] +
+                    [data for name, data_format, data in payloads])
+
+
+def render(address, spec, payloads, timeout=None):
+    """
+    Sends a render request to the server at *address*. Returns the deck as
+    bytes if the spec's deck has no output, otherwise the list of output
+    paths the server wrote. Raises ServerUnavailable if nothing is listening
+    and RenderError if the server could not render it
+    """
+    connection = _connect(address, timeout)
+    try:
+        try:
+            connection.request('POST', '/render', body=request_body(spec, payloads),
+                               headers={'Content-Type': REQUEST_TYPE})
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            raise ServerUnavailable('No server at {}: {}'.format(address, e))
+        response = connection.getresponse()
+        body = response.read()
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        try:
+            message = json.loads(body.decode('utf-8'))['error']
+        except (ValueError, KeyError):
+            message = body.decode('utf-8', 'replace')
+        raise RenderError(message)
+
+    if response.getheader('Content-Type') == PPTX_TYPE:
+        return body
+    return json.loads(body.decode('utf-8'))['outputs']
+
+
+def frame_payload(dataframe):
+    """
+    (format, bytes) for sending a DataFrame or pyarrow Table: Arrow IPC when
+    pyarrow is installed, otherwise CSV
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return 'csv', dataframe.to_csv(index=False).encode('utf-8')
+
+    if not isinstance(dataframe, (pa.Table, pa.RecordBatch)):
+        dataframe = pa.Table.from_pandas(dataframe, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, dataframe.schema) as writer:
+        writer.write(dataframe)
+    return 'arrow', sink.getvalue()
+
+
+def toPPT_remote(address, presentation, output=None, timeout=None):
+    """
+    Renders a presentation dict, as toPPT takes it, on the server at
+    *address*. Each distinct DataFrame is sent once. Returns the deck as
+    bytes, or the path the server saved it to if *output* is given
+    """
+    payloads = []
+    names = {}
+
+    def reference(dataframe):
+        if id(dataframe) not in names:
+            names[id(dataframe)] = 'data{}'.format(len(names) + 1)
+            payloads.append((names[id(dataframe)],) + frame_payload(dataframe))
+        return names[id(dataframe)]
+
+    deck = {key: value for key, value in presentation.items() if key != 'slides'}
+    deck['slides'] = []
+    for slide in presentation.get('slides'):
+        charts = []
+        for chart in slide.get('charts'):
+            chart = dict(chart)
+            data = chart.get('data')
+            if isinstance(data, (list, tuple)):
+                chart['data'] = [reference(dataframe) for dataframe in data]
+            elif data is not None:
+                chart['data'] = reference(data)
+            charts.append(chart)
+        deck['slides'].append(dict(slide, charts=charts))
+    if output is not None:
+        deck['output'] = os.path.abspath(output)
+
+    result = render(address, deck, payloads, timeout)
+    return result if output is None else result[0]
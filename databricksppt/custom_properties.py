@@ -0,0 +1,75 @@
+"""Custom document properties (docProps/custom.xml) of a presentation."""
+
+from lxml import etree
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI
+
+
+_CUSTOM_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/custom-properties'
+_VT_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes'
+
+# Format id every custom property carries, as Office writes it
+_FMTID = '{D5CDD505-2E9C-101B-9397-08002B2CF9AE}'
+
+
+def get_custom_properties(ppt):
+    """Returns the custom properties of *ppt* as a dict of name to text"""
+    properties = _properties_element(ppt)
+    if properties is None:
+        return {}
+
+    return {prop.get('name'): ''.join(prop.itertext())
+            for prop in properties.iterchildren('{%s}property' % _CUSTOM_NS)}
+
+
+def set_custom_properties(ppt, values):
+    """
+    Sets each name in *values* to its text as a custom property of *ppt*,
+    or removes it where the value is None; other properties are kept
+    """
+    properties = _properties_element(ppt)
+    if properties is None:
+        properties = etree.Element('{%s}Properties' % _CUSTOM_NS,
+                                   nsmap={None: _CUSTOM_NS, 'vt': _VT_NS})
+
+    existing = {prop.get('name'): prop
+                for prop in properties.iterchildren('{%s}property' % _CUSTOM_NS)}
+    for name, value in values.items():
+        if name in existing:
+            properties.remove(existing[name])
+        if value is None:
+            continue
+
+        # Property ids start at 2 and must be unique
+        pid = max([int(prop.get('pid')) for prop in properties] + [1]) + 1
+        prop = etree.SubElement(properties, '{%s}property' % _CUSTOM_NS,
+                                fmtid=_FMTID, pid=str(pid), name=name)
+        etree.SubElement(prop, '{%s}lpwstr' % _VT_NS).text = value
+
+    blob = etree.tostring(properties, xml_declaration=True,
+                          encoding='UTF-8', standalone=True)
+    part = _properties_part(ppt)
+    if part is None:
+        package = ppt.part.package
+        part = Part(partname=PackURI('/docProps/custom.xml'),
+                    content_type=CT.OFC_CUSTOM_PROPERTIES,
+                    package=package, blob=blob)
+        package.relate_to(part, RT.CUSTOM_PROPERTIES)
+    else:
+        part.blob = blob
+
+
+def _properties_part(ppt):
+    try:
+        return ppt.part.package.part_related_by(RT.CUSTOM_PROPERTIES)
+    except KeyError:
+        return None
+
+
+def _properties_element(ppt):
+    part = _properties_part(ppt)
+    if part is None:
+        return None
+
+    return etree.fromstring(part.blob)
@@ -1,67 +1,82 @@
 from pathlib import Path
 from os import path
-from enum import Enum
 import numbers
-from collections.abc import Iterable
+from collections import deque, namedtuple
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 import io
+import os
 import base64
+import hashlib
+import json
+import pickle
+import uuid
+import weakref
+from datetime import datetime
+import zipfile
 
 from pptx import Presentation
 from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
 from pptx.chart.data import CategoryChartData, XyChartData, BubbleChartData
 from pptx.enum.shapes import PP_PLACEHOLDER
-from pptx.util import Pt
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.shapes.shapetree import SlideShapeFactory
+from pptx.util import Inches, Pt
 from itertools import islice
 import pandas as pd
 import numpy as np
-
-
-class CHART_TYPE(Enum):
-    AREA = 'Area'
-    AREA_STACKED = 'Area-Stacked'
-    AREA_STACKED_100 = 'Area-Stacked-100'
-    BAR = 'Bar'
-    BAR_STACKED = 'Bar-Stacked'
-    BAR_STACKED_100 = 'Bar-Stacked-100'
-    COLUMN = 'Column'
-    COLUMN_STACKED = 'Column-Stacked'
-    COLUMN_STACKED_100 = 'Column-Stacked-100'
-    LINE = 'Line'
-    LINE_STACKED = 'Line-Stacked'
-    LINE_STACKED_100 = 'Line-Stacked-100'
-    LINE_MARKED = 'Line-Marked'
-    LINE_MARKED_STACKED = 'Line-Marked-Stacked'
-    LINE_MARKED_STACKED_100 = 'Line-Marked-Stacked-100'
-    DOUGHNUT = 'Doughnut'
-    DOUGHNUT_EXPLODED = 'Doughnut-Exploded'
-    PIE = 'Pie'
-    PIE_EXPLODED = 'Pie-Exploded'
-    RADAR = 'Radar'
-    RADAR_FILLED = 'Radar-Filled'
-    RADAR_MARKED = 'Radar-Marked'
-    XY_SCATTER = 'XY-Scatter'
-    XY_SCATTER_LINES = 'XY-Scatter-Lines'
-    XY_SCATTER_LINES_SMOOTHED = 'XY-Scatter-Lines-Smoothed'
-    XY_SCATTER_LINES_MARKED = 'XY-Scatter-Lines-Marked'
-    XY_SCATTER_LINES_MARKED_SMOOTHED = 'XY-Scatter-Lines-Marked-Smoothed'
-    BUBBLE = 'Bubble'
-    TABLE = 'Table'
-
-
-class LEGEND_POSITION(Enum):
-    BOTTOM = 'Bottom'
-    CORNER = 'Corner'
-    LEFT = 'Left'
-    NONE = 'None'
-    RIGHT = 'Right'
-    TOP = 'Top'
-
-
-def toPPT(presentation):
-    ppt = __create_presentation(presentation)
-    if ppt is None or isinstance(ppt, str):
-        return 'Could\'t create PPT'
-
+import xlsxwriter
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from . import __version__
+from .chartdata import ArrayBubbleChartData, ArrayCategoryChartData, ArrayXyChartData
+from .custom_properties import get_custom_properties, set_custom_properties
+from .downsample import lttb_indices, minmax_indices
+from .enums import CHART_TYPE, EMBED_WORKBOOK, LEGEND_POSITION
+from .package import write_package
+from .ppttc import NULL_CELL, PPTTCWriter, cells as ppttc_cells
+from .profiler import ProfileEvent, Stopwatch
+from .template_cache import layout_index, template_cache
+
+
+def toPPT(presentation, max_workers=None, executor=None, profiler=None, previous=None,
+          cancel=None, fingerprint=False):
+    """
+    Builds a Presentation from the *presentation* dict, or returns a string
+    describing the first thing that failed. With *max_workers* above 1, or an
+    *executor* (thread or process pool), the data side of every chart (label
+    inference, transposition, chart XML and workbook) is prepared concurrently
+    first; slides and charts are still assembled, and errors reported, in
+    order.
+
+    *profiler*, if given, is called with a profiler.ProfileEvent for every
+    stage of the render, and with the totals of each chart and slide
+    (profiler.ProfileSummary collects and reports them).
+
+    With *fingerprint*, or *previous*, a fingerprint of each slide's spec
+    and data is stored in the deck's custom properties. Given the deck an
+    earlier such toPPT produced as *previous* (a path or file-like object),
+    slides whose fingerprint has not changed are carried over from it as
+    they are, and only the others are rebuilt; if the template or deck-wide
+    options changed, or a changed slide was one of the template's own
+    (slide_num), everything is rebuilt.
+
+    Once *cancel* (a threading.Event) is set, toPPT stops before the next
+    slide, dropping the charts not yet prepared, and returns
+    CANCELLED_MESSAGE.
+
+    'slides', a slide's 'charts', each chart and its 'data' may also be
+    generators or zero-argument callables. They are then evaluated only when
+    their slide is built (with a pool, one slide ahead), and a chart's
+    evaluated data is let go once the chart is in the deck, so only a slide
+    or two of data is held at a time. With *previous* every slide is
+    evaluated up front, to compare fingerprints
+    """
     slide_count = 0
     body_font = presentation.get('body_font')
     if body_font is None:
@@ -69,48 +84,922 @@ def toPPT(presentation):
             name='Verdana',
             size=10
         )
-    for slide in presentation.get('slides'):
-        if (slide.get('body_font') is None):
-            slide['body_font'] = body_font
-        slide_body_font = slide.get('body_font')
-        slide_count += 1
-        new_slide = __create_slide(ppt, slide)
-        if new_slide is None or isinstance(new_slide, str):
-            return 'Failed to create slide {}: {}'.format(slide_count, new_slide)
-
-        chart_count = 0
+    embed_workbook = presentation.get('embed_workbook')
+
+    watch = Stopwatch()
+    fingerprint = fingerprint or previous is not None
+    digest = __data_digester(fingerprint)
+    slides = presentation.get('slides')
+    lazy = __is_lazy(slides)
+    slides = (__resolve_slide(slide, body_font, embed_workbook, digest, fingerprint)
+              for slide in (slides() if callable(slides) else slides))
+    if not lazy or previous is not None:
+        slides = list(slides)
+    if fingerprint:
+        deck_fingerprint = __deck_fingerprint(presentation)
+        watch.lap('fingerprint')
+
+    reused = None
+    if previous is not None:
+        reused = __open_previous(previous, [spec.slide for spec in slides], deck_fingerprint,
+                                 [spec.fingerprint for spec in slides])
+    if reused is None:
+        ppt, layouts = __create_presentation(presentation)
+        if ppt is None or isinstance(ppt, str):
+            return 'Could\'t create PPT'
+        previous_slides = []
+        kept = None
+    else:
+        ppt, previous_slides, kept = reused
+        layouts = layout_index(ppt)
+    watch.lap('template')
+    __report_laps(profiler, watch.laps)
+
+    # What each slide spec ended up as, for the next incremental render
+    records = []
+
+    pool = executor
+    if pool is None and max_workers is not None and max_workers > 1:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    submitted = None
+    try:
+        # A lazy deck is prepared a slide at a time (one ahead, with a pool),
+        # anything else all up front
+        lookahead = (1 if pool is not None else 0) if isinstance(slides, Iterator) else len(slides)
+        workbook_parts = {}
+        # slide_num counts the slides there were before any were added,
+        # whatever table pages are inserted among them
+        existing_slides = list(ppt.slides)
+        submitted = __submit_charts(pool, slides, kept, lookahead)
+
+        for spec, prepared_charts, keep in submitted:
+            slide_count += 1
+            slide = spec.slide
+            if cancel is not None and cancel.is_set():
+                return CANCELLED_MESSAGE
+            if keep:
+                records.append(dict(fingerprint=spec.fingerprint,
+                                    slides=previous_slides[slide_count - 1]['slides'],
+                                    existing=slide.get('slide_num', 0) != 0))
+                continue
+
+            watch = Stopwatch()
+            ids_before = set(__slide_ids(ppt))
+            new_slide = __create_slide(ppt, slide, spec.charts, layouts, existing_slides)
+            if new_slide is None or isinstance(new_slide, str):
+                return 'Failed to create slide {}: {}'.format(slide_count, new_slide)
+            new_slide, targets = new_slide
+            watch.lap('create_slide')
+            # A lazy slide's spec and data were evaluated and hashed just now
+            slide_laps = (spec.laps if isinstance(slides, Iterator) else []) + watch.laps
+            __report_laps(profiler, slide_laps, slide_count)
+
+            chart_count = 0
+            for chart, resolved, (prepared_chart, source, key), target in zip(
+                    spec.specs, spec.charts, prepared_charts, targets):
+                chart_count += 1
+                watch = Stopwatch()
+                placeholder = __get_target(new_slide, slide, resolved, target)
+
+                if placeholder is None or isinstance(placeholder, str):
+                    return 'Failed to create placeholder for chart {} in slide {}: {}'.format(chart_count, slide_count, placeholder)
+                watch.lap('placeholder')
+
+                prepared_object = __shared_result(prepared_chart, source)
+                watch.restart()
+                if isinstance(prepared_object, dict) and 'points_dropped' in prepared_object['chart']:
+                    # Report back, even if the chart was prepared in another process
+                    chart['points_dropped'] = prepared_object['chart']['points_dropped']
+
+                def add_page(previous_slide, slide=slide, chart=resolved):
+                    return __add_table_page(ppt, layouts, previous_slide, slide, chart)
+
+                new_chart = __insert_object(new_slide, placeholder, prepared_object, add_page)
+                if isinstance(new_chart, str):
+                    return 'Failed to create chart {} in slide {}: {}'.format(chart_count, slide_count, new_chart)
+                if resolved is not chart:
+                    # Data evaluated here is not needed again
+                    resolved.pop('data', None)
+
+                if key is not None and prepared_object['chart_type'] is not None:
+                    __share_workbook(workbook_parts, key, new_chart)
+                watch.lap('insert')
+
+                # Stages run while preparing come first, wherever they ran
+                chart_laps = prepared_object['stages'] + watch.laps
+                __report_laps(profiler, chart_laps, slide_count, chart_count,
+                              prepared_object['rows'], prepared_object['columns'])
+                __report_total(profiler, 'chart', chart_laps, slide_count, chart_count,
+                               prepared_object['rows'], prepared_object['columns'])
+                slide_laps += chart_laps
+
+            # The slide itself, then any pages added after it
+            records.append(dict(fingerprint=spec.fingerprint, slides=[new_slide.slide_id] + [
+                slide_id for slide_id in __slide_ids(ppt)
+                if slide_id not in ids_before and slide_id != new_slide.slide_id],
+                existing=slide.get('slide_num', 0) != 0))
+            __report_total(profiler, 'slide', slide_laps, slide_count)
+    finally:
+        # Charts not started yet are dropped if the render stopped early
+        if submitted is not None:
+            submitted.close()
+        if pool is not None and executor is None:
+            pool.shutdown()
+
+    if reused is not None:
+        __arrange_slides(ppt, previous_slides, [record['slides'] for record in records])
+
+    if fingerprint:
+        __write_fingerprints(ppt, deck_fingerprint, records)
+
+    return ppt
+
+
+CANCELLED_MESSAGE = 'Rendering was cancelled'
+
+
+# Custom document properties holding the fingerprints incremental renders
+# compare against: one for the deck, and one JSON record per slide spec
+__DECK_PROPERTY = 'databricksppt.deck'
+__SLIDE_PROPERTY = 'databricksppt.slide.{}'
+
+# Keys toPPT writes back into the spec, which do not change what is drawn
+__RESULT_KEYS = ['points_dropped']
+
+
+def __deck_fingerprint(presentation):
+    """
+    Digest of everything that applies to the whole deck: the options other
+    than the slides, the template file and this package's version
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(__options_repr(presentation, ['slides']).encode('utf-8'))
+    template = presentation.get('template')
+    if isinstance(template, str) and path.isfile(template):
+        digest.update(repr((path.abspath(template), path.getmtime(template),
+                            path.getsize(template))).encode('utf-8'))
+    digest.update(__version__.encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def __slide_fingerprint(slide, charts, data_digests):
+    """
+    Digest of a slide spec, its *charts*' options and (through
+    *data_digests*) their data, or None if some data could not be hashed
+    """
+    if None in data_digests:
+        return None
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(__options_repr(slide, ['charts']).encode('utf-8'))
+    for chart, data_digest in zip(charts, data_digests):
+        digest.update(__options_repr(chart, ['data'] + __RESULT_KEYS).encode('utf-8'))
+        digest.update(data_digest.encode('ascii'))
+
+    return digest.hexdigest()
+
+
+def __options_repr(spec, leave_out):
+    return repr(sorted((str(key), repr(value)) for key, value in spec.items()
+                       if key not in leave_out))
+
+
+def __open_previous(previous, slides, deck_fingerprint, fingerprints):
+    """
+    Opens *previous* for an incremental render, returning it with the
+    records of the slides it was built from and whether each of *slides* can
+    be kept as it is; or None if there is no previous deck, or the new one
+    must be built from scratch
+    """
+    if previous is None:
+        return None
+
+    ppt = Presentation(previous)
+    properties = get_custom_properties(ppt)
+    if properties.get(__DECK_PROPERTY) != deck_fingerprint:
+        return None
+
+    previous_slides = []
+    while __SLIDE_PROPERTY.format(len(previous_slides) + 1) in properties:
+        previous_slides.append(json.loads(
+            properties[__SLIDE_PROPERTY.format(len(previous_slides) + 1)]))
+
+    present = set(__slide_ids(ppt))
+    kept = []
+    for num, fingerprint in enumerate(fingerprints):
+        kept.append(fingerprint is not None and num < len(previous_slides) and
+                    previous_slides[num]['fingerprint'] == fingerprint and
+                    all(slide_id in present for slide_id in previous_slides[num]['slides']))
+
+    # Template slides changed in place cannot be put back the way they were
+    for num, record in enumerate(previous_slides):
+        if record['existing'] and not (num < len(kept) and kept[num]):
+            return None
+    for slide, keep in zip(slides, kept):
+        if slide.get('slide_num', 0) != 0 and not keep:
+            return None
+
+    return ppt, previous_slides, kept
+
+
+def __slide_ids(ppt):
+    return [sldId.id for sldId in ppt.slides._sldIdLst]
+
+
+def __arrange_slides(ppt, previous_slides, slide_ids):
+    """
+    Puts the slides of each slide spec (*slide_ids*) where that spec's slides
+    were in the previous deck, and new ones at the end, dropping the
+    previous slides that were rebuilt or are no longer in the spec. Slides
+    that came with the template stay where they are
+    """
+    sldIdLst = ppt.slides._sldIdLst
+    elements = {sldId.id: sldId for sldId in sldIdLst}
+    owners = {slide_id: num for num, record in enumerate(previous_slides)
+              for slide_id in record['slides']}
+    current = set(slide_id for ids in slide_ids for slide_id in ids)
+
+    order = []
+    placed = set()
+    for slide_id in __slide_ids(ppt):
+        num = owners.get(slide_id)
+        if num is None:
+            if slide_id not in current:
+                order.append(slide_id)
+        elif num < len(slide_ids) and num not in placed:
+            order.extend(slide_ids[num])
+            placed.add(num)
+    for num, ids in enumerate(slide_ids):
+        if num not in placed:
+            order.extend(ids)
+
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+        if sldId.id not in order:
+            ppt.part.drop_rel(sldId.rId)
+    for slide_id in order:
+        sldIdLst.append(elements[slide_id])
+
+    # Number the slide parts in their new order, as loading a deck does
+    ppt.part.rename_slide_parts([sldId.rId for sldId in sldIdLst])
+
+
+def __write_fingerprints(ppt, deck_fingerprint, records):
+    properties = {__DECK_PROPERTY: deck_fingerprint}
+    for num, record in enumerate(records):
+        properties[__SLIDE_PROPERTY.format(num + 1)] = json.dumps(record, separators=(',', ':'))
+
+    # Drop the records of slides beyond the end of this spec
+    existing = get_custom_properties(ppt)
+    num = len(records) + 1
+    while __SLIDE_PROPERTY.format(num) in existing:
+        properties[__SLIDE_PROPERTY.format(num)] = None
+        num += 1
+
+    set_custom_properties(ppt, properties)
+
+
+def __report_laps(profiler, laps, slide=None, chart=None, rows=None, columns=None):
+    """Sends each (stage, seconds, bytes) Stopwatch lap to *profiler*"""
+    if profiler is None:
+        return
+
+    for stage, seconds, allocated in laps:
+        profiler(ProfileEvent(stage, slide, chart, seconds, rows, columns, allocated))
+
+
+def __report_total(profiler, stage, laps, slide=None, chart=None, rows=None, columns=None):
+    """Sends the sum of *laps* to *profiler* as a *stage* event"""
+    if profiler is None:
+        return
+
+    allocated = [lap[2] for lap in laps]
+    total_bytes = None if None in allocated else sum(allocated)
+    profiler(ProfileEvent(stage, slide, chart, sum(lap[1] for lap in laps),
+                          rows, columns, total_bytes))
+
+
+def __get_target(new_slide, slide, chart, target=None):
+    """
+    Finds the placeholder or chart on *new_slide* that *chart* replaces,
+    unless __create_slide already worked out its *target*
+    """
+    if target is not None:
+        return target
+
+    placeholder_num = chart.get('placeholder_num')
+    if placeholder_num is not None and placeholder_num > 0:
+        return __get_placeholder(new_slide, placeholder_num)
+
+    chart_num = slide.get('chart_num', 1)
+    return __get_chart(new_slide, chart_num)
+
+
+# A slide spec with its callables and generators evaluated: *charts* are the
+# charts to build (copies of those in *specs* whose data was evaluated here)
+_SlideSpec = namedtuple('_SlideSpec', ['slide', 'specs', 'charts', 'digests', 'fingerprint', 'laps'])
+
+
+def __is_lazy(slides):
+    """Whether any part of *slides* is to be evaluated only when it is needed"""
+    if callable(slides) or not isinstance(slides, (list, tuple)):
+        return True
+
+    for slide in slides:
+        if callable(slide) or not isinstance(slide.get('charts'), (list, tuple)):
+            return True
         for chart in slide.get('charts'):
-            if (chart.get('body_font') is None):
-                chart['body_font'] = body_font
-            chart_count += 1
-            placeholder_num = chart.get('placeholder_num')
-            if placeholder_num is not None and placeholder_num > 0:
-                placeholder = __get_placeholder(new_slide, placeholder_num)
-            else:
-                chart_num = slide.get('chart_num', 1)
-                placeholder = __get_chart(new_slide, chart_num)
+            if callable(chart) or callable(chart.get('data')) or isinstance(chart.get('data'), Iterator):
+                return True
 
-            if placeholder is None or isinstance(placeholder, str):
-                return 'Failed to create placeholder for chart {} in slide {}: {}'.format(chart_count, slide_count, placeholder)
+    return False
 
-            new_chart = __insert_object(new_slide, placeholder, chart)
-            if isinstance(new_chart, str):
-                return 'Failed to create chart {} in slide {}: {}'.format(chart_count, slide_count, new_chart)
 
-    return ppt
+def __resolve_slide(slide, body_font, embed_workbook, digest, fingerprint):
+    """
+    Evaluates whatever is lazy in *slide*, fills in the deck's defaults,
+    digests its charts' data with *digest* (see __data_digester) and, if
+    *fingerprint* is set, fingerprints it, returning a _SlideSpec
+    """
+    watch = Stopwatch()
+    slide, specs, resolved = __evaluate_slide(slide, body_font, embed_workbook)
+
+    digests = [digest(chart.get('data')) for chart in resolved]
+    slide_fingerprint = None
+    if fingerprint:
+        slide_fingerprint = __slide_fingerprint(slide, resolved, digests)
+        watch.lap('fingerprint')
+
+    return _SlideSpec(slide, specs, resolved, digests, slide_fingerprint, watch.laps)
+
+
+def __evaluate_slide(slide, body_font=None, embed_workbook=None):
+    """
+    Evaluates whatever is lazy in *slide* and fills in the deck's defaults,
+    returning the slide, its chart specs and the charts with their data
+    evaluated
+    """
+    if callable(slide):
+        slide = slide()
+    if (slide.get('body_font') is None and body_font is not None):
+        slide['body_font'] = body_font
+
+    charts = slide.get('charts', [])
+    if callable(charts):
+        charts = charts()
+
+    specs = []
+    resolved = []
+    for chart in charts:
+        if callable(chart):
+            chart = chart()
+        if (chart.get('body_font') is None and body_font is not None):
+            chart['body_font'] = body_font
+        if (chart.get('embed_workbook') is None and embed_workbook is not None):
+            chart['embed_workbook'] = embed_workbook
+
+        data = chart.get('data')
+        if callable(data):
+            data = data()
+        if isinstance(data, Iterator):
+            data = list(data)
+        # Arrow data is converted here, once, for everything after to share
+        if __is_arrow(data):
+            data = __arrow_to_dataframe(data)
+        elif isinstance(data, (list, tuple)) and any(__is_arrow(dataframe) for dataframe in data):
+            data = [__arrow_to_dataframe(dataframe) for dataframe in data]
+        specs.append(chart)
+        resolved.append(chart if data is chart.get('data') else dict(chart, data=data))
+
+    return slide, specs, resolved
+
+
+def __submit_charts(pool, slides, kept, lookahead):
+    """
+    Submits the preparation of every chart in *slides* (_SlideSpecs), keeping
+    at most *lookahead* slides ahead of the one handed out, and yields each
+    slide with, per chart, its future, the future of an earlier chart with
+    the same data and chart type whose serialization it reuses (or None),
+    and its data key (None if it shares nothing); and whether it is flagged
+    in *kept*, carried over from a previous render, in which case it gets
+    nothing. A chart whose data was already seen with another chart type
+    still gets its own chart XML, but no workbook. Closing the generator
+    cancels the charts it submitted that have not started
+    """
+    serialized = {}
+    workbooks = set()
+    pending = deque()
+    try:
+        for num, spec in enumerate(slides):
+            keep = kept is not None and kept[num]
+            prepared_charts = []
+            for chart, data_digest in zip([] if keep else spec.charts, spec.digests):
+                key = __chart_data_key(chart, data_digest)
+                source = None
+                if key is None:
+                    future = __submit(pool, __prepare_object, chart)
+                elif (key, chart.get('chart_type')) in serialized:
+                    source = serialized[(key, chart.get('chart_type'))]
+                    future = __submit(pool, __prepare_object, chart, False, False)
+                else:
+                    future = __submit(pool, __prepare_object, chart, True, key not in workbooks)
+                    serialized[(key, chart.get('chart_type'))] = future
+                    workbooks.add(key)
+                prepared_charts.append((future, source, key))
+
+            pending.append((spec, prepared_charts, keep))
+            if len(pending) > lookahead:
+                yield pending.popleft()
+
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, prepared_charts, _ in pending:
+            for future, _, _ in prepared_charts:
+                future.cancel()
+
+
+def __shared_result(future, source):
+    """The prepared chart in *future*, with the chart data of *source* if given"""
+    prepared = future.result()
+    if source is None or isinstance(prepared, str):
+        return prepared
+
+    source_prepared = source.result()
+    if isinstance(source_prepared, str):
+        return source_prepared
+
+    return dict(prepared, chart_data=source_prepared['chart_data'])
+
+
+# Chart options that change the chart data serialized from a frame
+__CHART_DATA_OPTIONS = ['column_names_as_labels', 'first_column_as_labels',
+                        'transpose', 'max_points', 'downsample',
+                        'embed_workbook']
+
+
+def __chart_data_key(chart, data_digest):
+    """
+    Digest of the frames in chart['data'] (whose __data_digest is
+    *data_digest*) and the options that decide what is serialized from them
+    (but not the chart type, only whether it takes XY/Bubble or category
+    data), or None for tables and data that cannot be hashed
+    """
+    chart_type = chart.get('chart_type', 'Table')
+    if chart_type not in __XL_CHART_TYPES or data_digest is None:
+        return None
+
+    _, xyz = __XL_CHART_TYPES[chart_type]
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr([xyz] + [chart.get(option) for option in __CHART_DATA_OPTIONS]).encode('utf-8'))
+    digest.update(data_digest.encode('ascii'))
+
+    return digest.hexdigest()
+
+
+def __data_digester(content=False):
+    """
+    A function giving the digest of chart data that charts with the same
+    data share (see __chart_data_key), or None. With *content* that is the
+    digest of the data itself (__data_digest), as fingerprints need.
+    Otherwise data is only hashed when its shape, columns and dtypes match
+    the first data seen with them, to compare the two; data like nothing
+    before gets a digest of those alone. The first data is only held by
+    weak reference, so that lazy data is still let go once its chart is
+    built
+    """
+    firsts = {}
+
+    def digest(data):
+        if content:
+            return __data_digest(data)
+
+        dataframes = __get_dataframes(data)
+        if dataframes is None:
+            return None
+
+        signature = hashlib.blake2b(repr([
+            (dataframe.shape, getattr(dataframe, 'name', None), dataframe.columns.tolist(),
+             [str(dtype) for dtype in dataframe.dtypes]) for dataframe in dataframes
+        ]).encode('utf-8'), digest_size=20).hexdigest()
+        first = firsts.get(signature)
+        if first is None:
+            firsts[signature] = [[weakref.ref(dataframe) for dataframe in dataframes], None]
+            return signature
+
+        references, first_digest = first
+        if first_digest is None:
+            first_data = [reference() for reference in references]
+            # Data no longer there cannot be compared with
+            gone = any(dataframe is None for dataframe in first_data)
+            first_digest = first[1] = '' if gone else __data_digest(first_data)
+        data_digest = __data_digest(dataframes)
+        if data_digest is not None and data_digest == first_digest:
+            return signature
+        return data_digest
+
+    return digest
+
+
+def __data_digest(data):
+    """Digest of the frames in *data*, as chart['data'] takes them, or None"""
+    dataframes = __get_dataframes(data)
+    if dataframes is None:
+        return None
+
+    digest = hashlib.blake2b(digest_size=20)
+    for dataframe in dataframes:
+        # Object columns hash by str(), so tell 1 from '1' by inferred type
+        columns = [(column, str(dtype), pd.api.types.infer_dtype(values) if dtype == object else None)
+                   for (column, dtype), (_, values) in zip(dataframe.dtypes.items(), dataframe.items())]
+        digest.update(repr((dataframe.shape, getattr(dataframe, 'name', None), columns)).encode('utf-8'))
+        try:
+            digest.update(pd.util.hash_pandas_object(dataframe, index=False).to_numpy().tobytes())
+        except TypeError:
+            return None
+
+    return digest.hexdigest()
+
+
+def __share_workbook(workbook_parts, key, new_chart):
+    """
+    Points *new_chart* at the embedded workbook of the first chart with data
+    *key*, dropping its own, or remembers its workbook if it is the first
+    """
+    xlsx_part = workbook_parts.get(key)
+    if xlsx_part is None:
+        workbook_parts[key] = new_chart.part.chart_workbook.xlsx_part
+        return
+
+    if new_chart._chartSpace.xlsx_part_rId is None:
+        return
+    __drop_workbook(new_chart)
+    new_chart.part.chart_workbook.xlsx_part = xlsx_part
+
+
+def __submit(pool, fn, *args):
+    """Runs *fn* on *pool*, or right away when there is no pool"""
+    if pool is not None:
+        return pool.submit(fn, *args)
+
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def toPPT_many(presentations, outputs=None, max_workers=None, executor=None,
+               compresslevel=None, store_compressed=False):
+    """
+    Renders each presentation dict in *presentations* with toPPT on a pool of
+    worker processes. If *outputs* is given (one path per presentation) each
+    worker saves its deck there and the result is the Path; otherwise the
+    result is the saved deck as bytes. A failed presentation gives the same
+    error string toPPT would have returned, so results line up with the input
+    and can be checked with isinstance(result, str). *compresslevel* and
+    *store_compressed* are as for savePPT.
+
+    The numeric buffers of DataFrames in each presentation are handed to the
+    workers through shared memory rather than being pickled with the spec.
+    An existing *executor* may be passed in instead of *max_workers*
+    """
+    presentations = list(presentations)
+    if outputs is None:
+        outputs = [None] * len(presentations)
+
+    pool = executor
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    futures = []
+    segments = []
+    try:
+        for presentation, output in zip(presentations, outputs):
+            payload, segment, layout = __share_presentation(presentation)
+            segments.append(segment)
+            futures.append(pool.submit(
+                __render_shared, payload,
+                None if segment is None else segment.name, layout, output,
+                dict(compresslevel=compresslevel, store_compressed=store_compressed)))
+
+        results = []
+        for num, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append('Could\'t create PPT: {}'.format(e))
+            __release_segment(segments[num])
+            segments[num] = None
+
+        return results
+    finally:
+        for segment in segments:
+            __release_segment(segment)
+        if executor is None:
+            pool.shutdown()
+
+
+def __share_presentation(presentation):
+    """
+    Pickles *presentation* with its contiguous (numeric) buffers out-of-band,
+    copying those buffers into one shared memory segment. Returns the pickle,
+    the segment (None if there were no buffers) and each buffer's offset/size.
+    Before Python 3.8, which has neither, everything is pickled in-band
+    """
+    if pickle.HIGHEST_PROTOCOL < 5:
+        return pickle.dumps(presentation), None, []
+
+    from multiprocessing import shared_memory
+
+    buffers = []
+    payload = pickle.dumps(presentation, protocol=5,
+                           buffer_callback=buffers.append)
+    if len(buffers) == 0:
+        return payload, None, []
+
+    raw = [buffer.raw() for buffer in buffers]
+    segment = shared_memory.SharedMemory(
+        create=True, size=max(1, sum(view.nbytes for view in raw)))
+
+    layout = []
+    offset = 0
+    for view in raw:
+        segment.buf[offset:offset + view.nbytes] = view
+        layout.append((offset, view.nbytes))
+        offset += view.nbytes
+
+    return payload, segment, layout
+
+
+def __release_segment(segment):
+    if segment is None:
+        return
+
+    segment.close()
+    segment.unlink()
+
+
+def __render_shared(payload, segment_name, layout, output, save_options=None):
+    """
+    Worker side of toPPT_many: copies the shared buffers out of the segment,
+    which is closed again before rendering so that nothing the render keeps
+    hold of can pin the mapping, and renders
+    """
+    buffers = None
+    if segment_name is not None:
+        from multiprocessing import shared_memory
+
+        segment = shared_memory.SharedMemory(name=segment_name)
+        try:
+            data = memoryview(bytearray(segment.buf))
+        finally:
+            segment.close()
+        buffers = [data[offset:offset + size] for offset, size in layout]
+
+    if buffers is None:
+        presentation = pickle.loads(payload)
+    else:
+        presentation = pickle.loads(payload, buffers=buffers)
+    return __render(presentation, output, save_options)
+
+
+def __render(presentation, output=None, save_options=None):
+    ppt = toPPT(presentation)
+    if isinstance(ppt, str):
+        return ppt
+
+    save_options = save_options or {}
+    if output is None:
+        stream = io.BytesIO()
+        savePPT(ppt, stream, **save_options)
+        return stream.getvalue()
+
+    savePPT(ppt, output, **save_options)
+    return Path(output)
+
+
+def toBase64URL(pres, compresslevel=None, store_compressed=False):
+    # Build the link from base64 chunks, never holding the whole deck as bytes
+    output = io.StringIO()
+    saveBase64URL(pres, output, compresslevel=compresslevel, store_compressed=store_compressed)
+
+    return output.getvalue()
+
+
+def savePPT(pres, output, profiler=None, compresslevel=None, store_compressed=False,
+            max_workers=None):
+    """
+    Writes the presentation package straight to *output*, a path or any
+    writable file-like object (which need not be seekable). Its parts are
+    deflated at *compresslevel* (0-9, by default 6) on *max_workers*
+    threads; with *store_compressed*, embedded workbooks, images and other
+    parts compressed already are stored as they are. *profiler* is as for
+    toPPT
+    """
+    watch = Stopwatch()
+    write_package(pres, output, compresslevel, store_compressed, max_workers)
+    watch.lap('save')
+    __report_laps(profiler, watch.laps)
+
+
+__BASE64_URL_PREFIX = "<a href='data:application/vnd.openxmlformats-officedocument.presentationml.presentation;base64,"
+__BASE64_URL_SUFFIX = "'>Download here</a>"
+
+
+def saveBase64URL(pres, output, chunk_size=3 * 1024 * 1024, compresslevel=None,
+                  store_compressed=False):
+    """
+    Writes the same download link toBase64URL returns to *output*, a path or
+    a writable text file-like object. The package is base64-encoded as it is
+    written, *chunk_size* bytes at a time; *compresslevel* and
+    *store_compressed* are as for savePPT
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, 'w') as output_file:
+            return saveBase64URL(pres, output_file, chunk_size, compresslevel, store_compressed)
+
+    output.write(__BASE64_URL_PREFIX)
+    encoder = _Base64Writer(output, chunk_size)
+    savePPT(pres, encoder, compresslevel=compresslevel, store_compressed=store_compressed)
+    encoder.close()
+    output.write(__BASE64_URL_SUFFIX)
+
+
+class _Base64Writer(object):
+    """
+    Write-only binary stream that base64-encodes whatever is written to it
+    onto the text stream *output*, in chunks of at most *chunk_size* bytes.
+    It is not seekable, so zipfile streams the package through it
+    """
+
+    def __init__(self, output, chunk_size):
+        self._output = output
+        # Whole 3-byte groups encode without padding, so chunks concatenate
+        self._chunk_size = max(3, chunk_size - chunk_size % 3)
+        self._pending = b''
+
+    def write(self, data):
+        view = memoryview(data).cast('B')
+        if len(self._pending) > 0:
+            take = min(len(view), 3 - len(self._pending))
+            self._pending += bytes(view[:take])
+            view = view[take:]
+            if len(self._pending) < 3:
+                return len(data)
+            self._output.write(base64.b64encode(self._pending).decode('ascii'))
+
+        whole = len(view) - len(view) % 3
+        for start in range(0, whole, self._chunk_size):
+            chunk = view[start:min(start + self._chunk_size, whole)]
+            self._output.write(base64.b64encode(chunk).decode('ascii'))
+        self._pending = bytes(view[whole:])
+
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if len(self._pending) > 0:
+            self._output.write(base64.b64encode(self._pending).decode('ascii'))
+            self._pending = b''
+
+
+def toPPTTC(presentation, output=None):
+    """
+    Writes the *presentation* dict toPPT takes as think-cell .ppttc JSON
+    instead of a PPTX: one instance of the think-cell template per slide,
+    with a 'Title' text field and one table per chart, named by the chart's
+    'name' or else Chart1, Chart2... No chart XML or workbook is built.
+    *output* is a path or a writable text file-like object; without one the
+    JSON is returned as a string. A path is only written once every chart
+    has been, so a failure leaves whatever was there before. Returns a
+    string describing the first thing that failed, as toPPT does.
+
+    Slides, charts and data may be generators or callables, as for toPPT;
+    every slide is evaluated up front, and its charts' data as it is written
+    """
+    if output is None:
+        stream = io.StringIO()
+        error = toPPTTC(presentation, stream)
+        return stream.getvalue() if error is None else error
+
+    if isinstance(output, (str, Path)):
+        temporary = '{}.{}.tmp'.format(output, uuid.uuid4().hex)
+        try:
+            with open(temporary, 'x', encoding='utf-8') as stream:
+                error = toPPTTC(presentation, stream)
+            if error is None:
+                os.replace(temporary, output)
+            return error
+        finally:
+            if path.exists(temporary):
+                os.remove(temporary)
+
+    slides = presentation.get('slides')
+    if callable(slides):
+        slides = slides()
+    slides = [slide() if callable(slide) else slide for slide in slides or []]
+    if not slides:
+        return 'No slides were supplied'
+
+    for slide_count, slide in enumerate(slides, 1):
+        if slide.get('template', presentation.get('template')) is None:
+            return 'No think-cell template was given for slide {}'.format(slide_count)
+
+    writer = PPTTCWriter(output)
+    for slide_count, slide in enumerate(slides, 1):
+        writer.template(str(slide.get('template', presentation.get('template'))))
+        if slide.get('title') is not None:
+            writer.table('Title', [ppttc_cells(pd.Series([slide['title']], dtype=object))])
+
+        slide, specs, charts = __evaluate_slide(slide)
+        for chart_count, chart in enumerate(charts, 1):
+            rows = __ppttc_rows(dict(chart))
+            if isinstance(rows, str):
+                return 'Failed to create chart {} in slide {}: {}'.format(chart_count, slide_count, rows)
+            writer.table(chart.get('name', 'Chart{}'.format(chart_count)), rows)
+
+    writer.close()
+
+
+def __ppttc_rows(chart):
+    """
+    The rows of a chart's think-cell table as lists of cells, laid out as
+    its datasheet is: for category charts a row of categories, an empty row
+    and then one row per series; for tables every row of the frame
+    """
+    error = __check_data(chart)
+    if error is not None:
+        return error
+    __infer_labels(chart)
+
+    chart_type = chart.get('chart_type', 'Table')
+    xl_chart_type, xyz = __XL_CHART_TYPES.get(chart_type, (None, False))
+
+    transpose = chart.get('transpose', False)
+    if transpose and (xl_chart_type is None or xyz):
+        chart = __transpose_data(chart)
+        transpose = False
+
+    max_points = chart.get('max_points')
+    if max_points is not None and chart_type in __DOWNSAMPLED_CHART_TYPES:
+        error = __downsample_data(chart, xyz, max_points, transpose)
+        if isinstance(error, str):
+            return error
+
+    if xl_chart_type is None:
+        return __ppttc_table_rows(chart)
+    if xyz:
+        return __ppttc_xyz_rows(chart['data'])
+
+    dataframe = chart['data'][0]
+    offset = 1 if chart['first_column_as_labels'] else 0
+    colNames = dataframe.columns[offset:]
+    values = [ppttc_cells(dataframe.iloc[:, col]) for col in range(offset, dataframe.shape[1])]
+
+    if chart['first_column_as_labels']:
+        row_labels = ppttc_cells(dataframe.iloc[:, 0])
+    else:
+        row_labels = ppttc_cells(pd.Series(['Series 1'] * len(dataframe), dtype=object))
+    if chart['column_names_as_labels']:
+        column_labels = ppttc_cells(colNames.to_series())
+    else:
+        column_labels = ppttc_cells(pd.Series(['Category 1'] * len(colNames), dtype=object))
+
+    if transpose:
+        # One series per column, one category per row
+        return [[NULL_CELL] + row_labels, []] + [
+            [label] + column for label, column in zip(column_labels, values)]
+
+    return [[NULL_CELL] + column_labels, []] + [
+        [label] + list(row) for label, row in zip(row_labels, zip(*values))]
+
+
+def __ppttc_table_rows(chart):
+    dataframe = chart['data'][0]
+    columns = [ppttc_cells(dataframe.iloc[:, col]) for col in range(dataframe.shape[1])]
+    rows = [list(row) for row in zip(*columns)]
+    if chart['column_names_as_labels']:
+        rows.insert(0, ppttc_cells(dataframe.columns.to_series()))
 
+    return rows
 
-def toBase64URL(pres):
-    # Create string shell to insert the base64-encoded data
-    output_str = "<a href='data:application/vnd.openxmlformats-officedocument.presentationml.presentation;base64,{}'>Download here</a>"
-    # Create a new byte stream to save to
-    stream = io.BytesIO()
-    # Save the presentation content to the byte stream
-    pres.save(stream)
-    # Base64 encode the stream and convert to base64 ascii
-    encoded = base64.b64encode(stream.getvalue()).decode()
 
-    return output_str.format(encoded)
+def __ppttc_xyz_rows(dfs):
+    """One row per point, labelled with its series' name"""
+    rows = [[NULL_CELL] + ppttc_cells(dfs[0].columns.to_series()), []]
+    for seriesNum, df in enumerate(dfs, 1):
+        name = getattr(df, 'name', '') or 'Series ' + str(seriesNum)
+        label = ppttc_cells(pd.Series([name], dtype=object))[0]
+        columns = [ppttc_cells(df.iloc[:, col]) for col in range(df.shape[1])]
+        rows.extend([label] + list(row) for row in zip(*columns))
+
+    return rows
 
 
 def __create_presentation(slideInfo):
@@ -122,10 +1011,18 @@ def __create_presentation(slideInfo):
             if (not path.isfile(template)):
                 template = None
 
-    return Presentation(template)
+    return template_cache.get_indexed(template)
 
 
-def __create_slide(ppt, slide):
+def __create_slide(ppt, slide, charts, layouts, existing_slides):
+    """
+    Returns the slide for *slide* and where each of its charts goes: the
+    PlaceholderGeometry from *layouts* (the deck's layout_index) for charts
+    given by placeholder on a new slide, whose placeholders are then never
+    added, or None for the rest, which __get_target looks up on the slide.
+    A slide_num is looked up in *existing_slides*, the deck's slides before
+    any were added
+    """
     slide_num = slide.get('slide_num', 0)
     layout_num = slide.get('layout_num', 1)
     title = slide.get('title')
@@ -134,16 +1031,53 @@ def __create_slide(ppt, slide):
         return 'Layout number {} is outside the number of layouts found in this PPT [{}]'.format(layout_num, len(ppt.slide_layouts))
 
     if slide_num == 0:
-        new_slide = ppt.slides.add_slide(ppt.slide_layouts[layout_num])
+        taken, targets = __place_charts(layouts[layout_num], charts)
+        new_slide = __add_slide(ppt, ppt.slide_layouts[layout_num], taken)
     else:
-        if len(ppt.slides) >= slide_num:
-            new_slide = ppt.slides[slide_num-1]
+        if len(existing_slides) >= slide_num:
+            new_slide = existing_slides[slide_num-1]
+            targets = [None] * len(charts)
         else:
-            return 'Slide number {} is outside the number of slides found in this PPT [{}]'.format(slide_num, len(ppt.slides))
+            return 'Slide number {} is outside the number of slides found in this PPT [{}]'.format(slide_num, len(existing_slides))
 
     if new_slide.shapes.title is not None:
         new_slide.shapes.title.text = title
 
+    return new_slide, targets
+
+
+def __place_charts(layout, charts):
+    """
+    Works out which of *layout*'s placeholders each chart replaces, numbering
+    them as __get_placeholder would on the slide: each chart counts only the
+    placeholders still left. Returns the positions taken and, per chart, the
+    PlaceholderGeometry, an error string, or None if it has no placeholder_num
+    """
+    left = list(range(len(layout)))
+    targets = []
+    for chart in charts:
+        placeholder_num = chart.get('placeholder_num')
+        if placeholder_num is None or placeholder_num <= 0:
+            targets.append(None)
+        elif len(left) < placeholder_num:
+            targets.append('Placeholder number {} outside the number of placeholders found in this slide [{}]'.format(placeholder_num, len(left)))
+        else:
+            targets.append(layout[left.pop(placeholder_num - 1)])
+
+    return set(range(len(layout))) - set(left), targets
+
+
+def __add_slide(ppt, slide_layout, taken):
+    """
+    Slides.add_slide, leaving out the layout placeholders at the positions in
+    *taken* rather than adding them only to remove them again
+    """
+    rId, new_slide = ppt.slides.part.add_slide(slide_layout)
+    for position, placeholder in enumerate(slide_layout.iter_cloneable_placeholders()):
+        if position not in taken:
+            new_slide.shapes.clone_placeholder(placeholder)
+    ppt.slides._sldIdLst.add_sldId(rId)
+
     return new_slide
 
 
@@ -165,41 +1099,102 @@ def __get_placeholder(slide, placeholder_num):
     return placeholder
 
 
+__CHART_FRAMES = './p:graphicFrame[a:graphic/a:graphicData/@uri="{}"]'.format(
+    'http://schemas.openxmlformats.org/drawingml/2006/chart')
+
+
 def __get_chart(slide, chart_num):
     if chart_num == 0:
         return 'Neither placeholder_number, nor chart_number were specified for this slide'
 
-    charts_found = 0
+    # Only chart frames, rather than every shape on the slide
+    frames = slide.shapes._spTree.xpath(__CHART_FRAMES)
+    if len(frames) < chart_num:
+        return 'Chart number {} is outside the number of charts found in this slide [{}]'.format(chart_num, len(frames))
 
-    for shape in slide.shapes:
-        if shape.has_chart:
-            charts_found += 1
-        if charts_found == chart_num:
-            shape.element.getparent().remove(shape.element)
-            return shape
-
-    return 'Chart number {} is outside the number of charts found in this slide [{}]'.format(chart_num, charts_found)
+    frame = frames[chart_num - 1]
+    shape = SlideShapeFactory(frame, slide.shapes)
+    frame.getparent().remove(frame)
+    return shape
 
 
 def __infer_category_labels(data):
     for dataframe in data:
-        firstCol = dataframe.iloc[:, 0]
-        for cell in firstCol:
-            if not isinstance(cell, numbers.Number):
-                return True
+        if __has_non_numbers(dataframe.iloc[:, 0]):
+            return True
 
     return False
 
 
 def __infer_series_labels(data):
     for dataframe in data:
-        for col in dataframe.columns:
-            if not isinstance(col, numbers.Number):
-                return True
+        if __has_non_numbers(dataframe.columns):
+            return True
+
+    return False
+
+
+# How many values of an object column are checked one by one before handing
+# the rest to pandas' dtype inference
+__LABEL_SAMPLE_SIZE = 100
+
+# infer_dtype results for object values that are all numbers.Number
+__NUMBER_INFERRED_TYPES = ['empty', 'integer', 'floating', 'mixed-integer-float',
+                           'decimal', 'complex', 'boolean']
+
+
+def __has_non_numbers(values):
+    """
+    Whether any of *values* (a Series or Index) is not a numbers.Number,
+    decided from the dtype wherever possible instead of cell by cell
+    """
+    if len(values) == 0:
+        return False
+
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Missing values come back as NaN, which is a number
+        return __has_non_numbers(dtype.categories) and bool((values.array.codes >= 0).any())
+
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'biufc':
+            return False
+        if dtype.kind in 'mM':
+            # Timestamps, Timedeltas and NaT are not numbers
+            return True
+    elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        # Nullable and Arrow-backed numbers: only pd.NA is not a number
+        return bool(values.isna().any())
+
+    if dtype != object:
+        # Strings, dates and the like; their missing values may still be NaN
+        return bool(values.notna().any()) or not __missing_is_nan(dtype)
+
+    for value in values[:__LABEL_SAMPLE_SIZE]:
+        if not isinstance(value, numbers.Number):
+            return True
+    if len(values) <= __LABEL_SAMPLE_SIZE:
+        return False
+
+    inferred = pd.api.types.infer_dtype(values, skipna=False)
+    if inferred in __NUMBER_INFERRED_TYPES:
+        return False
+    if inferred not in ['mixed', 'mixed-integer']:
+        return True
+
+    # Ambiguous mixes (e.g. ints with bools, or with None) need a full look
+    for value in values:
+        if not isinstance(value, numbers.Number):
+            return True
 
     return False
 
 
+def __missing_is_nan(dtype):
+    na_value = getattr(dtype, 'na_value', np.nan)
+    return isinstance(na_value, float) and np.isnan(na_value)
+
+
 def __transpose_data(chartInfo):
     transposed_data = []
 
@@ -231,34 +1226,91 @@ def __transpose_data(chartInfo):
 
 
 def __get_dataframes(data):
-    if (not isinstance(data, pd.DataFrame) and not __iterable(data)):
+    if (not isinstance(data, pd.DataFrame) and not __is_arrow(data) and not __iterable(data)):
         return None
 
-    if (isinstance(data, pd.DataFrame)):
-        dfs = [data]
+    if (isinstance(data, pd.DataFrame) or __is_arrow(data)):
+        dfs = [__arrow_to_dataframe(data)]
     else:
         for dataframe in data:
-            if not isinstance(dataframe, pd.DataFrame):
+            if not isinstance(dataframe, pd.DataFrame) and not __is_arrow(dataframe):
                 return None
-        dfs = data
+        dfs = [__arrow_to_dataframe(dataframe) for dataframe in data]
 
     return dfs
 
 
-def __insert_object(slide, placeholder, chart):
+def __is_arrow(data):
+    return pa is not None and isinstance(data, (pa.Table, pa.RecordBatch))
 
+
+def __arrow_to_dataframe(data):
+    """
+    Returns a pyarrow Table or RecordBatch as a DataFrame with one block per
+    column, so numeric columns without nulls are zero-copy NumPy views of
+    the Arrow buffers rather than a consolidated to_pandas() copy. Anything
+    else is returned unchanged
+    """
+    if not __is_arrow(data):
+        return data
+
+    return data.to_pandas(split_blocks=True)
+
+
+# CHART_TYPE value -> (python-pptx chart type, whether it takes XY/Bubble data)
+__XL_CHART_TYPES = {
+    CHART_TYPE.AREA.value: (XL_CHART_TYPE.AREA, False),
+    CHART_TYPE.AREA_STACKED.value: (XL_CHART_TYPE.AREA_STACKED, False),
+    CHART_TYPE.AREA_STACKED_100.value: (XL_CHART_TYPE.AREA_STACKED_100, False),
+    CHART_TYPE.BAR.value: (XL_CHART_TYPE.BAR_CLUSTERED, False),
+    CHART_TYPE.BAR_STACKED.value: (XL_CHART_TYPE.BAR_STACKED, False),
+    CHART_TYPE.BAR_STACKED_100.value: (XL_CHART_TYPE.BAR_STACKED_100, False),
+    CHART_TYPE.COLUMN.value: (XL_CHART_TYPE.COLUMN_CLUSTERED, False),
+    CHART_TYPE.COLUMN_STACKED.value: (XL_CHART_TYPE.COLUMN_STACKED, False),
+    CHART_TYPE.COLUMN_STACKED_100.value: (XL_CHART_TYPE.COLUMN_STACKED_100, False),
+    CHART_TYPE.LINE.value: (XL_CHART_TYPE.LINE, False),
+    CHART_TYPE.LINE_STACKED.value: (XL_CHART_TYPE.LINE_STACKED, False),
+    CHART_TYPE.LINE_STACKED_100.value: (XL_CHART_TYPE.LINE_STACKED_100, False),
+    CHART_TYPE.LINE_MARKED.value: (XL_CHART_TYPE.LINE_MARKERS, False),
+    CHART_TYPE.LINE_MARKED_STACKED.value: (XL_CHART_TYPE.LINE_MARKERS_STACKED, False),
+    CHART_TYPE.LINE_MARKED_STACKED_100.value: (XL_CHART_TYPE.LINE_MARKERS_STACKED_100, False),
+    CHART_TYPE.DOUGHNUT.value: (XL_CHART_TYPE.DOUGHNUT, False),
+    CHART_TYPE.DOUGHNUT_EXPLODED.value: (XL_CHART_TYPE.DOUGHNUT_EXPLODED, False),
+    CHART_TYPE.PIE.value: (XL_CHART_TYPE.PIE, False),
+    CHART_TYPE.PIE_EXPLODED.value: (XL_CHART_TYPE.PIE_EXPLODED, False),
+    CHART_TYPE.RADAR.value: (XL_CHART_TYPE.RADAR, False),
+    CHART_TYPE.RADAR_FILLED.value: (XL_CHART_TYPE.RADAR_FILLED, False),
+    CHART_TYPE.RADAR_MARKED.value: (XL_CHART_TYPE.RADAR_MARKERS, False),
+    CHART_TYPE.XY_SCATTER.value: (XL_CHART_TYPE.XY_SCATTER, True),
+    CHART_TYPE.XY_SCATTER_LINES.value: (XL_CHART_TYPE.XY_SCATTER_LINES_NO_MARKERS, True),
+    CHART_TYPE.XY_SCATTER_LINES_SMOOTHED.value: (XL_CHART_TYPE.XY_SCATTER_SMOOTH_NO_MARKERS, True),
+    CHART_TYPE.XY_SCATTER_LINES_MARKED.value: (XL_CHART_TYPE.XY_SCATTER_LINES, False),
+    CHART_TYPE.XY_SCATTER_LINES_MARKED_SMOOTHED.value: (XL_CHART_TYPE.XY_SCATTER_SMOOTH, True),
+    CHART_TYPE.BUBBLE.value: (XL_CHART_TYPE.BUBBLE, True),
+}
+
+
+def __check_data(chart):
+    """
+    Makes chart['data'] a list of DataFrames, or returns an error string if
+    it is not data
+    """
     data = chart.get('data')
 
     if (data is None):
         return 'No data was supplied for chart'
 
-    if (isinstance(data, pd.DataFrame)):
+    if (isinstance(data, pd.DataFrame) or __is_arrow(data)):
         chart['data'] = [data]
 
     for dataframe in chart['data']:
-        if not isinstance(dataframe, pd.DataFrame):
+        if not isinstance(dataframe, pd.DataFrame) and not __is_arrow(dataframe):
             return 'Data supplied was neither a Pandas DataFrame, nor an array of Pandas DataFrames'
 
+    chart['data'] = [__arrow_to_dataframe(dataframe) for dataframe in chart['data']]
+
+
+def __infer_labels(chart):
     if not isinstance(chart.get('column_names_as_labels'), bool):
         chart['column_names_as_labels'] = __infer_series_labels(
             chart['data'])
@@ -267,96 +1319,307 @@ def __insert_object(slide, placeholder, chart):
         chart['first_column_as_labels'] = __infer_category_labels(
             chart['data'])
 
+
+def __prepare_object(chart, xml=True, workbook=True):
+    """
+    Does everything for *chart* that does not touch the slide: checks and
+    labels its data, transposes it, and serializes chart XML and workbook.
+    Returns the prepared chart dict for __insert_object, or an error string.
+    Without *xml* nothing is serialized (chart_data is None), and without
+    *workbook* a stand-in takes the place of the full workbook, for charts
+    reusing those of an identical chart. The time spent on each stage is
+    kept as Stopwatch laps in 'stages'
+    """
+    watch = Stopwatch()
+    error = __check_data(chart)
+    if error is not None:
+        return error
+
+    rows = sum(len(dataframe) for dataframe in chart['data'])
+    columns = max([dataframe.shape[1] for dataframe in chart['data']], default=0)
+    watch.lap('data')
+
+    __infer_labels(chart)
+    watch.lap('labels')
+
+    chart_type = chart.get('chart_type', 'Table')
+    xl_chart_type, xyz = __XL_CHART_TYPES.get(chart_type, (None, False))
+
+    # Category charts read transposed data straight from the frame; tables
+    # and XY/Bubble charts are built from transposed frames
     transpose = chart.get('transpose', False)
-    if transpose:
+    if transpose and (xl_chart_type is None or xyz):
         chart = __transpose_data(chart)
+        transpose = False
+        watch.lap('transpose')
 
     data = __get_dataframes(chart.get('data'))
     dataframe = data[0]
 
-    chart_type = chart.get('chart_type', 'Table')
+    if xl_chart_type is None:
+        error = __check_rows_per_slide(chart)
+        if error is not None:
+            return error
+        return dict(chart=chart, chart_type=None, stages=watch.laps,
+                    rows=rows, columns=columns)
+
+    embed_workbook = chart.get('embed_workbook')
+    if embed_workbook is None:
+        embed_workbook = EMBED_WORKBOOK.FULL.value
+    if embed_workbook not in [option.value for option in EMBED_WORKBOOK]:
+        return 'Unknown embed_workbook option {}'.format(embed_workbook)
+
+    max_points = chart.get('max_points')
+    if max_points is not None and chart_type in __DOWNSAMPLED_CHART_TYPES:
+        dropped = __downsample_data(chart, xyz, max_points, transpose)
+        if isinstance(dropped, str):
+            return dropped
+        chart['points_dropped'] = dropped
+        watch.lap('downsample')
+
+    rendered = None
+    if xml:
+        if xyz:
+            chart_data = __create_xyzdata(chart['data'])
+        else:
+            chart_data = __create_chartdata(chart, transpose)
+        if chart_data is None:
+            return 'Could not create chart data'
+        watch.lap('chart_data')
+
+        # Only the full workbook is worth writing out now; the others get a
+        # small stand-in, which 'none' then drops
+        if embed_workbook == EMBED_WORKBOOK.FULL.value and workbook:
+            xlsx_blob = chart_data.xlsx_blob
+        else:
+            xlsx_blob = __lazy_workbook()
+        rendered = _RenderedChartData(chart_data.xml_bytes(xl_chart_type), xlsx_blob)
+        watch.lap('serialize')
+
+    # The frames are not needed once serialized, so leave them out of what
+    # may have to come back from a worker process
+    chart = {key: value for key, value in chart.items() if key != 'data'}
+
+    return dict(chart=chart, chart_type=xl_chart_type, xyz=xyz,
+                embed_workbook=embed_workbook, chart_data=rendered,
+                stages=watch.laps, rows=rows, columns=columns)
+
+
+__DOWNSAMPLED_CHART_TYPES = [
+    CHART_TYPE.AREA.value,
+    CHART_TYPE.AREA_STACKED.value,
+    CHART_TYPE.AREA_STACKED_100.value,
+    CHART_TYPE.LINE.value,
+    CHART_TYPE.LINE_STACKED.value,
+    CHART_TYPE.LINE_STACKED_100.value,
+    CHART_TYPE.LINE_MARKED.value,
+    CHART_TYPE.LINE_MARKED_STACKED.value,
+    CHART_TYPE.LINE_MARKED_STACKED_100.value,
+    CHART_TYPE.XY_SCATTER.value,
+    CHART_TYPE.XY_SCATTER_LINES.value,
+    CHART_TYPE.XY_SCATTER_LINES_SMOOTHED.value,
+    CHART_TYPE.XY_SCATTER_LINES_MARKED.value,
+    CHART_TYPE.XY_SCATTER_LINES_MARKED_SMOOTHED.value,
+]
+
+
+def __downsample_data(chart, xyz, max_points, transpose=False):
+    """
+    Reduces every series in chart['data'] to at most *max_points* points,
+    with chart['downsample'] = 'lttb' (default) or 'minmax'. *transpose* is
+    as for __create_chartdata. Returns the number of data points dropped,
+    or an error string
+    """
+    method = chart.get('downsample', 'lttb')
+    # LTTB keeps the first and last points and at least one in between
+    least = 2 if method == 'minmax' else 3
+    if not isinstance(max_points, numbers.Integral) or isinstance(max_points, bool) or max_points < least:
+        return 'max_points must be a whole number of at least {} for {} downsampling, not {}'.format(
+            least, method, max_points)
 
-    if chart_type == CHART_TYPE.AREA.value:
-        return __insert_chart(XL_CHART_TYPE.AREA, slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.AREA_STACKED.value:
-        return __insert_chart(XL_CHART_TYPE.AREA_STACKED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.AREA_STACKED_100.value:
-        return __insert_chart(XL_CHART_TYPE.AREA_STACKED_100,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.BAR.value:
-        return __insert_chart(XL_CHART_TYPE.BAR_CLUSTERED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.BAR_STACKED.value:
-        return __insert_chart(XL_CHART_TYPE.BAR_STACKED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.BAR_STACKED_100.value:
-        return __insert_chart(XL_CHART_TYPE.BAR_STACKED_100,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.COLUMN.value:
-        return __insert_chart(XL_CHART_TYPE.COLUMN_CLUSTERED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.COLUMN_STACKED.value:
-        return __insert_chart(XL_CHART_TYPE.COLUMN_STACKED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.COLUMN_STACKED_100.value:
-        return __insert_chart(XL_CHART_TYPE.COLUMN_STACKED_100,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE.value:
-        return __insert_chart(XL_CHART_TYPE.LINE, slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE_STACKED.value:
-        return __insert_chart(XL_CHART_TYPE.LINE_STACKED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE_STACKED_100.value:
-        return __insert_chart(XL_CHART_TYPE.LINE_STACKED_100,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE_MARKED.value:
-        return __insert_chart(XL_CHART_TYPE.LINE_MARKERS,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE_MARKED_STACKED.value:
-        return __insert_chart(XL_CHART_TYPE.LINE_MARKERS_STACKED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.LINE_MARKED_STACKED_100.value:
-        return __insert_chart(XL_CHART_TYPE.LINE_MARKERS_STACKED_100,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.DOUGHNUT.value:
-        return __insert_chart(XL_CHART_TYPE.DOUGHNUT, slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.DOUGHNUT_EXPLODED.value:
-        return __insert_chart(XL_CHART_TYPE.DOUGHNUT_EXPLODED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.PIE.value:
-        return __insert_chart(XL_CHART_TYPE.PIE, slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.PIE_EXPLODED.value:
-        return __insert_chart(XL_CHART_TYPE.PIE_EXPLODED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.RADAR.value:
-        return __insert_chart(XL_CHART_TYPE.RADAR, slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.RADAR_FILLED.value:
-        return __insert_chart(XL_CHART_TYPE.RADAR_FILLED,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.RADAR_MARKED.value:
-        return __insert_chart(XL_CHART_TYPE.RADAR_MARKERS,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.XY_SCATTER.value:
-        return __insert_xyzchart(XL_CHART_TYPE.XY_SCATTER,
-                                 slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.XY_SCATTER_LINES.value:
-        return __insert_xyzchart(XL_CHART_TYPE.XY_SCATTER_LINES_NO_MARKERS,
-                                 slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.XY_SCATTER_LINES_SMOOTHED.value:
-        return __insert_xyzchart(XL_CHART_TYPE.XY_SCATTER_SMOOTH_NO_MARKERS,
-                                 slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.XY_SCATTER_LINES_MARKED.value:
-        return __insert_chart(XL_CHART_TYPE.XY_SCATTER_LINES,
-                              slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.XY_SCATTER_LINES_MARKED_SMOOTHED.value:
-        return __insert_xyzchart(XL_CHART_TYPE.XY_SCATTER_SMOOTH,
-                                 slide, placeholder, chart)
-    elif chart_type == CHART_TYPE.BUBBLE.value:
-        return __insert_xyzchart(XL_CHART_TYPE.BUBBLE, slide, placeholder, chart)
-    else:
+    try:
+        return __downsample_frames(chart, xyz, method, max_points, transpose)
+    except (TypeError, ValueError) as e:
+        return 'Could not downsample non-numeric data: {}'.format(e)
+
+
+def __downsample_frames(chart, xyz, method, max_points, transpose):
+    dropped = 0
+    downsampled = []
+
+    for dataframe in chart['data']:
+        if xyz:
+            # One series per frame: X values then Y values
+            if dataframe.shape[1] != 2 or dataframe.shape[0] <= max_points:
+                downsampled.append(dataframe)
+                continue
+            y = pd.to_numeric(dataframe.iloc[:, 1]).to_numpy(dtype=float)
+            if method == 'minmax':
+                keep = minmax_indices(y, max_points)
+            else:
+                x = pd.to_numeric(dataframe.iloc[:, 0]).to_numpy(dtype=float)
+                keep = lttb_indices(x, y, max_points)
+            dropped += dataframe.shape[0] - len(keep)
+            downsampled.append(dataframe.iloc[keep])
+        else:
+            # Categories are the columns, one series per row (or the other way
+            # round when transposed), so the same categories are kept for all
+            # series
+            offset = 1 if chart['first_column_as_labels'] else 0
+            values = dataframe.iloc[:, offset:].apply(pd.to_numeric).to_numpy(dtype=float)
+            if not transpose:
+                values = values.T
+            if values.shape[0] <= max_points:
+                downsampled.append(dataframe)
+                continue
+            if method == 'minmax':
+                keep = minmax_indices(values, max_points)
+            else:
+                y = np.nanmean(values, axis=1) if values.shape[1] > 1 else values[:, 0]
+                keep = lttb_indices(np.arange(len(y)), y, max_points)
+            dropped += (values.shape[0] - len(keep)) * values.shape[1]
+            if transpose:
+                downsampled.append(dataframe.iloc[keep])
+            else:
+                downsampled.append(dataframe.iloc[:, list(range(offset)) + (offset + keep).tolist()])
+
+    chart['data'] = downsampled
+
+    return dropped
+
+
+def __insert_object(slide, placeholder, prepared, add_page=None):
+    if isinstance(prepared, str):
+        return prepared
+
+    chart = prepared['chart']
+    if prepared['chart_type'] is None:
+        if chart.get('rows_per_slide') is not None and add_page is not None:
+            return __insert_paged_table(slide, placeholder, chart, add_page)
         return __insert_table(slide, placeholder, chart)
 
+    if prepared['xyz']:
+        new_chart = __insert_xyzchart(prepared['chart_type'], slide, placeholder, chart, prepared['chart_data'])
+    else:
+        new_chart = __insert_chart(prepared['chart_type'], slide, placeholder, chart, prepared['chart_data'])
+
+    if prepared['embed_workbook'] == EMBED_WORKBOOK.NONE.value:
+        __drop_workbook(new_chart)
+
+    return new_chart
+
+
+class _RenderedChartData(object):
+    """
+    Chart data already serialized to chart XML and embedded workbook bytes,
+    so that add_chart only has to attach the parts
+    """
+
+    def __init__(self, xml_bytes, xlsx_blob):
+        self._xml_bytes = xml_bytes
+        self.xlsx_blob = xlsx_blob
+
+    def xml_bytes(self, chart_type):
+        return self._xml_bytes
+
+
+# Title of the stand-in workbook embedded for embed_workbook='lazy', which is
+# how embedWorkbooks() finds the charts still waiting for their data
+__LAZY_WORKBOOK_TITLE = 'databricksppt: chart data not embedded'
+__lazy_workbook_blob = None
+
+
+def __lazy_workbook():
+    """The (built once) single-sheet workbook standing in for chart data"""
+    global __lazy_workbook_blob
+    if __lazy_workbook_blob is None:
+        stream = io.BytesIO()
+        workbook = xlsxwriter.Workbook(stream, {'in_memory': True})
+        workbook.set_properties({'title': __LAZY_WORKBOOK_TITLE,
+                                 'created': datetime(2000, 1, 1)})
+        workbook.add_worksheet().write(
+            0, 0, 'The chart data was not embedded. Run databricksppt.embedWorkbooks on the presentation to add it.')
+        workbook.close()
+        __lazy_workbook_blob = stream.getvalue()
+
+    return __lazy_workbook_blob
+
+
+def __is_lazy_workbook(blob):
+    try:
+        with zipfile.ZipFile(io.BytesIO(blob)) as package:
+            core = package.read('docProps/core.xml').decode('utf-8')
+    except (zipfile.BadZipFile, KeyError):
+        return False
+
+    return '<dc:title>{}</dc:title>'.format(__LAZY_WORKBOOK_TITLE) in core
+
+
+def __drop_workbook(new_chart):
+    """Unlinks the embedded workbook, leaving the chart its cached values"""
+    chartSpace = new_chart._chartSpace
+    rId = chartSpace.xlsx_part_rId
+    if rId is None:
+        return
+
+    chartSpace._remove_externalData()
+    new_chart.part.drop_rel(rId)
+
+
+def embedWorkbooks(ppt):
+    """
+    Writes the full embedded workbook of every chart in *ppt* that was built
+    with embed_workbook='lazy', from the values cached in the chart itself.
+    Returns how many charts were updated
+    """
+    count = 0
+    for slide in ppt.slides:
+        for shape in slide.shapes:
+            if not shape.has_chart:
+                continue
+            workbook = shape.chart.part.chart_workbook
+            if workbook.xlsx_part is None or not __is_lazy_workbook(workbook.xlsx_part.blob):
+                continue
+
+            workbook.update_from_xlsx_blob(__cached_chartdata(shape.chart).xlsx_blob)
+            count += 1
+
+    return count
+
+
+def __cached_chartdata(new_chart):
+    """Rebuilds chart data from the series values cached in *new_chart*"""
+    series_elements = [series._element for series in new_chart.series]
+    if len(series_elements) == 0 or len(series_elements[0].xpath('./c:xVal')) == 0:
+        chart_data = CategoryChartData()
+        chart_data.categories = list(new_chart.plots[0].categories)
+        for series in new_chart.series:
+            chart_data.add_series(series.name, series.values)
+        return chart_data
+
+    bubble = len(series_elements[0].xpath('./c:bubbleSize')) > 0
+    chart_data = BubbleChartData() if bubble else XyChartData()
+    for series, ser in zip(new_chart.series, series_elements):
+        new_series = chart_data.add_series(series.name)
+        columns = [__cached_values(ser, 'xVal'), __cached_values(ser, 'yVal')]
+        if bubble:
+            columns.append(__cached_values(ser, 'bubbleSize'))
+        for point in zip(*columns):
+            new_series.add_data_point(*point)
+
+    return chart_data
+
+
+def __cached_values(ser, name):
+    """The numbers cached under c:*name* of the series element *ser*"""
+    counts = ser.xpath('./c:{}//c:ptCount/@val'.format(name))
+    points = ser.xpath('./c:{}//c:pt'.format(name))
+    values = [None] * (int(counts[0]) if len(counts) > 0 else len(points))
+    for point in points:
+        values[int(point.get('idx'))] = float(point.xpath('./c:v')[0].text)
+
+    return values
+
 
 def __insert_table(slide, placeholder, chartInfo):
     df = chartInfo['data'][0]
@@ -366,68 +1629,267 @@ def __insert_table(slide, placeholder, chartInfo):
     if chartInfo['column_names_as_labels']:
         rows += 1
 
-    # Create new element with same shape and position as placeholder
+    # Create new element with same shape and position as placeholder; rows are
+    # written in bulk below, so only one is created here
     table = slide.shapes.add_table(
-        rows, columns, placeholder.left, placeholder.top, placeholder.width, placeholder.height).table
+        1, columns, placeholder.left, placeholder.top, placeholder.width, placeholder.height).table
     table.first_row = chartInfo['column_names_as_labels']
     table.first_col = chartInfo['first_column_as_labels']
 
     # Populate table
-    colNames = df.columns.tolist()
+    cells = __format_table_cells(df)
+    if chartInfo['column_names_as_labels']:
+        cells = [pd.concat([pd.Series([str(colName)], dtype=object), column],
+                           ignore_index=True)
+                 for colName, column in zip(df.columns.tolist(), cells)]
 
-    rowNum = 0
+    __write_table_cells(table, cells, placeholder.height)
+
+    return table
+
+
+# Tables do not take the body font, so their text is the deck's default text
+# size (PowerPoint's 18pt if it has none), with python-pptx's default top and
+# bottom cell margins
+__TABLE_FONT_SIZE = 18
+__TABLE_CELL_MARGIN = Inches(0.05)
 
-    if chartInfo['column_names_as_labels']:
-        col = 0
-        for colName in colNames:
-            table.cell(0, col).text = str(colName)
-            col += 1
-        rowNum += 1
-
-    for index, row in df.iterrows():
-        col = 0
-        for colName in colNames:
-            table.cell(rowNum, col).text = str(row.iloc[col])
-            col += 1
-        rowNum += 1
+
+def __check_rows_per_slide(chart):
+    """
+    Returns an error string unless chart['rows_per_slide'] is unset, 'auto'
+    or a positive whole number, with the table placed by placeholder_num
+    """
+    rows_per_slide = chart.get('rows_per_slide')
+    if rows_per_slide is None:
+        return None
+
+    if rows_per_slide != 'auto' and (not isinstance(rows_per_slide, numbers.Integral) or
+                                     isinstance(rows_per_slide, bool) or rows_per_slide < 1):
+        return 'rows_per_slide must be a positive whole number or \'auto\', not {!r}'.format(rows_per_slide)
+
+    # Replacing the chart_num'th chart only works on the first page, which
+    # is the slide that has it
+    placeholder_num = chart.get('placeholder_num')
+    if placeholder_num is None or placeholder_num <= 0:
+        return 'rows_per_slide needs a placeholder_num to place the pages by, not chart_num'
+
+
+def __insert_paged_table(slide, placeholder, chartInfo, add_page):
+    """
+    Splits the table over as many slides as it takes to show
+    chartInfo['rows_per_slide'] rows per slide ('auto' fits as many as the
+    placeholder's height allows), repeating the header row on each. Further
+    slides come from *add_page*, which is given the previous slide and
+    returns the next slide and its placeholder (or an error string)
+    """
+    rows_per_slide = chartInfo['rows_per_slide']
+    if rows_per_slide == 'auto':
+        row_height = Pt(__table_font_size(slide) * 1.2) + 2 * __TABLE_CELL_MARGIN
+        rows_per_slide = placeholder.height // row_height
+        if chartInfo['column_names_as_labels']:
+            rows_per_slide -= 1
+        rows_per_slide = max(1, int(rows_per_slide))
+
+    table = None
+    page_count = 0
+    for page in __table_pages(chartInfo['data'][0], rows_per_slide):
+        page_count += 1
+        if page_count > 1:
+            page_slide = add_page(slide)
+            if isinstance(page_slide, str):
+                return 'Failed to create page {} of table: {}'.format(page_count, page_slide)
+            slide, placeholder = page_slide
+
+        page_table = __insert_table(slide, placeholder, dict(chartInfo, data=[page]))
+        if table is None:
+            table = page_table
 
     return table
 
 
+def __table_font_size(slide):
+    """The point size of table text in *slide*'s deck"""
+    presentation = slide.part.package.presentation_part._element
+    sizes = presentation.xpath('./p:defaultTextStyle/a:lvl1pPr/a:defRPr/@sz')
+    if len(sizes) == 0:
+        return __TABLE_FONT_SIZE
+    # In hundredths of a point
+    return int(sizes[0]) / 100
+
+
+def __table_pages(df, rows_per_page):
+    """Yields *df* a page of rows at a time (at least one, possibly empty, page)"""
+    yield df.iloc[:rows_per_page]
+    for start in range(rows_per_page, len(df), rows_per_page):
+        yield df.iloc[start:start + rows_per_page]
+
+
+def __add_table_page(ppt, layouts, previous_slide, slide, chart):
+    """
+    Adds a slide with the same layout as *previous_slide*, and the title of
+    *slide*, straight after it, returning it with the placeholder the table
+    goes in
+    """
+    slide_layout = previous_slide.slide_layout
+    target = None
+    if slide_layout in ppt.slide_layouts:
+        taken, (target,) = __place_charts(
+            layouts[ppt.slide_layouts.index(slide_layout)], [chart])
+        new_slide = __add_slide(ppt, slide_layout, taken)
+    else:
+        new_slide = ppt.slides.add_slide(slide_layout)
+
+    # add_slide appends; move it so the pages stay together
+    sldIdLst = ppt.slides._sldIdLst
+    sldIdLst.insert(ppt.slides.index(previous_slide) + 1, sldIdLst[-1])
+
+    if new_slide.shapes.title is not None and slide.get('title') is not None:
+        new_slide.shapes.title.text = slide.get('title')
+
+    placeholder = __get_target(new_slide, slide, chart, target)
+    if placeholder is None or isinstance(placeholder, str):
+        return placeholder
+
+    return new_slide, placeholder
+
+
+# Characters python-pptx turns into paragraphs, line breaks or _xHHHH_ escapes
+__TABLE_SPECIAL_CHARS = r'[\x00-\x08\x0A-\x1F]'
+
+
+def __format_table_cells(df):
+    """
+    Returns one Series of cell strings per column of *df*, formatted exactly as
+    str() of the value in a row from iterrows() would be
+    """
+    # Take the whole frame as one array so values keep the same common dtype
+    # a row from iterrows() would have had
+    values = df.to_numpy()
+
+    cells = []
+    for col in range(values.shape[1]):
+        column = values[:, col]
+        if column.dtype.kind in 'biufc':
+            cells.append(pd.Series(column.astype(str), dtype=object))
+        else:
+            cells.append(pd.Series(column, dtype=object).map(str))
+
+    return cells
+
+
+def __write_table_cells(table, cells, height):
+    """
+    Replaces the rows of *table* with the text in *cells*, one Series of
+    strings per column, building all the a:tr elements in one XML pass
+    """
+    tbl = table._tbl
+    for tr in tbl.tr_lst:
+        tbl.remove(tr)
+
+    # Same row heights python-pptx gives a new table, the last row absorbing
+    # any division error
+    rows = len(cells[0])
+    heights = [height // rows] * rows
+    heights[-1] = height - (rows - 1) * (height // rows)
+
+    tc_xml = []
+    special = []
+    for col, text in enumerate(cells):
+        is_special = text.str.contains(__TABLE_SPECIAL_CHARS).to_numpy()
+        for row in np.flatnonzero(is_special):
+            special.append((row, col, text.iloc[row]))
+
+        escaped = text.str.replace('&', '&amp;', regex=False).str.replace(
+            '<', '&lt;', regex=False).str.replace('>', '&gt;', regex=False)
+        runs = ('<a:r><a:t>' + escaped + '</a:t></a:r>').where(
+            (text != '') & ~is_special, '')
+        tc_xml.append(('<a:tc><a:txBody><a:bodyPr/><a:lstStyle/><a:p>' + runs +
+                       '</a:p></a:txBody><a:tcPr/></a:tc>').tolist())
+
+    tr_xml = ''.join(
+        '<a:tr h="{}">{}</a:tr>'.format(height, ''.join(row))
+        for height, row in zip(heights, zip(*tc_xml)))
+    tbl.extend(list(parse_xml(
+        '<a:tbl {}>{}</a:tbl>'.format(nsdecls('a'), tr_xml))))
+
+    # Leave text needing paragraphs, breaks or escapes to python-pptx
+    for row, col, text in special:
+        table.cell(row, col).text = text
+
+
 def __iterable(obj):
     return isinstance(obj, Iterable)
 
 
-def __create_chartdata(chart):
-    chart_data = CategoryChartData()
-
+def __create_chartdata(chart, transpose=False):
+    """
+    Builds ArrayCategoryChartData from the first frame in chart['data']: one
+    series per row and one category per column, or with *transpose* one
+    series per column and one category per row, read straight from the
+    frame rather than from a transposed copy of it
+    """
     # TODO: Deal with First Row as Labels and Column Names as Labels
 
-    colNames = chart['data'][0].columns.tolist()
+    dataframe = chart['data'][0]
+    colNames = dataframe.columns.tolist()
     offset = 0
 
     if (chart['first_column_as_labels']):
         offset = 1
 
-    if len(colNames) > offset:
+    if transpose:
+        return __create_transposed_chartdata(chart, dataframe, colNames, offset)
 
-        colNum = 1
-        for colName in colNames[offset:]:
-            if (chart['column_names_as_labels']):
-                chart_data.categories.add_category(colName)
-            else:
-                chart_data.categories.add_category('Category '+str(colNum))
+    if len(colNames) <= offset:
+        return ArrayCategoryChartData()
 
-        rowNum = 1
-        for index, row in chart['data'][0].iterrows():
-            data = []
-            for colName in colNames[offset:]:
-                data.append(row[colName])
+    if (chart['column_names_as_labels']):
+        categories = colNames[offset:]
+    else:
+        categories = ['Category 1'] * (len(colNames) - offset)
 
-            if chart['first_column_as_labels']:
-                chart_data.add_series(str(row[0]), data)
-            else:
-                chart_data.add_series('Series ' + str(rowNum), data)
+    # Take the whole frame as one array so values keep the same common dtype
+    # a row from iterrows() would have had
+    values = dataframe.to_numpy()
+
+    if chart['first_column_as_labels']:
+        series_names = [str(label) for label in values[:, 0].tolist()]
+    else:
+        series_names = ['Series 1'] * len(values)
+
+    return __build_category_chartdata(categories, series_names, values[:, offset:])
+
+
+def __create_transposed_chartdata(chart, dataframe, colNames, offset):
+    if len(colNames) <= offset or len(dataframe) == 0:
+        return ArrayCategoryChartData()
+
+    if chart['first_column_as_labels']:
+        categories = dataframe.iloc[:, 0]
+    else:
+        categories = ['Category 1'] * len(dataframe)
+
+    if chart['column_names_as_labels']:
+        series_names = [str(colName) for colName in colNames[offset:]]
+    else:
+        series_names = ['Series 1'] * (len(colNames) - offset)
+
+    # A transposed frame would have held the values columns' common dtype;
+    # .T is only a view of this array
+    values = dataframe.iloc[:, offset:].to_numpy()
+
+    return __build_category_chartdata(categories, series_names, values.T)
+
+
+def __build_category_chartdata(categories, series_names, values):
+    """
+    Builds ArrayCategoryChartData from whole arrays: one category label per
+    column of *values* and one series name per row
+    """
+    chart_data = ArrayCategoryChartData()
+    chart_data.categories = categories
+    chart_data.add_series_rows(series_names, values)
 
     return chart_data
 
@@ -445,31 +1907,21 @@ def __create_xyzdata(dfs):
 
         if len(colNames) > 1 and len(colNames) < 4:
             if len(colNames) == 2 and chart_data is None:
-                chart_data = XyChartData()
+                chart_data = ArrayXyChartData()
             elif len(colNames) == 3 and chart_data is None:
-                chart_data = BubbleChartData()
-
-            series = chart_data.add_series(name)
-            for index, row in df.iterrows():
-                data = []
-                for colName in colNames:
-                    data.append(row[colName])
+                chart_data = ArrayBubbleChartData()
 
-                if len(colNames) == 2:
-                    series.add_data_point(data[0], data[1])
-                else:
-                    series.add_data_point(data[0], data[1], data[2])
+            columns = dict(x_values=df.iloc[:, 0], y_values=df.iloc[:, 1])
+            if isinstance(chart_data, ArrayBubbleChartData):
+                columns['bubble_sizes'] = df.iloc[:, 2]
+            chart_data.add_series(name, **columns)
 
             seriesNum += 1
 
     return chart_data
 
 
-def __insert_chart(chart_type, slide, placeholder, chart):
-    chart_data = __create_chartdata(chart)
-    if chart_data is None:
-        return 'Could not create chart data'
-
+def __insert_chart(chart_type, slide, placeholder, chart, chart_data):
     # Create new element with same shape and position as placeholder
     new_chart = slide.shapes.add_chart(chart_type, placeholder.left,
                                        placeholder.top, placeholder.width, placeholder.height, chart_data).chart
@@ -540,11 +1992,7 @@ def __set_axis_object(axis_object, axis):
         'number_format', '$#0.0,,"M";[Red]($#0.0,,"M")')
 
 
-def __insert_xyzchart(chart_type, slide, placeholder, chart):
-    chart_data = __create_xyzdata(chart['data'])
-    if chart_data is None:
-        return 'Could not create chart data'
-
+def __insert_xyzchart(chart_type, slide, placeholder, chart, chart_data):
     # Create new element with same shape and position as placeholder
     new_chart = slide.shapes.add_chart(chart_type, placeholder.left,
                                        placeholder.top, placeholder.width, placeholder.height, chart_data).chart
@@ -566,4 +2014,4 @@ def __get_datafile_name(filename):
     """
     return the default template file that comes with the package
     """
-    return Path(__file__).parent / "data/" + filename
+    return Path(__file__).parent / "data" / filename
@@ -0,0 +1,83 @@
+"""Point reduction for line, area and scatter series with very many points."""
+
+import numpy as np
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Returns the sorted positions of the points Largest-Triangle-Three-Buckets
+    keeps when reducing the series (*x*, *y*) to *max_points* points. The
+    first and last points are always kept; each bucket in between keeps the
+    point making the largest triangle with the point kept from the previous
+    bucket and the average of the next one
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points <= 2:
+        return np.array([0, n - 1])[:max(max_points, 0)]
+
+    edges = __bucket_edges(1, n - 1, max_points - 2)
+    keep = np.empty(max_points, dtype=np.intp)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    # Averages of each bucket (and of the final point, for the last bucket)
+    counts = np.diff(edges)
+    x_means = np.append(np.add.reduceat(x, edges[:-1]) / counts, x[-1])
+    y_means = np.append(np.add.reduceat(y, edges[:-1]) / counts, y[-1])
+
+    for bucket in range(max_points - 2):
+        start = edges[bucket]
+        end = edges[bucket + 1]
+        anchor = keep[bucket]
+        areas = np.abs(
+            (x[anchor] - x_means[bucket + 1]) * (y[start:end] - y[anchor]) -
+            (x[anchor] - x[start:end]) * (y_means[bucket + 1] - y[anchor]))
+        areas[np.isnan(areas)] = -1
+        keep[bucket + 1] = start + np.argmax(areas)
+
+    return keep
+
+
+def minmax_indices(y, max_points):
+    """
+    Returns the sorted positions of the points kept when reducing *y* to at
+    most *max_points* points by keeping the minimum and maximum of each of
+    max_points / 2 equal buckets. *y* may be two-dimensional (one row per
+    point), in which case the extremes of all columns together are kept
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, np.newaxis]
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+
+    buckets = max(1, max_points // 2)
+    edges = __bucket_edges(0, n, buckets)
+    width = int(np.diff(edges).max())
+
+    # Lay the buckets out as rows of a padded 2D array so that every bucket's
+    # extremes come out of one argmin/argmax
+    positions = edges[:-1, np.newaxis] + np.arange(width)
+    valid = positions < edges[1:, np.newaxis]
+    positions = np.where(valid, positions, edges[1:, np.newaxis] - 1)
+
+    lows = np.where(np.isnan(y), np.inf, y).min(axis=1)[positions]
+    highs = np.where(np.isnan(y), -np.inf, y).max(axis=1)[positions]
+    lows[~valid] = np.inf
+    highs[~valid] = -np.inf
+
+    rows = np.arange(buckets)
+    keep = np.concatenate([positions[rows, lows.argmin(axis=1)],
+                           positions[rows, highs.argmax(axis=1)]])
+
+    return np.unique(keep)
+
+
+def __bucket_edges(start, end, buckets):
+    """Start of each of *buckets* near-equal buckets in start..end-1, then end"""
+    return np.linspace(start, end, buckets + 1).astype(np.intp)
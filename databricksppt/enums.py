@@ -0,0 +1,58 @@
+"""Option values of the presentation dict, importable without pandas or python-pptx."""
+
+from enum import Enum
+
+
+class CHART_TYPE(Enum):
+    AREA = 'Area'
+    AREA_STACKED = 'Area-Stacked'
+    AREA_STACKED_100 = 'Area-Stacked-100'
+    BAR = 'Bar'
+    BAR_STACKED = 'Bar-Stacked'
+    BAR_STACKED_100 = 'Bar-Stacked-100'
+    COLUMN = 'Column'
+    COLUMN_STACKED = 'Column-Stacked'
+    COLUMN_STACKED_100 = 'Column-Stacked-100'
+    LINE = 'Line'
+    LINE_STACKED = 'Line-Stacked'
+    LINE_STACKED_100 = 'Line-Stacked-100'
+    LINE_MARKED = 'Line-Marked'
+    LINE_MARKED_STACKED = 'Line-Marked-Stacked'
+    LINE_MARKED_STACKED_100 = 'Line-Marked-Stacked-100'
+    DOUGHNUT = 'Doughnut'
+    DOUGHNUT_EXPLODED = 'Doughnut-Exploded'
+    PIE = 'Pie'
+    PIE_EXPLODED = 'Pie-Exploded'
+    RADAR = 'Radar'
+    RADAR_FILLED = 'Radar-Filled'
+    RADAR_MARKED = 'Radar-Marked'
+    XY_SCATTER = 'XY-Scatter'
+    XY_SCATTER_LINES = 'XY-Scatter-Lines'
+    XY_SCATTER_LINES_SMOOTHED = 'XY-Scatter-Lines-Smoothed'
+    XY_SCATTER_LINES_MARKED = 'XY-Scatter-Lines-Marked'
+    XY_SCATTER_LINES_MARKED_SMOOTHED = 'XY-Scatter-Lines-Marked-Smoothed'
+    BUBBLE = 'Bubble'
+    TABLE = 'Table'
+
+
+class LEGEND_POSITION(Enum):
+    BOTTOM = 'Bottom'
+    CORNER = 'Corner'
+    LEFT = 'Left'
+    NONE = 'None'
+    RIGHT = 'Right'
+    TOP = 'Top'
+
+
+class EMBED_WORKBOOK(Enum):
+    FULL = 'full'
+    NONE = 'none'
+    LAZY = 'lazy'
+
+
+class AGGREGATION(Enum):
+    SUM = 'sum'
+    MEAN = 'mean'
+    COUNT = 'count'
+    MIN = 'min'
+    MAX = 'max'
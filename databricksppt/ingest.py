@@ -0,0 +1,116 @@
+"""
+Reads large CSV extracts in chunks, keeping only the columns a chart needs
+and aggregating as it goes, so that only the aggregated frame is ever held
+in full.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+from .enums import AGGREGATION
+
+
+# How each aggregation's partial results (per chunk) are combined
+__COMBINE = dict(sum='sum', count='sum', min='min', max='max')
+
+# Partial results held before they are combined into one
+__MAX_PARTIALS = 16
+
+
+def read_csv(data_file, columns=None, dtype=None, group_by=None, agg='sum',
+             chunksize=100000, engine='c'):
+    """
+    Reads *data_file* into a DataFrame, *chunksize* rows at a time. Only
+    *columns* are parsed, if given, with the types in *dtype*. With
+    *group_by* the other columns are aggregated by *agg* per group, chunk by
+    chunk, and the result has one row per group, the group columns first.
+    *engine* 'pyarrow' parses with pyarrow's streaming CSV reader
+    """
+    if agg not in [aggregation.value for aggregation in AGGREGATION]:
+        raise ValueError('Unknown aggregation {}'.format(agg))
+
+    group_by = list(group_by or [])
+    if columns is not None:
+        columns = list(columns)
+        columns += [column for column in group_by if column not in columns]
+
+    chunks = __read_chunks(data_file, columns, dtype, chunksize, engine)
+    if not group_by:
+        chunks = list(chunks)
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+    partials = []
+    for chunk in chunks:
+        partials.append(__aggregate(chunk, group_by, agg))
+        if len(partials) >= __MAX_PARTIALS:
+            partials = [__combine(partials, group_by, agg)]
+
+    if not partials:
+        return pd.DataFrame(columns=columns)
+
+    result = __combine(partials, group_by, agg)
+    if agg == 'mean':
+        values = [column for column in result.columns if column[1] == 'sum']
+        result = pd.DataFrame({
+            column: result[(column, 'sum')] / result[(column, 'count')]
+            for column, _ in values}, index=result.index)
+
+    return result.reset_index()
+
+
+def __read_chunks(data_file, columns, dtype, chunksize, engine):
+    """Yields *data_file* as DataFrames of about *chunksize* rows"""
+    if engine == 'pyarrow':
+        if pa is None:
+            raise ImportError('pyarrow is needed for the pyarrow CSV engine')
+        reader = pa_csv.open_csv(
+            data_file,
+            read_options=pa_csv.ReadOptions(block_size=max(chunksize, 1) * 64),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types={column: __arrow_type(kind) for column, kind in (dtype or {}).items()}))
+        for batch in reader:
+            yield batch.to_pandas()
+        return
+
+    yield from pd.read_csv(data_file, usecols=columns, dtype=dtype, chunksize=chunksize)
+
+
+def __arrow_type(kind):
+    """The pyarrow type for a pandas dtype name"""
+    if kind == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind in ['str', 'string', 'object']:
+        return pa.string()
+    return pa.from_numpy_dtype(np.dtype(kind))
+
+
+def __aggregate(chunk, group_by, agg):
+    """
+    One chunk's partial result, indexed by group. Sums and means are only
+    taken of numeric columns
+    """
+    if agg in ['sum', 'mean']:
+        values = chunk.drop(columns=group_by).select_dtypes('number')
+        chunk = pd.concat([chunk[group_by], values], axis=1)
+
+    grouped = chunk.groupby(group_by, sort=False, dropna=False, observed=True)
+    if agg == 'mean':
+        return grouped.agg(['sum', 'count'])
+    return grouped.agg(agg)
+
+
+def __combine(partials, group_by, agg):
+    """Reduces partial results to one, still indexed by group"""
+    combined = pd.concat(partials)
+    grouped = combined.groupby(level=list(range(len(group_by))), sort=True,
+                               dropna=False, observed=True)
+    if agg == 'mean':
+        return grouped.sum()
+    return grouped.agg(__COMBINE[agg])
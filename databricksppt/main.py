@@ -4,12 +4,10 @@ import sys
 import os
 
 import click
-import numpy as np
-import pandas as pd
 from pathlib import Path
-from pptx import Presentation
 
-from .databricksppt import toPPT, CHART_TYPE, LEGEND_POSITION
+from .client import SERVER_ENV, ServerUnavailable, RenderError, render
+from .enums import AGGREGATION, CHART_TYPE, LEGEND_POSITION
 
 
 @click.command()
@@ -30,19 +28,41 @@ from .databricksppt import toPPT, CHART_TYPE, LEGEND_POSITION
 @click.option('--first-column-as-labels', type=click.Choice(['True', 'False', 'Infer'], case_sensitive=False), default='Infer', help='Use values in first column as category labels(default=Infer)')
 @click.option('--transpose', is_flag=True, help='Switches the rows from the dataframe to be categories and the columns to be series')
 @click.option('--open', is_flag=True, help='Attempt to automatically open the PPTX file on success')
-def main(inputfile, inputfile2, outputfile, template, layout_num, title, chart_title, slide_num, placeholder_num, chart_num, column_names_as_labels, first_column_as_labels, chart_type, legend_position, overlay_legend, transpose, open):
+@click.option('--profile', type=int, metavar='N', help='Print the time spent per stage and the N most expensive charts')
+@click.option('--server', envvar=SERVER_ENV, help='Render on a running `databricksppt serve` at this address (unix:/path or host:port); falls back to rendering here if none is running')
+@click.option('--columns', type=str, help='Comma separated columns to read from the input files; the rest are skipped')
+@click.option('--dtype', type=str, multiple=True, metavar='COLUMN=TYPE', help='Type to parse a column as, e.g. Region=category; may be repeated')
+@click.option('--group-by', type=str, help='Comma separated columns to group rows by, aggregating the other columns')
+@click.option('--agg', type=click.Choice(list(map(lambda x: str(x.value), AGGREGATION)), case_sensitive=False), default='sum', help='Aggregation for --group-by (default = sum)')
+@click.option('--chunksize', type=int, default=100000, help='Rows read at a time with --columns, --dtype or --group-by (default = 100000)')
+@click.option('--engine', type=click.Choice(['c', 'pyarrow'], case_sensitive=False), default='c', help='CSV parser; pyarrow streams with pyarrow\'s CSV reader (default = c)')
+@click.option('--compress-level', type=click.IntRange(0, 9), help='Deflate level of the saved PPTX, 0-9 (default = 6)')
+@click.option('--store-compressed', is_flag=True, help='Store the embedded workbook and other compressed parts without deflating them again')
+@click.option('--format', 'output_format', type=click.Choice(['pptx', 'ppttc'], case_sensitive=False), default='pptx', help='pptx, or ppttc: think-cell JSON filling the think-cell --template (default = pptx)')
+def main(inputfile, inputfile2, outputfile, template, layout_num, title, chart_title, slide_num, placeholder_num, chart_num, column_names_as_labels, first_column_as_labels, chart_type, legend_position, overlay_legend, transpose, open, profile, server, columns, dtype, group_by, agg, chunksize, engine, compress_level, store_compressed, output_format):
     """
     Runs databricksppt from the command line, using CSV input to produce a Powerpoint
     file including a Chart or Table built from this data
     """
-    if (Path(outputfile).suffix != '.pptx'):
-        outputfile += '.pptx'
+    output_format = output_format.lower()
+    if (Path(outputfile).suffix != '.' + output_format):
+        outputfile += '.' + output_format
 
-    df = pd.read_csv(inputfile)  # , header=None)
-    #df.name = "MyData"
+    # Data is referenced by file until we know whether the server reads it
+    df = inputfile
     if (inputfile2 is not None):
-        df2 = pd.read_csv(inputfile2)
-        df = [df, df2]
+        df = [inputfile, inputfile2]
+
+    ingest = None
+    if columns or dtype or group_by or engine == 'pyarrow':
+        ingest = dict(
+            columns=__split(columns),
+            dtype=__parse_dtypes(dtype),
+            group_by=__split(group_by),
+            agg=agg.lower(),
+            chunksize=chunksize,
+            engine=engine.lower()
+        )
 
     column_names_as_labels = None if column_names_as_labels == 'Infer' else True if column_names_as_labels == 'True' else False
     first_column_as_labels = None if first_column_as_labels == 'Infer' else True if first_column_as_labels == 'True' else False
@@ -78,10 +98,100 @@ def main(inputfile, inputfile2, outputfile, template, layout_num, title, chart_t
         slides=[slide]
     )
 
-    ppt = toPPT(presentation)
+    forward = server and profile is None and output_format == 'pptx'
+    if forward and ingest is None:
+        if __forward(lambda: __render_remote(server, presentation, outputfile), outputfile, open):
+            return
+
+    import pandas as pd
+    from .databricksppt import toPPT, toPPTTC, savePPT
+    from .profiler import ProfileSummary
+
+    if ingest is None:
+        chart['data'] = [pd.read_csv(data_file) for data_file in df] if isinstance(df, list) else pd.read_csv(df)  # , header=None)
+    else:
+        # Only the aggregated frames are held in full
+        from .ingest import read_csv
+        chart['data'] = [read_csv(data_file, **ingest) for data_file in df] if isinstance(df, list) else read_csv(df, **ingest)
+    #df.name = "MyData"
+
+    if output_format == 'ppttc':
+        error = toPPTTC(presentation, outputfile)
+        if error is not None:
+            print(error)
+        elif open:
+            os.system('open '+outputfile)
+        return
+
+    if forward and ingest is not None:
+        from .client import toPPT_remote
+        if __forward(lambda: toPPT_remote(server, presentation, outputfile), outputfile, open):
+            return
+
+    profiler = None
+    if profile is not None:
+        profiler = ProfileSummary(trace_memory=True)
+
+    ppt = toPPT(presentation, profiler=profiler)
     if (isinstance(ppt, str)):
         print(ppt)
     else:
-        ppt.save(outputfile)
+        savePPT(ppt, outputfile, profiler=profiler, compresslevel=compress_level,
+                store_compressed=store_compressed)
         if open:
             os.system('open '+outputfile)
+
+    if profiler is not None:
+        profiler.close()
+        profiler.print_top(profile)
+
+
+def __split(names):
+    return None if not names else [name.strip() for name in names.split(',')]
+
+
+def __parse_dtypes(dtypes):
+    parsed = {}
+    for dtype in dtypes:
+        column, sep, kind = dtype.partition('=')
+        if not sep:
+            raise click.BadParameter('expected COLUMN=TYPE, got {}'.format(dtype), param_hint='--dtype')
+        parsed[column.strip()] = kind.strip()
+    return parsed or None
+
+
+def __forward(render_remote, outputfile, open):
+    """
+    Renders on the server. Returns False if there is no server to render
+    on, so the caller renders here instead
+    """
+    try:
+        render_remote()
+    except ServerUnavailable:
+        return False
+    except RenderError as e:
+        print(e)
+        return True
+
+    if open:
+        os.system('open '+outputfile)
+    return True
+
+
+def __render_remote(server, presentation, outputfile):
+    """
+    Sends the input files as they are to the server, which saves the deck to
+    outputfile
+    """
+    chart = presentation['slides'][0]['charts'][0]
+    data_files = chart['data'] if isinstance(chart['data'], list) else [chart['data']]
+    payloads = []
+    for num, data_file in enumerate(data_files):
+        with open(data_file, 'rb') as stream:
+            payloads.append(('input{}'.format(num + 1), 'csv', stream.read()))
+
+    names = [name for name, data_format, data in payloads]
+    chart = dict(chart, data=names if isinstance(chart['data'], list) else names[0])
+    spec = dict(presentation, slides=[dict(presentation['slides'][0], charts=[chart])],
+                output=os.path.abspath(outputfile))
+    render(server, spec, payloads)
@@ -0,0 +1,169 @@
+"""
+Writes a Presentation's package (the .pptx zip) with its parts deflated on a
+thread pool, as zlib lets go of the GIL while it compresses. The parts are
+written in the order python-pptx writes them, each as soon as it and those
+before it are compressed, so only a few are held compressed at once.
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+
+try:
+    from pptx.opc.serialized import _ContentTypesItem
+except ImportError:
+    # python-pptx before 1.0, whose packages are written with pres.save
+    _ContentTypesItem = None
+
+
+# python-pptx's, and zlib's, default
+DEFAULT_COMPRESSLEVEL = 6
+
+# Parts that are compressed already, stored as they are with store_compressed
+PRECOMPRESSED_EXTENSIONS = ['.xlsx', '.xlsm', '.docx', '.pptx', '.zip', '.png', '.jpg',
+                            '.jpeg', '.gif', '.tif', '.tiff', '.wdp', '.mp3', '.m4a',
+                            '.mp4', '.m4v', '.mov', '.wmv']
+
+_STORED = 0
+_DEFLATED = 8
+
+# Sizes, offsets and counts beyond these need the zip64 extensions, in
+# which the fields hold the marker and the values follow in an extra field
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+_ZIP64_MARKER = 0xFFFFFFFF
+_ZIP64_COUNT_MARKER = 0xFFFF
+
+
+def write_package(pres, output, compresslevel=None, store_compressed=False, max_workers=None):
+    """
+    Writes *pres* to *output*, a path or a writable binary file-like object
+    (which need not be seekable), deflating its parts at *compresslevel*
+    (0-9) on *max_workers* threads. With *store_compressed* the parts in
+    PRECOMPRESSED_EXTENSIONS are stored without being deflated again.
+    Before python-pptx 1.0 this is pres.save, without those options
+    """
+    if _ContentTypesItem is None:
+        pres.save(output)
+        return
+
+    if isinstance(output, str) or hasattr(output, '__fspath__'):
+        with open(output, 'wb') as output_file:
+            return write_package(pres, output_file, compresslevel, store_compressed, max_workers)
+
+    if compresslevel is None:
+        compresslevel = DEFAULT_COMPRESSLEVEL
+
+    package = pres.part.package
+    parts = tuple(package.iter_parts())
+    members = [(CONTENT_TYPES_URI.membername,
+                lambda: serialize_part_xml(_ContentTypesItem.xml_for(parts))),
+               (PACKAGE_URI.rels_uri.membername, lambda: package._rels.xml)]
+    for part in parts:
+        members.append((part.partname.membername, lambda part=part: part.blob))
+        if part._rels:
+            members.append((part.partname.rels_uri.membername, lambda part=part: part.rels.xml))
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    writer = _ZipWriter(output)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        window = 2 * max_workers
+        for name, blob in members:
+            store = store_compressed and path.splitext(name)[1].lower() in PRECOMPRESSED_EXTENSIONS
+            pending.append(pool.submit(_compress, name, blob, compresslevel, store))
+            if len(pending) >= window:
+                writer.write(*pending.popleft().result())
+        while pending:
+            writer.write(*pending.popleft().result())
+    writer.close()
+
+
+def _compress(name, blob, compresslevel, store):
+    """A member as the writer takes it: name, data, method, CRC and size"""
+    data = blob()
+    crc = zlib.crc32(data)
+    if not store:
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        # Data that does not shrink is stored instead
+        if len(compressed) < len(data):
+            return name, compressed, _DEFLATED, crc, len(data)
+    return name, data, _STORED, crc, len(data)
+
+
+class _ZipWriter(object):
+    """
+    Writes zip members already compressed to *output*, counting the offsets
+    itself rather than seeking. Every member's size and CRC are known before
+    it is written, so no data descriptors are needed
+    """
+
+    def __init__(self, output):
+        self._output = output
+        self._offset = 0
+        self._directory = []
+        now = time.localtime()
+        self._date = (now.tm_year - 1980) << 9 | now.tm_mon << 5 | now.tm_mday
+        self._time = now.tm_hour << 11 | now.tm_min << 5 | now.tm_sec // 2
+
+    def write(self, name, data, method, crc, size):
+        encoded = name.encode('utf-8')
+        flags = 0 if len(encoded) == len(name) else 0x800
+        self._directory.append((encoded, flags, method, crc, len(data), size, self._offset))
+
+        zip64 = size > _ZIP64_LIMIT or len(data) > _ZIP64_LIMIT
+        extra = struct.pack('<HHQQ', 1, 16, size, len(data)) if zip64 else b''
+        self._write(struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 45 if zip64 else 20, flags, method,
+            self._time, self._date, crc,
+            _ZIP64_MARKER if zip64 else len(data), _ZIP64_MARKER if zip64 else size,
+            len(encoded), len(extra)))
+        self._write(encoded)
+        self._write(extra)
+        self._write(data)
+
+    def close(self):
+        start = self._offset
+        for encoded, flags, method, crc, compressed, size, offset in self._directory:
+            values = [size, compressed, offset]
+            large = [value for value in values if value > _ZIP64_LIMIT]
+            size, compressed, offset = [
+                _ZIP64_MARKER if value > _ZIP64_LIMIT else value for value in values]
+            extra = b''
+            if large:
+                extra = struct.pack('<HH' + 'Q' * len(large), 1, 8 * len(large), *large)
+            version = 45 if large else 20
+            self._write(struct.pack(
+                '<IHHHHHHIIIHHHHHII', 0x02014b50, version, version, flags, method,
+                self._time, self._date, crc, compressed, size, len(encoded), len(extra),
+                0, 0, 0, 0o600 << 16, offset))
+            self._write(encoded)
+            self._write(extra)
+
+        count = len(self._directory)
+        directory_size = self._offset - start
+        if count > _ZIP64_COUNT_LIMIT or start > _ZIP64_LIMIT or directory_size > _ZIP64_LIMIT:
+            end = self._offset
+            self._write(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0,
+                                    count, count, directory_size, start))
+            self._write(struct.pack('<IIQI', 0x07064b50, 0, end, 1))
+            count = _ZIP64_COUNT_MARKER if count > _ZIP64_COUNT_LIMIT else count
+            directory_size = _ZIP64_MARKER if directory_size > _ZIP64_LIMIT else directory_size
+            start = _ZIP64_MARKER if start > _ZIP64_LIMIT else start
+
+        self._write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count,
+                                directory_size, start, 0))
+
+    def _write(self, data):
+        self._output.write(data)
+        self._offset += len(data)
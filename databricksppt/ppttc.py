@@ -0,0 +1,113 @@
+"""
+Writes think-cell .ppttc JSON (see data/template.html) as it goes, a table
+row at a time, with each column's cells formatted in one vectorized pass.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+PPTTC_TYPE = 'application/vnd.think-cell.ppttc+json'
+
+NULL_CELL = 'null'
+
+# Text JSON cannot hold as it is, left to json.dumps
+__JSON_SPECIAL_CHARS = r'[\x00-\x1F]'
+
+# infer_dtype results for object columns written as numbers or dates
+__NUMBER_INFERRED_TYPES = ['integer', 'floating', 'mixed-integer-float', 'decimal']
+__DATE_INFERRED_TYPES = ['datetime64', 'datetime', 'date']
+
+
+class PPTTCWriter(object):
+    """
+    Streams a .ppttc file to *stream*, a text file object: call template()
+    for each slide, then table() for each chart on it, and finally close()
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._templates = 0
+        self._tables = 0
+        self._stream.write('[')
+
+    def template(self, template):
+        if self._templates:
+            self._stream.write(']},')
+        self._stream.write('{{"template":{},"data":['.format(json.dumps(template)))
+        self._templates += 1
+        self._tables = 0
+
+    def table(self, name, rows):
+        """
+        Writes a named table; *rows* is an iterable of lists of cells as
+        JSON text (see cells())
+        """
+        if self._tables:
+            self._stream.write(',')
+        self._stream.write('{{"name":{},"table":['.format(json.dumps(name)))
+        for num, row in enumerate(rows):
+            self._stream.write(('[' if num == 0 else ',[') + ','.join(row) + ']')
+        self._stream.write(']}')
+        self._tables += 1
+
+    def close(self):
+        self._stream.write(']}]' if self._templates else ']')
+
+
+def cells(values):
+    """
+    The think-cell cells for *values*, a Series or Index, as a list of JSON
+    text: {"number":...} for numbers, {"date":"YYYY-MM-DD"} for dates and
+    {"string":...} for anything else, with null for missing values
+    """
+    values = pd.Series(values, copy=False)
+    dtype = values.dtype
+    if dtype.kind == 'b':
+        return number_cells(values.astype(int))
+    if dtype.kind in 'iuf' or (pd.api.types.is_numeric_dtype(dtype) and dtype.kind != 'c'):
+        return number_cells(values)
+    if dtype.kind == 'M':
+        return date_cells(values)
+
+    if dtype == object:
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred in __NUMBER_INFERRED_TYPES:
+            return number_cells(pd.to_numeric(values))
+        if inferred in __DATE_INFERRED_TYPES:
+            return date_cells(pd.to_datetime(values))
+
+    return string_cells(values)
+
+
+def number_cells(values):
+    if values.dtype.kind in 'iu' and not values.hasnans:
+        text = pd.Series(values.to_numpy().astype(str), dtype=object)
+        return ('{"number":' + text + '}').tolist()
+
+    numbers = values.to_numpy(dtype=float, na_value=np.nan)
+    text = pd.Series(numbers.astype(str), dtype=object)
+    return ('{"number":' + text + '}').where(np.isfinite(numbers), NULL_CELL).tolist()
+
+
+def date_cells(values):
+    values = pd.Series(values, copy=False)
+    if values.dt.tz is not None:
+        values = values.dt.tz_localize(None)
+    text = values.dt.strftime('%Y-%m-%d').astype(object)
+    return ('{"date":"' + text + '"}').where(values.notna().to_numpy(), NULL_CELL).tolist()
+
+
+def string_cells(values):
+    missing = values.isna().to_numpy()
+    text = values.astype(object).where(~missing, '').astype(str).astype(object)
+    special = text.str.contains(__JSON_SPECIAL_CHARS, na=False).to_numpy()
+
+    escaped = text.str.replace('\\', '\\\\', regex=False).str.replace('"', '\\"', regex=False)
+    result = ('{"string":"' + escaped + '"}').where(~missing, NULL_CELL)
+    for row in np.flatnonzero(special & ~missing):
+        result.iloc[row] = '{{"string":{}}}'.format(json.dumps(text.iloc[row], ensure_ascii=False))
+
+    return result.tolist()
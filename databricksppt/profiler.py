@@ -0,0 +1,112 @@
+"""Per-stage timing of toPPT, and a summary of the most expensive charts."""
+
+import sys
+import tracemalloc
+from collections import OrderedDict, namedtuple
+from time import perf_counter
+
+
+# One event per stage of the render. *slide* and *chart* count from 1 and are
+# None where they do not apply; the 'chart' and 'slide' stages are the totals
+# of every stage of a chart or slide. *bytes* is the growth in memory traced
+# by tracemalloc, or None when it is not tracing
+ProfileEvent = namedtuple('ProfileEvent', ['stage', 'slide', 'chart', 'seconds',
+                                           'rows', 'columns', 'bytes'])
+
+
+class Stopwatch(object):
+    """
+    Times consecutive stages: each lap() ends the stage started by the one
+    before it (or by creating the stopwatch)
+    """
+
+    def __init__(self):
+        self.laps = []
+        self.restart()
+
+    def lap(self, stage):
+        """Records (stage, seconds, bytes) for the stage that just ended"""
+        memory = _traced_memory()
+        allocated = None
+        if memory is not None and self._memory is not None:
+            allocated = memory - self._memory
+        self.laps.append((stage, perf_counter() - self._time, allocated))
+        self.restart()
+
+    def restart(self):
+        """Starts the next stage now, leaving out the time since the last lap"""
+        self._memory = _traced_memory()
+        self._time = perf_counter()
+
+
+def _traced_memory():
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0]
+
+
+class ProfileSummary(object):
+    """
+    Profiler for toPPT (and savePPT) that keeps every event, and reports
+    the time spent per stage and the most expensive charts. With
+    *trace_memory* it starts tracemalloc (if not already running) so events
+    carry allocated bytes; close() stops it again
+    """
+
+    def __init__(self, trace_memory=False):
+        self.events = []
+        self._stop_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._stop_tracing:
+            tracemalloc.start()
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def close(self):
+        if self._stop_tracing:
+            tracemalloc.stop()
+            self._stop_tracing = False
+
+    def stages(self):
+        """Total seconds per stage, in the order stages were first seen"""
+        totals = OrderedDict()
+        for event in self.events:
+            if event.stage in ['chart', 'slide']:
+                continue
+            totals[event.stage] = totals.get(event.stage, 0) + event.seconds
+        return totals
+
+    def top(self, n=10):
+        """The 'chart' events of the *n* charts that took longest"""
+        charts = [event for event in self.events if event.stage == 'chart']
+        return sorted(charts, key=lambda event: event.seconds, reverse=True)[:n]
+
+    def print_top(self, n=10, file=None):
+        file = sys.stdout if file is None else file
+
+        print('{:<16} {:>10}'.format('stage', 'seconds'), file=file)
+        for stage, seconds in self.stages().items():
+            print('{:<16} {:>10.4f}'.format(stage, seconds), file=file)
+
+        print('', file=file)
+        print('{:>5} {:>5} {:>10} {:>8} {:>8} {:>12}  {}'.format(
+            'slide', 'chart', 'seconds', 'rows', 'columns', 'bytes',
+            'slowest stage'), file=file)
+        for chart in self.top(n):
+            print('{:>5} {:>5} {:>10.4f} {:>8} {:>8} {:>12}  {}'.format(
+                chart.slide, chart.chart, chart.seconds,
+                _blank(chart.rows), _blank(chart.columns), _blank(chart.bytes),
+                self._slowest_stage(chart)), file=file)
+
+    def _slowest_stage(self, chart):
+        stages = [event for event in self.events
+                  if event.slide == chart.slide and event.chart == chart.chart
+                  and event.stage != 'chart']
+        if len(stages) == 0:
+            return ''
+        slowest = max(stages, key=lambda event: event.seconds)
+        return '{} ({:.4f}s)'.format(slowest.stage, slowest.seconds)
+
+
+def _blank(value):
+    return '' if value is None else value
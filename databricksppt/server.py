@@ -0,0 +1,305 @@
+"""
+`databricksppt serve`: a long-running render server, so that modules are
+imported and templates parsed once rather than on every invocation. It
+speaks HTTP, on localhost or on a Unix socket; see client.py for the
+request format.
+
+Renders run on a bounded pool of worker threads. Up to *queue_size*
+further requests wait for a worker; beyond that the server answers 503 so
+the caller can retry or render locally.
+
+There is no authentication: anyone who can connect can have the server
+read templates and write decks with its own permissions. So it only
+listens on a loopback address (or a Unix socket, guarded by its file
+permissions) unless *allow_remote* is passed, and the output and
+template paths of a request must lie under the server's *root*, which
+relative paths are taken from. Data only ever comes from the request's
+payloads, never from the server's files.
+"""
+
+import io
+import ipaddress
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .build import SpecError, presentations
+from .client import PPTX_TYPE, REQUEST_TYPE
+from .databricksppt import toPPT, savePPT
+from .template_cache import template_cache
+
+
+try:
+    from http.server import ThreadingHTTPServer
+except ImportError:
+    # Before Python 3.7
+    class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+
+class Busy(Exception):
+    """Every worker is busy and the queue is full"""
+
+
+class RenderQueue(object):
+    """
+    Runs renders on *workers* threads, accepting at most *queue_size* more
+    while they are busy
+    """
+
+    def __init__(self, workers=2, queue_size=16):
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._futures = set()
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise Busy()
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def shutdown(self):
+        # Renders still queued are dropped, not run
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown()
+
+    def _done(self, future):
+        self._futures.discard(future)
+        self._slots.release()
+
+
+class _Payloads(object):
+    """Decodes each payload of a request once, when a chart first asks for it"""
+
+    def __init__(self, payloads):
+        self._payloads = payloads
+        self._frames = {}
+
+    def get(self, name):
+        if name not in self._payloads:
+            raise SpecError('No payload named {!r}'.format(name))
+        if name not in self._frames:
+            self._frames[name] = decode_payload(*self._payloads[name])
+        return self._frames[name]
+
+
+def decode_payload(data_format, data):
+    """
+    A DataFrame from CSV or Parquet bytes, or a pyarrow Table (which toPPT
+    takes as it is) from Arrow IPC stream or file bytes
+    """
+    if data_format == 'csv':
+        return pd.read_csv(io.BytesIO(data))
+    if data_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    if data_format == 'arrow':
+        if pa is None:
+            raise SpecError('pyarrow is needed to read Arrow payloads')
+        try:
+            return pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+        except pa.ArrowInvalid:
+            return pa.ipc.open_file(pa.py_buffer(data)).read_all()
+
+    raise SpecError('Unknown payload format {!r}'.format(data_format))
+
+
+def parse_request(body):
+    """Splits a render request body into its spec and named payloads"""
+    header, _, rest = body.partition(b'\n')
+    try:
+        header = json.loads(header.decode('utf-8'))
+    except ValueError as e:
+        raise SpecError('The request does not start with a JSON line: {}'.format(e))
+
+    payloads = {}
+    offset = 0
+    for payload in header.get('payloads', []):
+        end = offset + payload['length']
+        if end > len(rest):
+            raise SpecError('Payload {!r} is cut short'.format(payload['name']))
+        payloads[payload['name']] = (payload['format'], rest[offset:end])
+        offset = end
+
+    return header.get('spec'), payloads
+
+
+def render_request(body, root='.'):
+    """
+    Renders every deck in a request. Returns the deck as bytes when there
+    is one deck without an output, otherwise the output paths written.
+    Output and template paths are relative to *root*, and may not lie
+    outside it. Raises SpecError for a bad request and RenderFailed for a
+    toPPT error
+    """
+    spec, payloads = parse_request(body)
+    decks = presentations(spec, root, _Payloads(payloads))
+    if any(output is None for presentation, output, incremental in decks) and len(decks) > 1:
+        raise SpecError('Every deck needs an output when there are several')
+    for presentation, output, incremental in decks:
+        for file_path in (output, presentation.get('template')):
+            if isinstance(file_path, str):
+                _check_under(file_path, root)
+
+    outputs = []
+    for presentation, output, incremental in decks:
+        previous = output if incremental and output is not None and os.path.isfile(output) else None
+        ppt = toPPT(presentation, previous=previous, fingerprint=incremental)
+        if isinstance(ppt, str):
+            raise RenderFailed(ppt)
+
+        if output is None:
+            stream = io.BytesIO()
+            savePPT(ppt, stream)
+            return stream.getvalue()
+        savePPT(ppt, output)
+        outputs.append(output)
+
+    return outputs
+
+
+def _check_under(file_path, root):
+    """Raises SpecError unless *file_path* is (once links are followed) under *root*"""
+    root = os.path.realpath(root)
+    if os.path.commonpath([os.path.realpath(file_path), root]) != root:
+        raise SpecError('{} is outside the server root {}'.format(file_path, root))
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class RenderFailed(Exception):
+    """toPPT returned an error string"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/health':
+            return self._send_json(404, dict(error='Not found'))
+
+        info = template_cache.info()
+        self._send_json(200, dict(status='ok', templates=info.currsize,
+                                  template_hits=info.hits, template_misses=info.misses))
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/render':
+            return self._send_json(404, dict(error='Not found'))
+        if self.headers.get('Content-Type') != REQUEST_TYPE:
+            return self._send_json(415, dict(error='Expected {}'.format(REQUEST_TYPE)))
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            result = self.server.queue.submit(render_request, body, self.server.root).result()
+        except Busy:
+            return self._send_json(503, dict(error='The server is busy'), {'Retry-After': '1'})
+        except SpecError as e:
+            return self._send_json(400, dict(error=str(e)))
+        except RenderFailed as e:
+            return self._send_json(422, dict(error=str(e)))
+        except Exception as e:
+            return self._send_json(500, dict(error='Could\'t create PPT: {}'.format(e)))
+
+        if isinstance(result, bytes):
+            return self._send(200, PPTX_TYPE, result)
+        self._send_json(200, dict(outputs=result))
+
+    def _send_json(self, status, content, headers=None):
+        self._send(status, 'application/json', json.dumps(content).encode('utf-8'), headers)
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def make_server(address, workers=2, queue_size=16, preload=(), verbose=False, root=None,
+                allow_remote=False):
+    """
+    A server (not yet serving) for *address*, 'unix:/path/to/socket' or
+    'host:port'. The host must be a loopback address unless *allow_remote*
+    is set. Requests may only read templates and write decks under *root*
+    (by default the current directory). Templates in *preload* are parsed
+    up front
+    """
+    if address.startswith('unix:'):
+        server = _UnixHTTPServer(address[len('unix:'):], _Handler)
+    else:
+        if '://' not in address:
+            address = 'http://' + address
+        parts = urlsplit(address)
+        if not allow_remote and not _is_loopback(parts.hostname):
+            raise ValueError('{} is not a loopback address; pass allow_remote=True to '
+                             'serve other hosts'.format(parts.hostname))
+        server = ThreadingHTTPServer((parts.hostname, parts.port or 0), _Handler)
+        server.daemon_threads = True
+
+    server.root = os.path.abspath(root if root is not None else os.getcwd())
+    server.queue = RenderQueue(workers, queue_size)
+    server.verbose = verbose
+    for template in preload:
+        template_cache.get(template)
+
+    return server
+
+
+def serve(address, workers=2, queue_size=16, preload=(), verbose=True, root=None,
+          allow_remote=False):
+    """Serves render requests on *address* until interrupted"""
+    server = make_server(address, workers, queue_size, preload, verbose, root, allow_remote)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.queue.shutdown()
+        if isinstance(server, _UnixHTTPServer) and os.path.exists(server.server_address):
+            os.unlink(server.server_address)
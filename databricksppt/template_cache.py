@@ -0,0 +1,168 @@
+"""Process-wide cache of parsed PPTX templates and their layout geometry."""
+
+import copy
+import threading
+from collections import OrderedDict, namedtuple
+from os import path
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import parse_xml
+from pptx.opc.packuri import PACKAGE_URI
+from pptx.opc.package import Part, XmlPart
+from pptx.parts.slide import NotesSlidePart, SlidePart
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Where a layout placeholder sits; stands in for the placeholder itself when
+# placing a chart or table
+PlaceholderGeometry = namedtuple('PlaceholderGeometry', ['idx', 'left', 'top', 'width', 'height'])
+
+
+def layout_index(ppt):
+    """
+    For each of *ppt*'s slide layouts, the geometry of the placeholders a new
+    slide gets from it, in the order the slide would have them
+    """
+    return tuple(
+        tuple(PlaceholderGeometry(placeholder.placeholder_format.idx, placeholder.left,
+                                  placeholder.top, placeholder.width, placeholder.height)
+              for placeholder in layout.iter_cloneable_placeholders())
+        for layout in ppt.slide_layouts)
+
+
+# Parts can be built and related one by one from python-pptx 1.0
+_SHARES_PARTS = hasattr(Part, 'load_rels_from_xml')
+
+
+class _Prototype(object):
+    """
+    A parsed template that new decks are cloned from. The parts no deck
+    changes (masters, layouts, themes and what they use) are shared by every
+    clone; the presentation part, the template's own slides with what hangs
+    off them, and the document properties are copied for each. Before
+    python-pptx 1.0 the whole package is deep-copied instead
+    """
+
+    def __init__(self, ppt):
+        self._ppt = ppt
+        self._copied = None
+        if not _SHARES_PARTS:
+            return
+
+        package = ppt.part.package
+        shared = set()
+        pending = [rel.target_part for rel in ppt.part.rels.values()
+                   if not rel.is_external and rel.reltype != RT.SLIDE]
+        while pending:
+            part = pending.pop()
+            if part not in shared:
+                shared.add(part)
+                pending.extend(rel.target_part for rel in part.rels.values() if not rel.is_external)
+        # A slide reached from a master or layout is copied with the rest
+        if any(isinstance(part, (SlidePart, NotesSlidePart)) or part is ppt.part for part in shared):
+            shared = set()
+
+        parts = list(package.iter_parts())
+        self._shared = {part.partname: part for part in parts if part in shared}
+        self._copied = [(part, parse_xml(part.rels.xml)) for part in parts if part not in shared]
+        self._package_rels = parse_xml(package._rels.xml)
+
+    def new(self):
+        """A new Presentation, cloned from the template"""
+        if self._copied is None:
+            return copy.deepcopy(self._ppt)
+
+        package = type(self._ppt.part.package)(None)
+        parts = dict(self._shared)
+        for part, _ in self._copied:
+            if isinstance(part, XmlPart):
+                content = copy.deepcopy(part._element)
+            else:
+                content = part.blob
+            parts[part.partname] = type(part)(part.partname, part.content_type, package, content)
+        for part, xml_rels in self._copied:
+            parts[part.partname].load_rels_from_xml(xml_rels, parts)
+        package._rels.load_from_xml(PACKAGE_URI, self._package_rels, parts)
+
+        return package.presentation_part.presentation
+
+
+class TemplateCache(object):
+    """
+    Least-recently-used cache of parsed templates, keyed by the template path
+    and its modification time, each with its layout_index(). Each get()
+    returns a clone of the parsed package that copies every part a deck
+    changes and shares the rest, so decks built from it never share state
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template=None):
+        """
+        Returns a new Presentation for *template* (a .pptx path, or None for
+        the python-pptx default), parsing the file only on a cache miss
+        """
+        return self.get_indexed(template)[0]
+
+    def get_indexed(self, template=None):
+        """
+        Returns a new Presentation for *template*, as get() does, and the
+        layout_index() of the template, worked out once per parse
+        """
+        key, mtime = self._key(template)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                prototype, layouts = entry[1], entry[2]
+            else:
+                prototype = None
+                self.misses += 1
+
+        if prototype is not None:
+            return prototype.new(), layouts
+
+        ppt = Presentation(template)
+        layouts = layout_index(ppt)
+        if self.maxsize <= 0:
+            return ppt, layouts
+
+        prototype = _Prototype(ppt)
+        with self._lock:
+            self._entries[key] = (mtime, prototype, layouts)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return prototype.new(), layouts
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize,
+                             len(self._entries))
+
+    def clear(self):
+        """Drops every cached template and resets the hit/miss counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def _key(template):
+        if template is None:
+            return None, None
+
+        template = path.abspath(template)
+        return template, path.getmtime(template)
+
+
+template_cache = TemplateCache()
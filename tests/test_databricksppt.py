@@ -3,11 +3,201 @@
 """Tests for `databricksppt` package."""
 
 
+import asyncio
+import base64
+import decimal
+import io
+import json
+import numbers
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from unittest import mock
+import weakref
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
 from click.testing import CliRunner
 
+import numpy as np
+import pandas as pd
+from lxml import etree
+from pptx import Presentation
+from pptx.chart.data import BubbleChartData, CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+from thinkcell import Thinkcell
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
 from databricksppt import databricksppt
+from databricksppt.aio import AsyncRenderer, savePPT_async, toBase64URL_async, toPPT_async
 from databricksppt import cli
+from databricksppt import client
+from databricksppt import main as cli_main
+from databricksppt import chartdata
+from databricksppt.custom_properties import get_custom_properties
+from databricksppt.chartdata import ArrayBubbleChartData, ArrayCategoryChartData, ArrayXyChartData
+from databricksppt.build import DataCache, load_spec, presentations
+from databricksppt.downsample import lttb_indices, minmax_indices
+from databricksppt.ingest import read_csv
+from databricksppt import package as package_writer
+from databricksppt.profiler import ProfileSummary
+from databricksppt.server import Busy, RenderQueue, make_server
+from databricksppt import template_cache
+from databricksppt.template_cache import TemplateCache
+
+
+CATEGORY_CHART_TYPES = [
+    XL_CHART_TYPE.AREA, XL_CHART_TYPE.AREA_STACKED,
+    XL_CHART_TYPE.AREA_STACKED_100, XL_CHART_TYPE.BAR_CLUSTERED,
+    XL_CHART_TYPE.BAR_STACKED, XL_CHART_TYPE.BAR_STACKED_100,
+    XL_CHART_TYPE.COLUMN_CLUSTERED, XL_CHART_TYPE.COLUMN_STACKED,
+    XL_CHART_TYPE.COLUMN_STACKED_100, XL_CHART_TYPE.LINE,
+    XL_CHART_TYPE.LINE_STACKED, XL_CHART_TYPE.LINE_STACKED_100,
+    XL_CHART_TYPE.LINE_MARKERS, XL_CHART_TYPE.LINE_MARKERS_STACKED,
+    XL_CHART_TYPE.LINE_MARKERS_STACKED_100, XL_CHART_TYPE.DOUGHNUT,
+    XL_CHART_TYPE.DOUGHNUT_EXPLODED, XL_CHART_TYPE.PIE,
+    XL_CHART_TYPE.PIE_EXPLODED, XL_CHART_TYPE.RADAR,
+    XL_CHART_TYPE.RADAR_FILLED, XL_CHART_TYPE.RADAR_MARKERS,
+]
+
+
+def private(name):
+    """Look up a module-private (double underscore) databricksppt function"""
+    return getattr(databricksppt, '__' + name)
+
+
+def iterrows_chartdata(chart):
+    """Reference per-row chart data builder, as used before the columnar one"""
+    chart_data = CategoryChartData()
+    colNames = chart['data'][0].columns.tolist()
+    offset = 1 if chart['first_column_as_labels'] else 0
+
+    if len(colNames) > offset:
+        for colName in colNames[offset:]:
+            if chart['column_names_as_labels']:
+                chart_data.categories.add_category(colName)
+            else:
+                chart_data.categories.add_category('Category 1')
+
+        for index, row in chart['data'][0].iterrows():
+            data = [row[colName] for colName in colNames[offset:]]
+            if chart['first_column_as_labels']:
+                chart_data.add_series(str(row.iloc[0]), data)
+            else:
+                chart_data.add_series('Series 1', data)
+
+    return chart_data
+
+
+def cached_xml(xml_bytes):
+    """
+    Chart XML with its cached numbers compared as numbers, and points
+    python-pptx wrote as 'nan' left out as gaps
+    """
+    root = etree.fromstring(xml_bytes, etree.XMLParser(remove_blank_text=True))
+    namespaces = dict(c='http://schemas.openxmlformats.org/drawingml/2006/chart')
+    for point in root.xpath('//c:numCache/c:pt', namespaces=namespaces):
+        value = point.find('c:v', namespaces)
+        if np.isnan(float(value.text)):
+            point.getparent().remove(point)
+        else:
+            value.text = repr(float(value.text))
+    return etree.tostring(root)
+
+
+def cell_by_cell_table(slide, placeholder, chartInfo):
+    """Reference table writer setting text one cell at a time"""
+    df = chartInfo['data'][0]
+    rows = df.shape[0] + (1 if chartInfo['column_names_as_labels'] else 0)
+    table = slide.shapes.add_table(
+        rows, df.shape[1], placeholder.left, placeholder.top,
+        placeholder.width, placeholder.height).table
+    table.first_row = chartInfo['column_names_as_labels']
+    table.first_col = chartInfo['first_column_as_labels']
+
+    rowNum = 0
+    if chartInfo['column_names_as_labels']:
+        for col, colName in enumerate(df.columns.tolist()):
+            table.cell(0, col).text = str(colName)
+        rowNum += 1
+
+    for index, row in df.iterrows():
+        for col in range(df.shape[1]):
+            table.cell(rowNum, col).text = str(row.iloc[col])
+        rowNum += 1
+
+    return table
+
+
+def blank_slide():
+    ppt = Presentation()
+    return ppt.slides.add_slide(ppt.slide_layouts[6])
+
+
+def isinstance_has_non_numbers(values):
+    """Reference cell by cell label inference"""
+    for cell in values:
+        if not isinstance(cell, numbers.Number):
+            return True
+    return False
+
+
+def label_inference_cases():
+    many = 500
+    return [
+        pd.Series([], dtype=float),
+        pd.Series([], dtype=object),
+        pd.Series([1, 2, 3]),
+        pd.Series([1.5, np.nan]),
+        pd.Series([True, False]),
+        pd.Series([1 + 2j]),
+        pd.Series(['a', 'b']),
+        pd.Series(['a', None], dtype='string'),
+        pd.Series([None, None], dtype='string'),
+        pd.Series([np.nan, np.nan], dtype='str'),
+        pd.Series([1, None], dtype='Int64'),
+        pd.Series([1, 2], dtype='Int64'),
+        pd.Series([0.5, None], dtype='Float64'),
+        pd.Series([True, None], dtype='boolean'),
+        pd.Series(pd.to_datetime(['2020-01-01', None])),
+        pd.Series(pd.to_datetime(['2020-01-01']).tz_localize('UTC')),
+        pd.Series(pd.to_timedelta(['1 day'])),
+        pd.Series(['x', 'y', None], dtype='category'),
+        pd.Series([None, None], dtype=pd.CategoricalDtype(['x'])),
+        pd.Series([1, 2, None], dtype='category'),
+        pd.Series([1, 2.5, decimal.Decimal(3)], dtype=object),
+        pd.Series([1.0, None], dtype=object),
+        pd.Series([1] * many + ['late string'], dtype=object),
+        pd.Series([1] * many + [True], dtype=object),
+        pd.Series([1] * many + [None], dtype=object),
+        pd.Series([1.5] * many + [2], dtype=object),
+        pd.Index([1, 2]),
+        pd.Index(['a', 2]),
+        pd.RangeIndex(3),
+    ]
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'Region': ['North', 'South', 'East'],
+        'Q1': [1.5, 2.0, 3.25],
+        'Q2': [4, 5, 6],
+        'Q3': [7.0, None, 9.0],
+    })
 
 
 class Testdatabricksppt(unittest.TestCase):
@@ -23,6 +213,1100 @@ class Testdatabricksppt(unittest.TestCase):
         pass
         # print(databricksppt.toPPT(""))
 
+    def test_chartdata_matches_iterrows(self):
+        """Columnar chart data caches the same numbers as the per-row path"""
+        numeric = sample_frame().drop(columns='Region')
+        cases = [
+            (sample_frame(), True, True),
+            (sample_frame(), False, True),
+            (numeric, True, False),
+            (numeric, False, False),
+            (numeric, True, True),
+            (numeric.iloc[:, [1, 0]], False, True),
+        ]
+        for df, column_names, first_column in cases:
+            chart = dict(data=[df], column_names_as_labels=column_names,
+                         first_column_as_labels=first_column)
+            expected = iterrows_chartdata(chart)
+            actual = private('create_chartdata')(chart)
+            for chart_type in CATEGORY_CHART_TYPES:
+                self.assertEqual(cached_xml(expected.xml_bytes(chart_type)),
+                                 cached_xml(actual.xml_bytes(chart_type)))
+
+            # Transposing in place of building from a transposed frame
+            actual = private('create_chartdata')(dict(chart), True)
+            expected = iterrows_chartdata(private('transpose_data')(chart))
+            for chart_type in CATEGORY_CHART_TYPES:
+                self.assertEqual(cached_xml(expected.xml_bytes(chart_type)),
+                                 cached_xml(actual.xml_bytes(chart_type)))
+
+    def test_array_chartdata(self):
+        """Array-backed chart data writes python-pptx's XML, with gaps for NaN"""
+        rng = np.random.default_rng(0)
+        x, y, size = rng.random((3, 50)) * [[1], [1e6], [1e-6]]
+        dates = pd.Series(pd.date_range('1900-02-27', periods=50, freq='D'))
+        labels = ['a & <b>'] + ['Label {}'.format(num) for num in range(49)]
+
+        for arrow in [chartdata.pa, None]:
+            with mock.patch.object(chartdata, 'pa', arrow):
+                for categories in [labels, dates, list(range(50))]:
+                    expected = CategoryChartData()
+                    expected.categories = list(categories)
+                    expected.add_series('Values & more', y.tolist())
+                    actual = ArrayCategoryChartData()
+                    actual.categories = categories
+                    actual.add_series('Values & more', y)
+                    for chart_type in CATEGORY_CHART_TYPES:
+                        self.assertEqual(cached_xml(expected.xml_bytes(chart_type)),
+                                         cached_xml(actual.xml_bytes(chart_type)))
+
+                expected = BubbleChartData()
+                series = expected.add_series('Bubbles')
+                for point in zip(x.tolist(), y.tolist(), size.tolist()):
+                    series.add_data_point(*point)
+                actual = ArrayBubbleChartData()
+                actual.add_series('Bubbles', x_values=x, y_values=y, bubble_sizes=size)
+                self.assertEqual(cached_xml(expected.xml_bytes(XL_CHART_TYPE.BUBBLE)),
+                                 cached_xml(actual.xml_bytes(XL_CHART_TYPE.BUBBLE)))
+
+        # Rows of a mixed frame are made numbers all at once
+        rows = ArrayCategoryChartData()
+        rows.categories = ['X', 'Y']
+        rows.add_series_rows(['a', 'b'], np.array([[1, None], [2.5, '3']], dtype=object))
+        np.testing.assert_array_equal([[1.0, np.nan], [2.5, 3.0]],
+                                      [series.array for series in rows])
+
+        # The points go in however python-pptx indents its XML, or not at all
+        writer = chartdata.ChartXmlWriter
+
+        def reindented(chart_type, chart_data):
+            xml = writer(chart_type, chart_data).xml
+            return SimpleNamespace(xml=re.sub(r'>\s+<', '>\n  <', xml))
+
+        expected = actual.xml_bytes(XL_CHART_TYPE.BUBBLE)
+        with mock.patch.object(chartdata, 'ChartXmlWriter', reindented):
+            self.assertEqual(cached_xml(expected),
+                             cached_xml(actual.xml_bytes(XL_CHART_TYPE.BUBBLE)))
+        with mock.patch.object(chartdata, '_MARKER_PT', re.compile('<c:unknown/>')):
+            with self.assertRaisesRegex(ValueError, 'not written out'):
+                actual.xml_bytes(XL_CHART_TYPE.BUBBLE)
+
+        # Missing values are left out, rather than written as 'nan'
+        chart_data = ArrayXyChartData()
+        chart_data.add_series('Gaps', x_values=[1, 2, 3, 4],
+                              y_values=pd.array([1.5, None, np.nan, 4], dtype='Float64'))
+        xml = chart_data.xml_bytes(XL_CHART_TYPE.XY_SCATTER)
+        self.assertNotIn(b'nan', xml)
+
+        chart_shape = blank_slide().shapes.add_chart(
+            XL_CHART_TYPE.XY_SCATTER, Inches(1), Inches(1), Inches(6), Inches(4), chart_data)
+        self.assertEqual(chart_shape.chart.series[0].values, (1.5, None, None, 4.0))
+        self.assertEqual(len(chart_data[0]), 4)
+        self.assertIsNone(chart_data[0][1].y)
+        with zipfile.ZipFile(io.BytesIO(chart_data.xlsx_blob)) as xlsx:
+            self.assertIn('xl/worksheets/sheet1.xml', xlsx.namelist())
+
+        # The chart builders use them, and take columns as they are
+        df = pd.DataFrame({'When': dates, 'Sales': y})
+        chart = dict(data=[df], column_names_as_labels=True, first_column_as_labels=True)
+        chart_data = private('create_chartdata')(chart, True)
+        self.assertIsInstance(chart_data, ArrayCategoryChartData)
+        self.assertTrue(chart_data.categories.are_dates)
+        self.assertIsInstance(private('create_xyzdata')([df[['Sales', 'Sales']]]),
+                              ArrayXyChartData)
+
+    def test_table_matches_cell_by_cell(self):
+        """Bulk table XML is identical to setting each cell's text"""
+        placeholder = SimpleNamespace(left=Inches(1), top=Inches(1),
+                                      width=Inches(8), height=Inches(5))
+        special = pd.DataFrame({
+            'Text': ['a & <b>', 'two\nlines', 'soft\vbreak', 'bell\x07', ''],
+            'When': pd.to_datetime(['2020-01-01', '2020-02-01', None,
+                                    '2020-03-01', '2020-04-01']),
+            'Count': [1, 2, 3, 4, 5],
+        })
+        cases = [
+            (sample_frame(), True, True),
+            (sample_frame(), False, False),
+            (sample_frame().drop(columns='Region'), True, False),
+            (special, True, True),
+        ]
+        for df, column_names, first_column in cases:
+            chart = dict(data=[df], column_names_as_labels=column_names,
+                         first_column_as_labels=first_column)
+            expected = cell_by_cell_table(blank_slide(), placeholder, chart)
+            actual = private('insert_table')(blank_slide(), placeholder, chart)
+            self.assertEqual(etree.tostring(expected._tbl),
+                             etree.tostring(actual._tbl))
+
+    def test_template_cache(self):
+        """Templates are parsed once and every deck gets its own copy"""
+        template = str(private('get_datafile_name')('template.pptx'))
+        cache = TemplateCache(maxsize=1)
+
+        first = cache.get(template)
+        second = cache.get(template)
+        self.assertEqual((1, 1), cache.info()[:2])
+
+        first.slides.add_slide(first.slide_layouts[1])
+        self.assertEqual(len(second.slides) + 1, len(first.slides))
+
+        # Only the parts decks change are copied; layouts are shared
+        self.assertIsNot(first.part, second.part)
+        self.assertIsNot(first.slides[0].part, second.slides[0].part)
+        self.assertIs(first.slide_layouts[1].part, second.slide_layouts[1].part)
+        first.slides[0].shapes.add_textbox(0, 0, Inches(1), Inches(1))
+        self.assertEqual(len(second.slides[0].shapes) + 1, len(first.slides[0].shapes))
+
+        def members(ppt):
+            stream = io.BytesIO()
+            ppt.save(stream)
+            with zipfile.ZipFile(stream) as package:
+                return {name: package.read(name) for name in package.namelist()}
+
+        self.assertEqual(members(Presentation(template)), members(second))
+        # Before python-pptx 1.0 the whole package is copied
+        with mock.patch.object(template_cache, '_SHARES_PARTS', False):
+            deep = TemplateCache()
+            deep.get(template)
+            copied = deep.get(template)
+        self.assertIsNot(first.slide_layouts[1].part, copied.slide_layouts[1].part)
+        self.assertEqual(members(Presentation(template)), members(copied))
+
+        cache.get(None)
+        self.assertEqual(1, cache.info().currsize)
+        cache.get(template)
+        self.assertEqual((1, 3), cache.info()[:2])
+
+    def test_placement_from_layout_index(self):
+        """Charts land where the placeholders they replace would have been"""
+        template = str(private('get_datafile_name')('template.pptx'))
+        df = sample_frame().fillna(0)
+        # Each placeholder_num counts only the placeholders still left
+        charts = [dict(data=df, chart_type='Column', placeholder_num=2),
+                  dict(data=df, placeholder_num=2),
+                  dict(data=df, chart_type='Line', placeholder_num=3)]
+        ppt = databricksppt.toPPT(dict(template=template, slides=[
+            dict(layout_num=4, title='Comparison', charts=charts),
+            dict(slide_num=1, chart_num=2, title='Existing', charts=[
+                dict(data=df, chart_type='Column')]),
+            dict(layout_num=1, title='Paged', charts=[
+                dict(data=pd.DataFrame({'Row': range(30)}), placeholder_num=2,
+                     rows_per_slide=10)])]))
+        self.assertNotIsInstance(ppt, str)
+
+        # The same slides, cloning every placeholder and removing those used
+        expected = Presentation(template)
+        slide = expected.slides.add_slide(expected.slide_layouts[4])
+        geometry = []
+        for chart in charts:
+            placeholder = list(slide.placeholders)[chart['placeholder_num'] - 1]
+            geometry.append((placeholder.left, placeholder.top, placeholder.width, placeholder.height))
+            placeholder.element.getparent().remove(placeholder.element)
+        placeholders = [shape.placeholder_format.idx for shape in slide.placeholders]
+        existing = [shape for shape in expected.slides[0].shapes if shape.has_chart][1]
+
+        slides = list(ppt.slides)
+        new_slide = slides[-4]
+        self.assertEqual(placeholders, [shape.placeholder_format.idx for shape in new_slide.placeholders])
+        self.assertEqual(geometry, [(shape.left, shape.top, shape.width, shape.height)
+                                    for shape in new_slide.shapes if not shape.is_placeholder])
+        self.assertEqual((existing.left, existing.top, existing.width, existing.height),
+                         [(shape.left, shape.top, shape.width, shape.height)
+                          for shape in slides[0].shapes if shape.has_chart][-1])
+        self.assertEqual(['Paged'] * 3, [slide.shapes.title.text for slide in slides[-3:]])
+        for page in slides[-3:]:
+            self.assertEqual([0], [shape.placeholder_format.idx for shape in page.placeholders])
+            self.assertTrue(page.shapes[-1].has_table)
+
+        error = databricksppt.toPPT(dict(slides=[dict(layout_num=1, title='Full', charts=[
+            dict(data=df, placeholder_num=2), dict(data=df, placeholder_num=2)])]))
+        self.assertEqual('Failed to create placeholder for chart 2 in slide 1: Placeholder '
+                         'number 2 outside the number of placeholders found in this slide [1]', error)
+
+    def test_async_rendering(self):
+        """Decks render concurrently off the event loop, and can be cancelled"""
+        df = pd.DataFrame({'Label': ['a', 'b', 'c'], 'Value': [1.0, 2.0, 3.0]})
+
+        def presentation(slides):
+            return dict(slides=[dict(title='Async {}'.format(num), charts=[
+                dict(data=df, chart_type='Column', placeholder_num=2, transpose=True)])
+                for num in range(slides)])
+
+        async def render_many(renderer):
+            ticks = 0
+            done = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not done.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+
+            ticking = asyncio.create_task(ticker())
+            threads = set()
+
+            async def render(num):
+                ppt = await toPPT_async(presentation(5), renderer,
+                                        profiler=lambda event: threads.add(threading.get_ident()))
+                return await toBase64URL_async(ppt, renderer)
+
+            try:
+                return await asyncio.gather(*[render(num) for num in range(8)]), ticks, threads
+            finally:
+                done.set()
+                await ticking
+
+        renderer = AsyncRenderer(max_concurrency=2)
+        try:
+            links, ticks, threads = asyncio.run(render_many(renderer))
+        finally:
+            renderer.close()
+        self.assertEqual(8, len(links))
+        self.assertTrue(all(link.startswith("<a href='data:") for link in links))
+        self.assertLessEqual(len(threads), 2)
+        # The loop kept running while the decks were built
+        self.assertGreater(ticks, 10)
+
+        async def cancel_midway(renderer):
+            task = asyncio.create_task(toPPT_async(presentation(200), renderer, profiler=events.append))
+            while not any(event.stage == 'create_slide' for event in events):
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        events = []
+        renderer = AsyncRenderer(max_concurrency=1)
+        asyncio.run(cancel_midway(renderer))
+        renderer.close()
+        slides = [event for event in events if event.stage == 'create_slide']
+        self.assertLess(len(slides), 200)
+
+        # Closing drops calls still waiting for a thread
+        async def close_while_queued(renderer):
+            release = threading.Event()
+            running = asyncio.ensure_future(renderer._run(release.wait))
+            queued = asyncio.ensure_future(toPPT_async(presentation(1), renderer))
+            await asyncio.sleep(0.01)
+            threading.Timer(0.1, release.set).start()
+            renderer.close()
+            self.assertTrue(await running)
+            with self.assertRaises(asyncio.CancelledError):
+                await queued
+
+        asyncio.run(close_while_queued(AsyncRenderer(max_concurrency=1)))
+
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'async.pptx')
+            ppt = asyncio.run(toPPT_async(presentation(1)))
+            asyncio.run(savePPT_async(ppt, output))
+            self.assertEqual(['Async 0'], [slide.shapes.title.text for slide in Presentation(output).slides])
+
+    def test_lazy_slides(self):
+        """Generator and callable specs are evaluated a slide at a time"""
+        alive = []
+        most_alive = []
+
+        def frame(num):
+            def load():
+                most_alive.append(sum(ref() is not None for ref in alive))
+                df = pd.DataFrame({'Label': ['a', 'b', 'c'], 'Value': [num, num + 1.0, num + 2.0]})
+                alive.append(weakref.ref(df))
+                return df
+            return load
+
+        charts = []
+
+        def slides():
+            for num in range(12):
+                chart = dict(data=frame(num), chart_type='Column', placeholder_num=2,
+                             transpose=True)
+                charts.append(chart)
+                yield dict(title='Lazy {}'.format(num), charts=lambda chart=chart: [chart])
+            yield lambda: dict(title='Table', charts=[dict(
+                data=iter([pd.DataFrame({'Row': range(3)})]), placeholder_num=2)])
+
+        def summary(ppt):
+            return [(slide.shapes.title.text,
+                     slide.shapes[-1].chart.plots[0].series[0].values
+                     if slide.shapes[-1].has_chart else None)
+                    for slide in ppt.slides]
+
+        eager = dict(slides=[dict(title='Lazy {}'.format(num), charts=[dict(
+            data=frame(num)(), chart_type='Column', placeholder_num=2, transpose=True)])
+            for num in range(12)] + [dict(title='Table', charts=[dict(
+                data=pd.DataFrame({'Row': range(3)}), placeholder_num=2)])])
+        expected = summary(databricksppt.toPPT(eager))
+        del eager
+        alive.clear()
+
+        for max_workers in [None, 4]:
+            most_alive.clear()
+            ppt = databricksppt.toPPT(dict(slides=slides), max_workers=max_workers,
+                                      fingerprint=True)
+            self.assertNotIsInstance(ppt, str)
+            self.assertEqual(expected, summary(ppt))
+            # The data of at most the slide being built and the one ahead
+            self.assertLessEqual(max(most_alive), 1 if max_workers is None else 2)
+            self.assertTrue(all(callable(chart['data']) for chart in charts))
+
+        # Fingerprints still let an incremental render keep every slide
+        events = []
+        stream = io.BytesIO()
+        ppt.save(stream)
+        databricksppt.toPPT(dict(slides=slides()), profiler=events.append,
+                            previous=io.BytesIO(stream.getvalue()))
+        self.assertEqual([], [event for event in events if event.stage == 'create_slide'])
+
+    def test_toPPT_many(self):
+        """Batch rendering returns bytes, saved paths or toPPT's errors"""
+        def presentation(layout_num=1):
+            chart = dict(data=sample_frame().fillna(0), chart_type='Column',
+                         placeholder_num=1)
+            return dict(slides=[dict(layout_num=layout_num, title='Batch',
+                                     charts=[chart])])
+
+        error = databricksppt.toPPT(presentation(99))
+        results = databricksppt.toPPT_many(
+            [presentation(), presentation(99)], max_workers=2)
+        self.assertEqual(error, results[1])
+        self.assertEqual(1, len(Presentation(io.BytesIO(results[0])).slides))
+
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'deck.pptx')
+            results = databricksppt.toPPT_many([presentation()], [output])
+            self.assertEqual(output, str(results[0]))
+            self.assertTrue(os.path.isfile(output))
+
+        # Workers leave no shared memory mapped, nor complain about it
+        script = '\n'.join([
+            'import numpy as np, pandas as pd',
+            'from databricksppt import databricksppt',
+            'decks = [dict(slides=[dict(title="Batch", charts=[dict(',
+            '    data=pd.DataFrame(np.random.rand(200, 3), columns=list("xyz")),',
+            '    chart_type="Column", placeholder_num=2)])]) for num in range(6)]',
+            'results = databricksppt.toPPT_many(decks, max_workers=3)',
+            'assert all(isinstance(result, bytes) for result in results), results',
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        run = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True,
+                             env=dict(os.environ, PYTHONPATH=root))
+        self.assertEqual((0, b''), (run.returncode, run.stderr))
+
+        # Without pickle protocol 5 (before Python 3.8) frames go in-band
+        with mock.patch.object(databricksppt.pickle, 'HIGHEST_PROTOCOL', 4):
+            results = databricksppt.toPPT_many([presentation()], max_workers=1)
+        self.assertEqual(1, len(Presentation(io.BytesIO(results[0])).slides))
+
+    def test_parallel_preparation(self):
+        """Charts prepared on a thread pool give the same deck and errors"""
+        def presentation(bad_chart=None):
+            slides = []
+            for slide_num in range(3):
+                charts = []
+                for chart_type in ['Column', 'Line', 'Bar-Stacked']:
+                    charts.append(dict(data=sample_frame().fillna(0),
+                                       chart_type=chart_type,
+                                       placeholder_num=1))
+                slides.append(dict(layout_num=4, title='Parallel',
+                                   charts=charts))
+            if bad_chart is not None:
+                slides[bad_chart[0]]['charts'][bad_chart[1]]['data'] = 'bad'
+            return dict(slides=slides)
+
+        def chart_xml(ppt):
+            return [etree.tostring(shape.chart._chartSpace)
+                    for slide in ppt.slides for shape in slide.shapes
+                    if shape.has_chart]
+
+        serial = databricksppt.toPPT(presentation())
+        parallel = databricksppt.toPPT(presentation(), max_workers=4)
+        self.assertEqual(9, len(chart_xml(serial)))
+        self.assertEqual(chart_xml(serial), chart_xml(parallel))
+
+        self.assertEqual(
+            databricksppt.toPPT(presentation((1, 1))),
+            databricksppt.toPPT(presentation((1, 1)), max_workers=4))
+        self.assertEqual(
+            'Failed to create chart 2 in slide 1: Data supplied was neither '
+            'a Pandas DataFrame, nor an array of Pandas DataFrames',
+            databricksppt.toPPT(presentation((0, 1)), max_workers=4))
+
+    def test_base64_url_is_chunked(self):
+        """The download link decodes to the deck for any chunk size"""
+        chart = dict(data=sample_frame().fillna(0), chart_type='Column',
+                     placeholder_num=2)
+        ppt = databricksppt.toPPT(dict(slides=[dict(title='Link',
+                                                    charts=[chart])]))
+        links = [databricksppt.toBase64URL(ppt)]
+        for chunk_size in [3, 4, 1000]:
+            output = io.StringIO()
+            databricksppt.saveBase64URL(ppt, output, chunk_size)
+            links.append(output.getvalue())
+
+        for link in links:
+            self.assertTrue(link.endswith("'>Download here</a>"))
+            encoded = link[link.index('base64,') + 7:link.index("'>")]
+            deck = Presentation(io.BytesIO(base64.b64decode(encoded)))
+            self.assertEqual('Link', deck.slides[0].shapes.title.text)
+
+    def test_parallel_save(self):
+        """savePPT writes python-pptx's members, compressed on a thread pool"""
+        chart = dict(data=sample_frame().fillna(0), chart_type='Column',
+                     placeholder_num=2)
+        ppt = databricksppt.toPPT(dict(slides=[dict(title='Saved', charts=[chart])] * 3))
+        expected = io.BytesIO()
+        ppt.save(expected)
+        with zipfile.ZipFile(expected) as package:
+            members = [(info.filename, package.read(info)) for info in package.infolist()]
+
+        options = [dict(), dict(compresslevel=1, max_workers=1),
+                   dict(compresslevel=9, store_compressed=True)]
+        sizes = []
+        for kwargs in options:
+            output = io.BytesIO()
+            databricksppt.savePPT(ppt, output, **kwargs)
+            sizes.append(len(output.getvalue()))
+            with zipfile.ZipFile(output) as package:
+                self.assertIsNone(package.testzip())
+                self.assertEqual(members, [(info.filename, package.read(info))
+                                           for info in package.infolist()])
+                workbooks = [info.compress_type for info in package.infolist()
+                             if info.filename.endswith('.xlsx')]
+            self.assertGreater(len(workbooks), 0)
+            stored = kwargs.get('store_compressed', False)
+            self.assertEqual(set([zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED]),
+                             set(workbooks))
+        self.assertEqual(len(expected.getvalue()), sizes[0])
+
+        # Large packages get the zip64 extensions
+        with mock.patch.object(package_writer, '_ZIP64_LIMIT', 1000), \
+                mock.patch.object(package_writer, '_ZIP64_COUNT_LIMIT', 10):
+            link = databricksppt.toBase64URL(ppt, compresslevel=1)
+        encoded = link[link.index('base64,') + 7:link.index("'>")]
+        with zipfile.ZipFile(io.BytesIO(base64.b64decode(encoded))) as package:
+            self.assertIsNone(package.testzip())
+            self.assertEqual([name for name, data in members], package.namelist())
+        deck = Presentation(io.BytesIO(base64.b64decode(encoded)))
+        self.assertEqual('Saved', deck.slides[2].shapes.title.text)
+
+        # Member names beyond ASCII are flagged as UTF-8
+        output = io.BytesIO()
+        writer = package_writer._ZipWriter(output)
+        writer.write(*package_writer._compress('ppt/m\u00e9dia.xml', lambda: b'<a/>', 6, False))
+        writer.close()
+        with zipfile.ZipFile(output) as package:
+            self.assertEqual(['ppt/m\u00e9dia.xml'], package.namelist())
+            self.assertEqual(b'<a/>', package.read('ppt/m\u00e9dia.xml'))
+
+        # Older python-pptx saves the deck itself
+        with mock.patch.object(package_writer, '_ContentTypesItem', None):
+            output = io.BytesIO()
+            databricksppt.savePPT(ppt, output, compresslevel=1)
+        self.assertEqual(len(expected.getvalue()), len(output.getvalue()))
+
+    def test_downsampling(self):
+        """Large line/scatter series are reduced to max_points points"""
+        y = np.array([0, 1, 0, 9, 0, -7, 0, 1, 0, 0.5])
+        self.assertEqual([0, 3, 5, 9], lttb_indices(np.arange(10), y, 4).tolist())
+        self.assertEqual([0, 3, 5, 7], minmax_indices(y, 4).tolist())
+        self.assertEqual(list(range(10)), lttb_indices(np.arange(10), y, 10).tolist())
+
+        points = 10000
+        scatter = pd.DataFrame({'x': np.arange(points, dtype=float),
+                                'y': np.sin(np.arange(points) / 100.0)})
+        line = scatter.set_index('x').transpose().reset_index()
+        for chart_type, data in [('XY-Scatter-Lines', scatter), ('Line', line)]:
+            for method in ['lttb', 'minmax']:
+                chart = dict(data=data, chart_type=chart_type, max_points=200,
+                             downsample=method, placeholder_num=2)
+                ppt = databricksppt.toPPT(dict(slides=[dict(title='Points',
+                                                            charts=[chart])]))
+                series = ppt.slides[0].shapes[-1].chart.plots[0].series[0]
+                self.assertEqual(200, len(series.values))
+                self.assertEqual(points - 200, chart['points_dropped'])
+
+        def render(data, chart_type, **options):
+            chart = dict(data=data, chart_type=chart_type, placeholder_num=2, **options)
+            return databricksppt.toPPT(dict(slides=[dict(title='Points', charts=[chart])]))
+
+        # Too few points to downsample to, and data that is not numbers
+        for method, max_points in [('lttb', 2), ('lttb', 0), ('minmax', 1), ('lttb', 2.5)]:
+            result = render(scatter, 'XY-Scatter', max_points=max_points, downsample=method)
+            self.assertEqual('Failed to create chart 1 in slide 1: max_points must be a whole '
+                             'number of at least {} for {} downsampling, not {}'.format(
+                                 2 if method == 'minmax' else 3, method, max_points), result)
+        self.assertEqual(3, len(render(scatter, 'XY-Scatter', max_points=np.int64(3))
+                                .slides[0].shapes[-1].chart.plots[0].series[0].values))
+
+        words = scatter.astype(object)
+        words.iloc[5, 1] = 'n/a'
+        for chart_type, data in [('XY-Scatter', words),
+                                 ('Line', words.set_index('x').transpose().reset_index())]:
+            result = render(data, chart_type, max_points=3)
+            self.assertIsInstance(result, str)
+            self.assertIn('Could not downsample non-numeric data', result)
+        self.assertIn('max_points must be', databricksppt.toPPTTC(dict(template='t.pptx', slides=[
+            dict(charts=[dict(data=scatter, chart_type='XY-Scatter', max_points=1)])])))
+
+    def test_paged_table(self):
+        """Long tables continue on copies of the slide, header repeated"""
+        df = pd.DataFrame({'Row': range(25), 'Value': np.arange(25) * 2.5})
+        table = dict(data=df, rows_per_slide=10, placeholder_num=2)
+        chart = dict(data=sample_frame().fillna(0), chart_type='Column',
+                     placeholder_num=2)
+        ppt = databricksppt.toPPT(dict(slides=[
+            dict(title='Table', charts=[table]),
+            dict(title='After', charts=[chart]),
+        ]))
+
+        titles = [slide.shapes.title.text for slide in ppt.slides]
+        self.assertEqual(['Table', 'Table', 'Table', 'After'], titles)
+        tables = [shape.table for slide in list(ppt.slides)[:3]
+                  for shape in slide.shapes if shape.has_table]
+        self.assertEqual([11, 11, 6], [len(table.rows) for table in tables])
+        for table in tables:
+            self.assertEqual('Row', table.cell(0, 0).text)
+        self.assertEqual('20.0', tables[2].cell(1, 0).text)
+
+        table = dict(data=df, rows_per_slide='auto', placeholder_num=2)
+        ppt = databricksppt.toPPT(dict(slides=[dict(title='Auto',
+                                                    charts=[table])]))
+        self.assertTrue(len(ppt.slides) > 1)
+
+        with tempfile.TemporaryDirectory() as folder:
+            # 'auto' goes by the deck's default text size
+            small = Presentation()
+            small.part._element.xpath('./p:defaultTextStyle/a:lvl1pPr/a:defRPr')[0].set('sz', '900')
+            template = os.path.join(folder, 'small.pptx')
+            small.save(template)
+            table = dict(data=pd.DataFrame({'Row': range(100)}), rows_per_slide='auto',
+                         placeholder_num=2)
+            pages = [len(databricksppt.toPPT(dict(template=template, slides=[
+                dict(title='Auto', charts=[dict(table)])])).slides)]
+            pages.append(len(databricksppt.toPPT(dict(slides=[
+                dict(title='Auto', charts=[dict(table)])])).slides))
+            self.assertLess(pages[0], pages[1])
+
+            # Pages of a table on a template slide leave later slide_nums alone
+            deck = Presentation()
+            for title in ['First', 'Second']:
+                deck.slides.add_slide(deck.slide_layouts[1]).shapes.title.text = title
+            template = os.path.join(folder, 'two.pptx')
+            deck.save(template)
+            ppt = databricksppt.toPPT(dict(template=template, slides=[
+                dict(slide_num=1, title='Table', charts=[
+                    dict(data=df, rows_per_slide=10, placeholder_num=2)]),
+                dict(slide_num=2, title='Chart', charts=[chart]),
+            ]))
+            titles = [slide.shapes.title.text for slide in ppt.slides]
+            self.assertEqual(['Table', 'Table', 'Table', 'Chart'], titles)
+            self.assertTrue(any(shape.has_chart for shape in ppt.slides[3].shapes))
+            self.assertFalse(any(shape.has_chart for slide in list(ppt.slides)[:3]
+                                 for shape in slide.shapes))
+
+        for rows_per_slide in [0, -1, 2.5, '10', True]:
+            self.assertEqual(
+                'Failed to create chart 1 in slide 1: rows_per_slide must be a positive '
+                'whole number or \'auto\', not {!r}'.format(rows_per_slide),
+                databricksppt.toPPT(dict(slides=[dict(title='Bad', charts=[
+                    dict(data=df, rows_per_slide=rows_per_slide, placeholder_num=2)])])))
+
+        # Replacing a template's chart by chart_num, pages would have no chart to replace
+        with tempfile.TemporaryDirectory() as folder:
+            template = os.path.join(folder, 'chart.pptx')
+            databricksppt.toPPT(dict(slides=[dict(title='Chart', charts=[chart])])).save(template)
+            self.assertIn('Failed to create chart 1 in slide 1: rows_per_slide needs a placeholder_num',
+                          databricksppt.toPPT(dict(template=template, slides=[dict(
+                              slide_num=1, chart_num=1, title='Paged',
+                              charts=[dict(data=df, rows_per_slide=10)])])))
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_arrow_data(self):
+        """Arrow Tables and RecordBatches chart the same as DataFrames"""
+        df = sample_frame().fillna(0)
+        arrow = pa.Table.from_pandas(df, preserve_index=False)
+        frame = private('arrow_to_dataframe')(arrow)
+        self.assertTrue(np.shares_memory(
+            frame['Q1'].to_numpy(), arrow.column('Q1').chunk(0).to_numpy()))
+
+        def chart_xml(data, chart_type):
+            chart = dict(data=data, chart_type=chart_type, placeholder_num=2)
+            ppt = databricksppt.toPPT(dict(slides=[dict(title='Arrow',
+                                                        charts=[chart])]))
+            shape = ppt.slides[0].shapes[-1]
+            if shape.has_table:
+                return etree.tostring(shape.table._tbl)
+            return etree.tostring(shape.chart._chartSpace)
+
+        for chart_type in ['Column', 'Line', 'Table']:
+            self.assertEqual(chart_xml(df, chart_type),
+                             chart_xml(arrow, chart_type))
+            self.assertEqual(chart_xml([df], chart_type),
+                             chart_xml(arrow.to_batches()[0], chart_type))
+
+        # Each chart's Arrow data is converted once, fingerprinted or not
+        convert = private('arrow_to_dataframe')
+        for fingerprint in [False, True]:
+            with mock.patch.object(databricksppt, '__arrow_to_dataframe', wraps=convert) as spy:
+                databricksppt.toPPT(dict(slides=[dict(title='Arrow', charts=[
+                    dict(data=arrow, chart_type='Column', placeholder_num=2)])]),
+                    fingerprint=fingerprint)
+            self.assertEqual(1, sum(1 for call in spy.call_args_list
+                                    if isinstance(call.args[0], pa.Table)))
+
+    def test_embed_workbook(self):
+        """Workbooks can be left out, or deferred and filled in from the chart"""
+        xy = pd.DataFrame({'x': [1.0, 2.0, 3.0], 'y': [4.0, 5.0, 6.0]})
+
+        def presentation(embed_workbook, chart_option=None):
+            charts = [dict(data=sample_frame().fillna(0), chart_type='Column',
+                           placeholder_num=2, embed_workbook=chart_option),
+                      dict(data=xy, chart_type='XY-Scatter', placeholder_num=2)]
+            return dict(embed_workbook=embed_workbook, slides=[
+                dict(title='Workbook', charts=[chart]) for chart in charts])
+
+        def workbooks(ppt):
+            sheets = []
+            for slide in ppt.slides:
+                chart = slide.shapes[-1].chart
+                xlsx_part = chart.part.chart_workbook.xlsx_part
+                if xlsx_part is None:
+                    sheets.append(None)
+                    continue
+                with zipfile.ZipFile(io.BytesIO(xlsx_part.blob)) as package:
+                    sheets.append(package.read('xl/worksheets/sheet1.xml'))
+            return sheets
+
+        def saved_size(ppt):
+            stream = io.BytesIO()
+            ppt.save(stream)
+            return len(stream.getvalue())
+
+        full = databricksppt.toPPT(presentation(None))
+        none = databricksppt.toPPT(presentation('none'))
+        self.assertEqual([None, None], workbooks(none))
+        self.assertTrue(saved_size(none) < saved_size(full))
+        self.assertEqual(3, len(none.slides[1].shapes[-1].chart.plots[0].series[0].values))
+
+        mixed = databricksppt.toPPT(presentation('none', 'full'))
+        self.assertEqual(workbooks(full)[0], workbooks(mixed)[0])
+        self.assertIsNone(workbooks(mixed)[1])
+
+        lazy = databricksppt.toPPT(presentation('lazy'))
+        self.assertNotEqual(workbooks(full), workbooks(lazy))
+        self.assertEqual(2, databricksppt.embedWorkbooks(lazy))
+        self.assertEqual(workbooks(full), workbooks(lazy))
+        self.assertEqual(0, databricksppt.embedWorkbooks(lazy))
+
+        self.assertEqual(
+            'Failed to create chart 1 in slide 1: Unknown embed_workbook option sometimes',
+            databricksppt.toPPT(presentation('sometimes')))
+
+    def test_shared_chart_data(self):
+        """Charts of identical data share serialization and one workbook"""
+        df = sample_frame().fillna(0)
+        other = df.assign(Q1=df['Q1'] + 1)
+        charts = [(df, 'Column'), (df.copy(), 'Column'), (df, 'Line'),
+                  (other, 'Column'), (df, 'Table')]
+        ppt = databricksppt.toPPT(dict(slides=[
+            dict(title='Shared', charts=[dict(data=data, chart_type=chart_type,
+                                              placeholder_num=2)])
+            for data, chart_type in charts]))
+
+        shapes = [slide.shapes[-1] for slide in ppt.slides]
+        parts = [shape.chart.part.chart_workbook.xlsx_part
+                 for shape in shapes if shape.has_chart]
+        self.assertIs(parts[0], parts[1])
+        self.assertIs(parts[0], parts[2])
+        self.assertIsNot(parts[0], parts[3])
+
+        for shape, (data, chart_type) in zip(shapes, charts):
+            alone = databricksppt.toPPT(dict(slides=[dict(
+                title='Alone', charts=[dict(data=data, chart_type=chart_type,
+                                            placeholder_num=2)])]))
+            expected = alone.slides[0].shapes[-1]
+            if shape.has_chart:
+                self.assertEqual(etree.tostring(expected.chart._chartSpace),
+                                 etree.tostring(shape.chart._chartSpace))
+                # The workbooks' core properties hold the time they were made
+                sheets = []
+                for chart in [expected.chart, shape.chart]:
+                    blob = chart.part.chart_workbook.xlsx_part.blob
+                    with zipfile.ZipFile(io.BytesIO(blob)) as package:
+                        sheets.append(package.read('xl/worksheets/sheet1.xml'))
+                self.assertEqual(sheets[0], sheets[1])
+
+        stream = io.BytesIO()
+        ppt.save(stream)
+        with zipfile.ZipFile(stream) as package:
+            embedded = [name for name in package.namelist()
+                        if name.startswith('ppt/embeddings/')]
+        self.assertEqual(2, len(embedded))
+
+    def test_shared_data_across_chart_kinds(self):
+        """XY and category charts of one frame keep workbooks of their own"""
+        df = pd.DataFrame({'x': [1.0, 2.0, 3.0], 'y': [4.0, 5.0, 6.0]})
+        chart_types = ['XY-Scatter', 'Column', 'XY-Scatter-Lines', 'Line']
+        ppt = databricksppt.toPPT(dict(slides=[
+            dict(title='Kinds', charts=[dict(data=df, chart_type=chart_type,
+                                             placeholder_num=2)])
+            for chart_type in chart_types]))
+
+        charts = [slide.shapes[-1].chart for slide in ppt.slides]
+        parts = [chart.part.chart_workbook.xlsx_part for chart in charts]
+        self.assertIsNot(parts[0], parts[1])
+        self.assertIs(parts[0], parts[2])
+        self.assertIs(parts[1], parts[3])
+
+        for chart, chart_type in zip(charts, chart_types):
+            alone = databricksppt.toPPT(dict(slides=[dict(
+                title='Alone', charts=[dict(data=df, chart_type=chart_type,
+                                            placeholder_num=2)])]))
+            sheets = []
+            for each in [alone.slides[0].shapes[-1].chart, chart]:
+                blob = each.part.chart_workbook.xlsx_part.blob
+                with zipfile.ZipFile(io.BytesIO(blob)) as package:
+                    sheets.append(package.read('xl/worksheets/sheet1.xml'))
+            self.assertEqual(sheets[0], sheets[1])
+
+    def test_profiler(self):
+        """toPPT reports every stage, and totals per chart and slide"""
+        profiler = ProfileSummary(trace_memory=True)
+        wide = pd.DataFrame(np.ones((40, 6)))
+        ppt = databricksppt.toPPT(dict(slides=[
+            dict(title='One', charts=[dict(data=sample_frame().fillna(0),
+                                           chart_type='Column', placeholder_num=2)]),
+            dict(title='Two', charts=[dict(data=wide, placeholder_num=2)]),
+        ]), profiler=profiler)
+        databricksppt.savePPT(ppt, io.BytesIO(), profiler=profiler)
+        profiler.close()
+
+        stages = list(profiler.stages())
+        # Nothing is fingerprinted unless asked for
+        self.assertEqual(['template', 'create_slide', 'data', 'labels'], stages[:4])
+        for stage in ['placeholder', 'chart_data', 'serialize', 'insert', 'save']:
+            self.assertIn(stage, stages)
+
+        charts = [(event.slide, event.chart, event.rows, event.columns)
+                  for event in profiler.events if event.stage == 'chart']
+        self.assertEqual([(1, 1, 3, 4), (2, 1, 40, 6)], charts)
+        slides = [event for event in profiler.events if event.stage == 'slide']
+        self.assertEqual(2, len(slides))
+        self.assertTrue(all(event.bytes is not None for event in profiler.events))
+
+        top = profiler.top(1)
+        self.assertEqual(max(event.seconds for event in profiler.events
+                             if event.stage == 'chart'), top[0].seconds)
+        output = io.StringIO()
+        profiler.print_top(5, output)
+        self.assertIn('slowest stage', output.getvalue())
+
+    def test_incremental_render(self):
+        """Only slides whose spec or data changed are built again"""
+        def presentation(values, title='Incremental'):
+            slides = [dict(title='{} {}'.format(title, num), charts=[
+                dict(data=pd.DataFrame({'Label': ['a', 'b'], 'Value': [value, 2.0]}),
+                     chart_type='Column', placeholder_num=2, transpose=True)])
+                for num, value in enumerate(values)]
+            slides.insert(1, dict(title='Table', charts=[dict(
+                data=pd.DataFrame({'Row': range(25)}), rows_per_slide=10,
+                placeholder_num=2)]))
+            return dict(slides=slides)
+
+        def save(ppt):
+            stream = io.BytesIO()
+            ppt.save(stream)
+            return stream.getvalue()
+
+        def rebuilt(values, previous, title='Incremental'):
+            profiler = ProfileSummary()
+            ppt = databricksppt.toPPT(presentation(values, title), profiler=profiler,
+                                      previous=io.BytesIO(previous))
+            slides = [event.slide for event in profiler.events
+                      if event.stage == 'create_slide']
+            return Presentation(io.BytesIO(save(ppt))), slides
+
+        def summary(ppt):
+            return [(slide.shapes.title.text,
+                     slide.shapes[-1].chart.plots[0].series[0].values
+                     if slide.shapes[-1].has_chart else None)
+                    for slide in ppt.slides]
+
+        unmarked = databricksppt.toPPT(presentation([1.0, 2.0, 3.0]))
+        self.assertEqual({}, get_custom_properties(unmarked))
+        ppt, slides = rebuilt([1.0, 2.0, 3.0], save(unmarked))
+        self.assertEqual([1, 2, 3, 4], slides)
+
+        first = save(databricksppt.toPPT(presentation([1.0, 2.0, 3.0]), fingerprint=True))
+        ppt, slides = rebuilt([1.0, 2.0, 3.0], first)
+        self.assertEqual([], slides)
+        self.assertEqual(summary(Presentation(io.BytesIO(first))), summary(ppt))
+
+        ppt, slides = rebuilt([1.0, 5.0, 3.0, 4.0], first)
+        self.assertEqual([3, 5], slides)
+        self.assertEqual(summary(databricksppt.toPPT(presentation([1.0, 5.0, 3.0, 4.0]))),
+                         summary(ppt))
+
+        ppt, slides = rebuilt([1.0], save(ppt))
+        self.assertEqual([], slides)
+        self.assertEqual(['Incremental 0', 'Table', 'Table', 'Table'],
+                         [slide.shapes.title.text for slide in ppt.slides])
+
+        ppt, slides = rebuilt([1.0, 2.0], save(ppt), title='Renamed')
+        self.assertEqual([1, 3], slides)
+        self.assertEqual(['Renamed 0', 'Table', 'Table', 'Table', 'Renamed 1'],
+                         [slide.shapes.title.text for slide in ppt.slides])
+
+    def test_label_inference_matches_isinstance(self):
+        """dtype-based label inference agrees with checking every cell"""
+        has_non_numbers = private('has_non_numbers')
+        for values in label_inference_cases():
+            self.assertEqual(isinstance_has_non_numbers(values),
+                             has_non_numbers(values), repr(values))
+
+        for values in label_inference_cases():
+            if isinstance(values, pd.Index):
+                continue
+            df = pd.DataFrame({'first': values, 'second': 1.0}
+                              if len(values) else {'first': values})
+            self.assertEqual(isinstance_has_non_numbers(df.iloc[:, 0]),
+                             private('infer_category_labels')([df]))
+            df.columns = values[:2].tolist() if len(values) > 1 else df.columns
+            self.assertEqual(isinstance_has_non_numbers(df.columns),
+                             private('infer_series_labels')([df]))
+
+    @unittest.skipIf(yaml is None, 'PyYAML is not installed')
+    def test_build_spec(self):
+        """A deck spec renders several decks, reading each file once"""
+        spec = '\n'.join([
+            'data:',
+            '  sales: sales.csv',
+            'layout_num: 1',
+            'decks:',
+            '  - output: first.pptx',
+            '    slides:',
+            '      - title: Column',
+            '        charts: [{data: sales, chart_type: Column, placeholder_num: 2}]',
+            '      - title: Table',
+            '        charts: [{data: sales.csv, placeholder_num: 2}]',
+            '  - output: second.pptx',
+            '    slides:',
+            '      - title: Line',
+            '        charts: [{data: [sales], chart_type: Line, placeholder_num: 2}]',
+        ])
+        with tempfile.TemporaryDirectory() as folder:
+            sample_frame().fillna(0).to_csv(os.path.join(folder, 'sales.csv'), index=False)
+            spec_file = os.path.join(folder, 'deck.yaml')
+            with open(spec_file, 'w') as stream:
+                stream.write(spec)
+
+            result = CliRunner().invoke(cli.main, ['build', spec_file, '--compress-level', '1',
+                                                   '--store-compressed'])
+            self.assertEqual(0, result.exit_code, result.output)
+            for output, titles in [('first.pptx', ['Column', 'Table']),
+                                   ('second.pptx', ['Line'])]:
+                deck = Presentation(os.path.join(folder, output))
+                self.assertEqual(titles, [slide.shapes.title.text for slide in deck.slides])
+
+            parsed = load_spec(spec_file)
+            cache = DataCache(parsed['data'], folder)
+            decks = presentations(parsed, folder, cache)
+            self.assertEqual(1, cache.reads)
+            frames = [chart['data'] for deck in decks for slide in deck[0]['slides']
+                      for chart in slide['charts']]
+            self.assertIs(frames[0], frames[1])
+            self.assertIs(frames[0], frames[2][0])
+            # The spec itself keeps its data references
+            self.assertEqual(load_spec(spec_file), parsed)
+
+            with open(spec_file, 'w') as stream:
+                stream.write(spec.replace('sales.csv', 'missing.csv', 1))
+            result = CliRunner().invoke(cli.main, ['build', spec_file])
+            self.assertNotEqual(0, result.exit_code)
+            self.assertIn('missing.csv not found', result.output)
+
+    def test_ppttc_output(self):
+        """ppttc output matches the thinkcell package's, cell for cell"""
+        df = pd.DataFrame({
+            'Region': ['North', 'South "2"', 'East'],
+            'Q1': [1.5, 2.0, 3.25],
+            'Q2': [4, 5, 6],
+        })
+        reference = Thinkcell()
+        reference.add_template('template.pptx')
+        reference.add_textfield('template.pptx', 'Title', 'Sales')
+        reference.add_chart_from_dataframe('template.pptx', 'Chart1', df)
+        reference.add_chart('template.pptx', 'Totals', ['North', 'South "2"', 'East'],
+                            [['Q1', 1.5, 2.0, 3.25], ['Q2', 4, 5, 6]])
+
+        ppttc = databricksppt.toPPTTC(dict(template='template.pptx', slides=[
+            dict(title='Sales', charts=[
+                dict(data=df, chart_type='Column'),
+                dict(data=df, chart_type='Bar', transpose=True, name='Totals')])]))
+        self.assertEqual(reference.charts, json.loads(ppttc))
+
+        dates = pd.DataFrame({'Day': pd.to_datetime(['2016-09-03', None]),
+                              'Note': ['a\tb', None], 'Value': [np.nan, 7]})
+        ppttc = databricksppt.toPPTTC(dict(template='t.pptx', slides=[
+            dict(charts=[dict(data=dates, column_names_as_labels=True)])]))
+        self.assertEqual([[{'string': 'Day'}, {'string': 'Note'}, {'string': 'Value'}],
+                          [{'date': '2016-09-03'}, {'string': 'a\tb'}, None],
+                          [None, None, {'number': 7.0}]],
+                         json.loads(ppttc)[0]['data'][0]['table'])
+
+        self.assertIn('No think-cell template',
+                      databricksppt.toPPTTC(dict(slides=[dict(charts=[dict(data=df)])])))
+
+        # Generators and callables are evaluated once, as for toPPT
+        slides = (dict(title='Sales', charts=[
+            lambda: dict(data=lambda: df, chart_type='Column'),
+            dict(data=iter([df]), chart_type='Bar', transpose=True, name='Totals')])
+            for num in range(1))
+        ppttc = databricksppt.toPPTTC(dict(template='template.pptx', slides=slides))
+        self.assertEqual(reference.charts, json.loads(ppttc))
+
+        with tempfile.TemporaryDirectory() as folder:
+            # A failed chart leaves the file as it was
+            output = os.path.join(folder, 'deck.ppttc')
+            with open(output, 'w') as stream:
+                stream.write('earlier')
+            error = databricksppt.toPPTTC(dict(template='t.pptx', slides=[
+                dict(charts=[dict(data=df), dict(data='not data')])]), output)
+            self.assertIn('Failed to create chart 2 in slide 1', error)
+            self.assertEqual(['deck.ppttc'], os.listdir(folder))
+            with open(output) as stream:
+                self.assertEqual('earlier', stream.read())
+
+            self.assertIsNone(databricksppt.toPPTTC(dict(template='t.pptx', slides=[
+                dict(charts=[dict(data=df)])]), Path(output)))
+            with open(output) as stream:
+                self.assertEqual('t.pptx', json.load(stream)[0]['template'])
+
+        with tempfile.TemporaryDirectory() as folder:
+            data_file = os.path.join(folder, 'data.csv')
+            df.to_csv(data_file, index=False)
+            result = CliRunner().invoke(cli_main.main, [
+                data_file, os.path.join(folder, 'deck'), '--format', 'ppttc',
+                '--template', data_file, '--chart-type', 'Column', '--title', 'Sales'])
+            self.assertEqual(0, result.exit_code, result.output)
+            with open(os.path.join(folder, 'deck.ppttc')) as stream:
+                self.assertEqual(reference.charts[0]['data'][:2],
+                                 json.load(stream)[0]['data'])
+
+    def test_chunked_aggregation(self):
+        """Aggregating chunk by chunk gives the same frame as reading it whole"""
+        rng = np.random.default_rng(7)
+        df = pd.DataFrame({
+            'Region': rng.choice(['North', 'South', 'East'], 1000),
+            'Product': rng.choice(['x', 'y'], 1000),
+            'Units': rng.integers(0, 100, 1000),
+            'Price': rng.random(1000),
+            'Note': 'skipped',
+        })
+        df.loc[[3, 500], 'Price'] = np.nan
+        engines = ['c'] + (['pyarrow'] if pa is not None else [])
+        with tempfile.TemporaryDirectory() as folder:
+            data_file = os.path.join(folder, 'data.csv')
+            df.to_csv(data_file, index=False)
+            for engine in engines:
+                for agg in ['sum', 'mean', 'count', 'min', 'max']:
+                    actual = read_csv(data_file, columns=['Units', 'Price'],
+                                      group_by=['Region', 'Product'], agg=agg,
+                                      chunksize=97, engine=engine)
+                    expected = df.groupby(['Region', 'Product'])[['Units', 'Price']].agg(agg)
+                    pd.testing.assert_frame_equal(expected.reset_index(), actual,
+                                                  check_dtype=False, obj=agg)
+
+                pruned = read_csv(data_file, columns=['Region', 'Price'],
+                                  dtype={'Region': 'category'}, chunksize=97, engine=engine)
+                self.assertEqual(['Region', 'Price'], pruned.columns.tolist())
+                self.assertEqual('category', pruned['Region'].dtype.name)
+                self.assertEqual(len(df), len(pruned))
+
+            output = os.path.join(folder, 'grouped.pptx')
+            result = CliRunner().invoke(cli_main.main, [
+                data_file, output, '--title', 'Grouped', '--placeholder-num', '2',
+                '--chart-type', 'Column', '--columns', 'Units', '--group-by', 'Region',
+                '--chunksize', '100', '--compress-level', '9', '--store-compressed'])
+            self.assertEqual(0, result.exit_code, result.output)
+            chart = Presentation(output).slides[0].shapes[-1].chart
+            self.assertEqual(df.groupby('Region')['Units'].sum().tolist(),
+                             [series.values[0] for series in chart.plots[0].series])
+
+    def test_render_server(self):
+        """The server renders specs with payloads, and main.py forwards to it"""
+        with tempfile.TemporaryDirectory() as folder:
+            address = 'unix:' + os.path.join(folder, 'render.sock')
+            server = make_server(address, workers=1, queue_size=1, root=folder)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                df = sample_frame().fillna(0)
+                deck = client.toPPT_remote(address, dict(slides=[
+                    dict(title='Chart', charts=[dict(data=df, chart_type='Column', placeholder_num=2)]),
+                    dict(title='Table', charts=[dict(data=df, placeholder_num=2)])]))
+                ppt = Presentation(io.BytesIO(deck))
+                self.assertEqual(['Chart', 'Table'], [slide.shapes.title.text for slide in ppt.slides])
+
+                spec = dict(output=os.path.join(folder, 'out.pptx'), slides=[
+                    dict(title='CSV', charts=[dict(data='input1', placeholder_num=2)])])
+                payloads = [('input1', 'csv', df.to_csv(index=False).encode('utf-8'))]
+                self.assertEqual([spec['output']], client.render(address, spec, payloads))
+                self.assertTrue(os.path.isfile(spec['output']))
+
+                with self.assertRaisesRegex(client.RenderError, 'No payload'):
+                    client.render(address, dict(slides=[dict(charts=[dict(data='x')])]), [])
+                with self.assertRaisesRegex(client.RenderError, 'Chart number 1 is outside'):
+                    client.render(address, dict(slides=[dict(title='Bad', charts=[
+                        dict(data='input1')])]), payloads)
+
+                # Requests cannot reach outside the server's root
+                self.assertEqual([os.path.join(folder, 'relative.pptx')], client.render(
+                    address, dict(spec, output='relative.pptx'), payloads))
+                for outside in [dict(output='../outside.pptx'), dict(output='/etc/outside.pptx'),
+                                dict(template=databricksppt.__file__)]:
+                    with self.assertRaisesRegex(client.RenderError, 'outside the server root'):
+                        client.render(address, dict(spec, **outside), payloads)
+                self.assertFalse(os.path.exists(os.path.join(folder, '..', 'outside.pptx')))
+
+                data_file = os.path.join(folder, 'data.csv')
+                df.to_csv(data_file, index=False)
+                output = os.path.join(folder, 'cli.pptx')
+                result = CliRunner().invoke(cli_main.main, [
+                    data_file, output, '--title', 'Forwarded', '--placeholder-num', '2',
+                    '--server', address])
+                self.assertEqual(0, result.exit_code, result.output)
+                self.assertEqual(['Forwarded'],
+                                 [slide.shapes.title.text for slide in Presentation(output).slides])
+            finally:
+                server.shutdown()
+                server.server_close()
+                server.queue.shutdown()
+
+        with self.assertRaises(client.ServerUnavailable):
+            client.render('unix:' + os.path.join(folder, 'render.sock'), {}, [])
+
+        # Only loopback addresses are served unless asked otherwise
+        with self.assertRaisesRegex(ValueError, 'allow_remote'):
+            make_server('0.0.0.0:0')
+        server = make_server('localhost:0')
+        server.server_close()
+        server.queue.shutdown()
+
+        # Shutting down lets the running render finish and drops queued ones
+        release = threading.Event()
+        queue = RenderQueue(workers=1, queue_size=1)
+        running = queue.submit(release.wait)
+        queued = queue.submit(int)
+        with self.assertRaises(Busy):
+            queue.submit(int)
+        threading.Timer(0.1, release.set).start()
+        queue.shutdown()
+        self.assertTrue(queued.cancelled())
+        self.assertTrue(running.result())
+
     def test_command_line_interface(self):
         """Test the CLI."""
         runner = CliRunner()